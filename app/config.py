@@ -29,7 +29,92 @@ class Settings(BaseSettings):
     # Application settings
     DEFAULT_LANGUAGE: str = "ru"
     FALLBACK_LANGUAGE: str = "en"
-    
+
+    # Transcript cache settings
+    TRANSCRIPT_CACHE_ENABLED: bool = True
+    TRANSCRIPT_CACHE_PATH: str = "cache/transcripts.sqlite3"
+    TRANSCRIPT_CACHE_TTL: int = 7 * 24 * 60 * 60  # seconds
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    TRANSCRIPT_CACHE_STALE_WHILE_REVALIDATE: int = 24 * 60 * 60  # seconds past the TTL served at once while refreshed
+    TRANSCRIPT_CACHE_STALE_IF_ERROR: int = 30 * 24 * 60 * 60  # seconds past the TTL served when YouTube fails
+    TRANSCRIPT_INVENTORY_TTL: int = 5 * 60  # seconds
+
+    # Negative cache for classified failures (seconds per failure class)
+    NEGATIVE_CACHE_ENABLED: bool = True
+    NEGATIVE_CACHE_TTL_UNAVAILABLE: int = 60 * 60
+    NEGATIVE_CACHE_TTL_PRIVATE: int = 30 * 60
+    NEGATIVE_CACHE_TTL_DISABLED: int = 60 * 60
+    NEGATIVE_CACHE_TTL_NO_TRANSCRIPT: int = 15 * 60
+
+    # Subtitle retrieval settings
+    SUBTITLE_HEDGING_ENABLED: bool = False
+    SUBTITLE_HEDGE_DELAY: float = 2.0  # seconds before yt-dlp is started in parallel
+    SUBTITLE_TIMEDTEXT_ENABLED: bool = True  # direct watch page + timedtext backend
+    SUBTITLE_BACKEND_MIN_SAMPLES: int = 5  # attempts before measured stats reorder a backend
+
+    # Per-backend circuit breakers
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures before a backend is skipped
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a half-open probe is allowed
+
+    # Thread pool for blocking YouTube and disk I/O
+    UPSTREAM_EXECUTOR_WORKERS: int = 16
+    DISK_EXECUTOR_WORKERS: int = 4  # separate pool for SQLite cache access
+    UPSTREAM_HTTP_TIMEOUT: float = 10.0  # seconds per HTTP request to YouTube
+    ASYNC_HTTP_MAX_CONNECTIONS: int = 20  # connection pool of the async YouTube client
+    ASYNC_HTTP_MAX_KEEPALIVE: int = 10
+
+    # Outbound rate governor for all YouTube traffic
+    YOUTUBE_RATE_LIMIT: float = 5.0  # requests per second
+    YOUTUBE_RATE_BURST: int = 10
+    YOUTUBE_RATE_STATE_PATH: str = ""  # SQLite file to share the budget between workers on the host
+    YOUTUBE_BACKOFF_BASE: float = 1.0  # seconds, doubled per consecutive throttled response
+    YOUTUBE_BACKOFF_MAX: float = 60.0
+    YOUTUBE_THROTTLE_RETRIES: int = 2
+
+    # Priority scheduling of upstream work (interactive API calls vs batch jobs)
+    SCHEDULER_CAPACITY: int = 12  # upstream operations running at once
+    SCHEDULER_INTERACTIVE_CONCURRENCY: int = 12
+    SCHEDULER_BATCH_CONCURRENCY: int = 4
+    SCHEDULER_INTERACTIVE_RATE_SHARE: float = 1.0  # fraction of YOUTUBE_RATE_LIMIT
+    SCHEDULER_BATCH_RATE_SHARE: float = 0.3
+
+    # Admission control for API requests that need upstream work (cache hits are never queued)
+    ADMISSION_MAX_QUEUE: int = 32  # waiting requests per priority class before 503
+    ADMISSION_QUEUE_TIMEOUT: float = 15.0  # seconds a request may wait for a slot; 0 = no limit
+
+    # End-to-end request deadline (X-Request-Timeout header or ?timeout= query parameter)
+    REQUEST_TIMEOUT_DEFAULT: float = 30.0  # seconds
+    REQUEST_TIMEOUT_MAX: float = 120.0
+
+    # Batch transcript endpoint (POST /api/transcripts/batch)
+    BATCH_MAX_ITEMS: int = 100
+    BATCH_CONCURRENCY: int = 4  # transcripts fetched at once per batch
+
+    # Channel harvest jobs (POST /api/jobs/harvest)
+    HARVEST_DB_PATH: str = "cache/harvest.sqlite3"  # job manifest
+    HARVEST_OUTPUT_DIR: str = "cache/harvest"  # transcript files, one directory per channel
+    HARVEST_CONCURRENCY: int = 3  # transcripts fetched at once per job
+    HARVEST_MAX_ATTEMPTS: int = 3  # per video before a transient failure is final
+    HARVEST_MAX_VIDEOS: int = 500
+    HARVEST_VIDEO_TIMEOUT: float = 120.0  # seconds per transcript
+    HARVEST_RESUME_ON_STARTUP: bool = True
+    HARVEST_LEASE_SECONDS: float = 60.0  # a job is taken over by another worker this long after its owner stops
+
+    # Listings of up to 15 videos come from the channel's RSS feed instead of the /videos page
+    CHANNEL_FEED_ENABLED: bool = True
+
+    # Incremental channel sync (GET /channel/{channel_id}/sync)
+    CHANNEL_DB_PATH: str = "cache/channels.sqlite3"
+    CHANNEL_SYNC_KNOWN_IDS: int = 50  # newest video IDs remembered per subscriber and channel
+    CHANNEL_SYNC_MAX_NEW: int = 200  # most new videos returned by one sync
+    CHANNEL_RESOLVE_TTL: float = 30 * 24 * 3600  # seconds a channel resolved from alias queries is kept
+
+    # Channel search and listing responses: served from memory, refreshed in the background once stale
+    CHANNEL_CACHE_ENABLED: bool = True
+    CHANNEL_CACHE_FRESH_TTL: float = 5 * 60  # seconds served without revalidation
+    CHANNEL_CACHE_STALE_TTL: float = 24 * 60 * 60  # seconds past that served while a refresh runs
+    CHANNEL_CACHE_MAX_ENTRIES: int = 1000
+
     # Create logs directory if it doesn't exist
     @property
     def LOG_DIR(self) -> Path:
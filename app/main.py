@@ -24,12 +24,20 @@ if sys.platform == "win32":
 
 from .config import settings
 from .utils.helpers import setup_logging
+from .services.executor import shutdown_upstream_executor
+from .services.http_session import close_async_client, close_http_session, get_async_client
+from .services.response_cache import shutdown_channel_cache
+from .services.scheduler import current_priority, INTERACTIVE, BATCH
+from .services.deadline import deadline_scope, parse_timeout
+from .services.harvest import get_harvest_manager
 # Import routers
 from .routes.transcript import json_api_router, web_router as transcript_web_router
 from .routes.languages import router as languages_router
 from .routes.channel import router as channel_router
 from .routes.channel_search import router as channel_search_router
 from .routes.test import router as test_router
+from .routes.admin import router as admin_router
+from .routes.jobs import router as jobs_router
 
 # Set up logging
 setup_logging("youtube_transcript.log")
@@ -64,6 +72,8 @@ app.include_router(languages_router, prefix="/languages", tags=["languages"])
 app.include_router(channel_router, prefix="/channel", tags=["channel"])
 app.include_router(channel_search_router, prefix="/channel-search", tags=["channel-search"])
 app.include_router(test_router, prefix="/test", tags=["test"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+app.include_router(jobs_router)  # Background jobs (/api/jobs)
 
 # Mount static files (if any)
 static_dir = os.path.join(os.path.dirname(__file__), "static")
@@ -82,11 +92,41 @@ async def test_web_interface():
 async def startup_event():
     """Initialize services on startup."""
     logger.info("Starting YouTube Transcript API...")
+    # Open the async keep-alive pool on the serving event loop
+    get_async_client()
+    if settings.HARVEST_RESUME_ON_STARTUP:
+        # Jobs are leased, so with several workers each job still runs in one of them
+        get_harvest_manager().watch()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown."""
     logger.info("Shutting down YouTube Transcript API...")
+    # Running jobs stay active in the manifest and resume on the next start
+    await get_harvest_manager().shutdown()
+    await shutdown_channel_cache()
+    shutdown_upstream_executor()
+    close_http_session()
+    await close_async_client()
+
+# Tag each request with its upstream priority class
+@app.middleware("http")
+async def set_request_priority(request: Request, call_next):
+    """Read the X-Request-Priority header (interactive or batch) into the request context."""
+    priority = request.headers.get("X-Request-Priority", INTERACTIVE).strip().lower()
+    token = current_priority.set(priority if priority in (INTERACTIVE, BATCH) else INTERACTIVE)
+    try:
+        return await call_next(request)
+    finally:
+        current_priority.reset(token)
+
+# Give each request an end-to-end deadline that upstream work must finish within
+@app.middleware("http")
+async def set_request_deadline(request: Request, call_next):
+    """Read the X-Request-Timeout header or timeout query parameter (seconds) into the request context."""
+    budget = parse_timeout(request.headers.get("X-Request-Timeout") or request.query_params.get("timeout"))
+    with deadline_scope(budget):
+        return await call_next(request)
 
 # Add middleware for request/response logging
 @app.middleware("http")
@@ -157,6 +197,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> JSONRe
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 @app.exception_handler(RequestValidationError)
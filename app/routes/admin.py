@@ -0,0 +1,59 @@
+"""
+API routes for operational statistics.
+"""
+
+from fastapi import APIRouter
+from typing import Dict, Any
+
+from app.services import youtube_service, transcript_cache, transcript_flight, negative_cache
+from app.services.executor import disk_executor_stats, run_disk_io, upstream_executor_stats
+from app.services.response_cache import get_channel_cache
+from app.services.http_session import get_youtube_governor
+from app.services.scheduler import get_upstream_scheduler
+
+# Create a router for admin endpoints
+router = APIRouter(prefix="", tags=["admin"])
+
+
+@router.get("/stats")
+async def get_stats() -> Dict[str, Any]:
+    """
+    Get cache, request coalescing, subtitle backend and executor statistics.
+    
+    Returns:
+        Dictionary with counters for each subsystem
+    """
+    channel_cache = get_channel_cache()
+    # The transcript cache and a shared governor are read from SQLite, which must not happen on the event loop
+    return {
+        "transcript_cache": await run_disk_io(transcript_cache.stats) if transcript_cache else None,
+        "negative_cache": negative_cache.stats() if negative_cache else None,
+        "channel_cache": channel_cache.stats() if channel_cache else None,
+        "transcript_coalescing": transcript_flight.stats(),
+        "subtitle_backends": youtube_service.backend_stats.snapshot(),
+        "upstream_executor": upstream_executor_stats(),
+        "disk_executor": disk_executor_stats(),
+        "youtube_governor": await run_disk_io(get_youtube_governor().stats),
+        "scheduler": get_upstream_scheduler().stats()
+    }
+
+
+@router.get("/backends")
+async def get_backends() -> Dict[str, Any]:
+    """
+    Get the subtitle backends with their circuit breaker state and rolling statistics.
+    
+    Returns:
+        Dictionary with the current backend order and one entry per backend
+    """
+    stats = youtube_service.backend_stats.snapshot()
+    return {
+        "order": youtube_service.backend_order(),
+        "backends": {
+            backend: {
+                "breaker": breaker.snapshot(),
+                "stats": stats.get(backend)
+            }
+            for backend, breaker in youtube_service.breakers.items()
+        }
+    }
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Optional
 from app.services.youtube_service import YouTubeService
+from app.services.scheduler import get_upstream_scheduler
+from app.services.deadline import DeadlineExceeded, within_deadline
+from app.services.channel_pages import InvalidCursor
+from app.services.channel_sync import get_channel_sync
+from app.services.executor import run_blocking
+from app.services.response_cache import cached_channel_response
 
 # Create a router for channel endpoints
 router = APIRouter(prefix="", tags=["channel"])
@@ -9,6 +15,7 @@ youtube_service = YouTubeService()
 @router.get("/search")
 async def search_channels(
     query: str,
+    response: Response,
     max_results: int = Query(10, ge=1, le=50, description="Максимальное количество результатов (1-50)")
 ):
     """
@@ -21,33 +28,100 @@ async def search_channels(
         if not query.strip():
             raise HTTPException(status_code=400, detail="Поисковый запрос не может быть пустым")
             
-        channels = await youtube_service.search_channels(query, max_results)
+        async def fetch():
+            async with get_upstream_scheduler().slot(bounded=True):
+                return await within_deadline(youtube_service.search_channels(query, max_results))
+
+        channels, cache_state = await cached_channel_response(("search", query.strip().lower(), max_results), fetch)
+        response.headers["X-Cache"] = cache_state.upper()
         return {
             "status": "success",
             "results": channels,
             "count": len(channels)
         }
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{channel_id}/videos")
 async def get_channel_videos(
     channel_id: str,
-    max_results: int = Query(10, ge=1, le=50, description="Максимальное количество видео (1-50)")
+    response: Response,
+    max_results: int = Query(10, ge=1, le=50, description="Максимальное количество видео на странице (1-50)"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)")
+):
+    """
+    Получение списка видео канала по страницам
+    
+    - **channel_id**: ID канала
+    - **max_results**: Максимальное количество видео на странице
+    - **cursor**: Курсор следующей страницы; весь канал читается, пока next_cursor не станет null
+    """
+    try:
+        async def fetch():
+            async with get_upstream_scheduler().slot(bounded=True):
+                return await within_deadline(youtube_service.list_channel_videos(channel_id, max_results, cursor))
+
+        # Empty listings usually mean yt-dlp failed; they are not cached
+        result, cache_state = await cached_channel_response(
+            ("videos", channel_id, max_results, cursor), fetch, cacheable=lambda result: bool(result["videos"])
+        )
+        response.headers["X-Cache"] = cache_state.upper()
+        return {
+            "status": "success",
+            "channel_id": channel_id,
+            "videos": result["videos"],
+            "count": len(result["videos"]),
+            "source": result["source"],
+            "next_cursor": result["next_cursor"]
+        }
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{channel_id}/sync")
+async def sync_channel_videos(
+    channel_id: str,
+    subscriber: str = Query(..., min_length=1, max_length=128, description="ID клиента, которому принадлежит состояние синхронизации"),
+    initial: int = Query(10, ge=1, le=50, description="Количество видео при первой синхронизации (1-50)"),
+    reset: bool = Query(False, description="Забыть состояние канала и начать синхронизацию заново")
 ):
     """
-    Получение списка видео канала
+    Получение только новых видео канала с момента предыдущей синхронизации этого клиента
     
     - **channel_id**: ID канала
-    - **max_results**: Максимальное количество возвращаемых видео
+    - **subscriber**: ID клиента; у каждого клиента своё состояние, чужие синхронизации его не сдвигают
+    - **initial**: Количество видео, возвращаемых при первой синхронизации
+    - **reset**: Начать синхронизацию заново
     """
     try:
-        videos = await youtube_service.get_channel_videos(channel_id, max_results)
+        channel_sync = get_channel_sync()
+        if reset:
+            await run_blocking(channel_sync.reset, subscriber, channel_id)
+        async with get_upstream_scheduler().slot(bounded=True):
+            result = await within_deadline(run_blocking(channel_sync.sync, subscriber, channel_id, initial))
         return {
             "status": "success",
             "channel_id": channel_id,
-            "videos": videos,
-            "count": len(videos)
+            "videos": result["new_videos"],
+            "count": len(result["new_videos"]),
+            "first_sync": result["first_sync"],
+            "truncated": result["truncated"],
+            "newest_video_id": result["newest_video_id"],
+            "newest_published": result["newest_published"],
+            "previous_sync_at": result["previous_sync_at"]
         }
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
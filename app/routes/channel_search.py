@@ -1,19 +1,34 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import Dict, Any
 from app.services.youtube_search import YouTubeSearcher
+from app.services.scheduler import get_upstream_scheduler
+from app.services.deadline import DeadlineExceeded, within_deadline
+from app.services.response_cache import cached_channel_response
 
 # Create a router for channel search functionality
 router = APIRouter(prefix="", tags=["channel-search"])
 
 @router.get("/search")
 async def search_channels(
+    response: Response,
     query: str = Query(..., description="Search query for YouTube channels"),
     max_results: int = Query(5, ge=1, le=20, description="Maximum number of results (1-20)")
 ) -> Dict[str, Any]:
     """
     Search for YouTube channels by query
     """
-    result = YouTubeSearcher.search_channels(query, max_results)
+    async def fetch():
+        async with get_upstream_scheduler().slot(bounded=True):
+            return await within_deadline(YouTubeSearcher.search_channels_async(query, max_results))
+
+    try:
+        # Only successful searches are cached; errors are retried on the next request
+        result, cache_state = await cached_channel_response(
+            ("channel_search", query.strip().lower(), max_results), fetch,
+            cacheable=lambda result: result['status'] == 'success'
+        )
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail={"status": "error", "message": str(e)})
     
     if result['status'] != 'success':
         raise HTTPException(
@@ -25,14 +40,24 @@ async def search_channels(
             }
         )
     
+    response.headers["X-Cache"] = cache_state.upper()
     return result
 
 @router.get("/rabbi-ginsburgh")
-async def get_rabbi_ginsburgh_channel() -> Dict[str, Any]:
+async def get_rabbi_ginsburgh_channel(
+    refresh: bool = Query(False, description="Search again instead of using the stored channel")
+) -> Dict[str, Any]:
     """
     Get Rabbi Yitzchak Ginsburgh's official YouTube channel
     """
-    channel = YouTubeSearcher.find_rabbi_ginsburgh_channel()
+    # A stored answer needs no upstream work, so it never waits for (or is refused) a slot
+    channel = None if refresh else await YouTubeSearcher.stored_rabbi_ginsburgh_channel_async()
+    try:
+        if channel is None:
+            async with get_upstream_scheduler().slot(bounded=True):
+                channel = await within_deadline(YouTubeSearcher.find_rabbi_ginsburgh_channel_async(refresh))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail={"status": "error", "message": str(e)})
     
     if not channel:
         raise HTTPException(
@@ -0,0 +1,86 @@
+"""
+API routes for background harvest jobs.
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any
+
+from app.config import settings
+from app.schemas.transcript import ErrorResponse, HarvestJobRequest
+from app.services.executor import run_disk_io
+from app.services.harvest import get_harvest_manager
+from app.services.transcript_service import TranscriptService
+from app.utils.url_parser import is_valid_channel_id
+
+# Create a router for job endpoints
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def _not_found(job_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=ErrorResponse(error="job_not_found", message=f"No harvest job {job_id}").dict()
+    )
+
+
+@router.post("/harvest", status_code=status.HTTP_202_ACCEPTED)
+async def create_harvest_job(job: HarvestJobRequest) -> Dict[str, Any]:
+    """
+    Start harvesting the transcripts of a channel's most recent videos.
+
+    The job runs in the background at batch priority; poll
+    GET /api/jobs/{job_id} for progress.
+    """
+    # The channel ID names the output directory, so nothing but a real ID is accepted
+    if not is_valid_channel_id(job.channel_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(error="invalid_channel_id", message="Use a channel ID like UCxxxxxxxxxxxxxxxxxxxxxx").dict()
+        )
+    if not job.languages:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(error="invalid_language", message="At least one language is required").dict()
+        )
+    for language in job.languages:
+        TranscriptService.validate_language(language)
+
+    manager = get_harvest_manager()
+    job_id = await manager.create(
+        job.channel_id,
+        list(dict.fromkeys(job.languages)),
+        job.auto_generated,
+        min(job.max_videos, settings.HARVEST_MAX_VIDEOS)
+    )
+    return await manager.progress(job_id)
+
+
+@router.get("")
+async def list_harvest_jobs() -> Dict[str, Any]:
+    """List all harvest jobs with their progress, newest first."""
+    manager = get_harvest_manager()
+    jobs = [await manager.progress(job["job_id"]) for job in await run_disk_io(manager.store.list_jobs)]
+    return {"status": "success", "jobs": jobs, "count": len(jobs)}
+
+
+@router.get("/{job_id}")
+async def get_harvest_job(job_id: str) -> Dict[str, Any]:
+    """Get the progress of a harvest job, including throughput and ETA."""
+    progress = await get_harvest_manager().progress(job_id)
+    if progress is None:
+        raise _not_found(job_id)
+    return progress
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_harvest_job(job_id: str) -> Dict[str, Any]:
+    """Stop a running harvest job; completed items stay in the manifest."""
+    manager = get_harvest_manager()
+    if await manager.progress(job_id) is None:
+        raise _not_found(job_id)
+    if not await manager.cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ErrorResponse(error="job_not_running", message=f"Harvest job {job_id} is not running").dict()
+        )
+    return await manager.progress(job_id)
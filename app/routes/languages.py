@@ -34,8 +34,8 @@ async def get_available_languages_for_video(video_id: str) -> List[Dict[str, str
     """
     Get list of available languages for a specific video.
     
-    Note: This is a placeholder. In a real implementation, you would check
-    the actual available languages for the video.
+    The answer comes from the same short-lived caption inventory that transcript
+    retrieval uses, so it usually costs no extra request to YouTube.
     
     Args:
         video_id: YouTube video ID
@@ -44,9 +44,7 @@ async def get_available_languages_for_video(video_id: str) -> List[Dict[str, str
         List of available languages with codes and names
     """
     try:
-        # In a real implementation, we would check the available languages for this video
-        # For now, we'll just return the common languages
-        return youtube_service.get_available_languages()
+        return await youtube_service.get_video_languages(video_id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,14 +1,20 @@
 """
 API routes for transcript operations.
 """
+import asyncio
+import json
 import logging
 import os
+import time
 from datetime import datetime
 from fastapi import APIRouter, Request, HTTPException, status, Query, Depends, Form, Response
-from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, AsyncIterator
 
 # Import services and utilities
+from app.config import settings
+from app.schemas.transcript import BatchTranscriptItem, BatchTranscriptRequest, ErrorResponse
+from app.services.deadline import deadline_scope, parse_timeout
 from app.services.transcript_service import TranscriptService
 from app.utils.url_parser import extract_video_id
 
@@ -98,7 +104,7 @@ async def get_transcript(
     
     try:
         # Get the transcript
-        transcript, detected_lang, _ = await transcript_service.get_transcript(
+        transcript, detected_lang, metadata = await transcript_service.get_transcript(
             video_id=video_id,
             language=language,
             auto_generated=auto_generated
@@ -115,9 +121,13 @@ async def get_transcript(
         }
         
         logger.info(f"Successfully retrieved transcript for video {video_id}")
+        headers = {"X-Cache": metadata.get("cache", "miss").upper()}
+        if "cache_age" in metadata:
+            headers["Age"] = str(int(metadata["cache_age"]))
         return JSONResponse(
             content=response_data,
-            media_type="application/json"
+            media_type="application/json",
+            headers=headers
         )
         
     except HTTPException as he:
@@ -132,7 +142,8 @@ async def get_transcript(
         return JSONResponse(
             status_code=he.status_code,
             content=error_response,
-            media_type="application/json"
+            media_type="application/json",
+            headers=he.headers
         )
     except Exception as e:
         logger.exception(f"Unexpected error processing request: {str(e)}")
@@ -150,6 +161,129 @@ async def get_transcript(
             media_type="application/json"
         )
 
+async def _fetch_batch_item(
+    transcript_service: TranscriptService,
+    index: int,
+    item: BatchTranscriptItem,
+    batch: BatchTranscriptRequest,
+    budget: float
+) -> Dict[str, Any]:
+    """
+    Fetch one transcript of a batch and describe the outcome as one NDJSON record.
+    
+    Every item gets its own deadline of ``budget`` seconds, so a long batch is
+    not cut off by the deadline of the request that started it.
+    """
+    language = item.language or batch.language
+    auto_generated = item.auto_generated if item.auto_generated is not None else batch.auto_generated
+    record = {
+        "index": index,
+        "url": item.url,
+        "video_id": extract_video_id(item.url),
+        "language": language,
+        "auto_generated": auto_generated
+    }
+    start_time = time.monotonic()
+    try:
+        if not record["video_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ErrorResponse(error="invalid_url", message="Invalid YouTube URL or video ID").dict()
+            )
+        transcript_service.validate_language(language)
+        with deadline_scope(budget, replace=True):
+            transcript, detected_lang, metadata = await transcript_service.get_transcript(
+                video_id=record["video_id"],
+                language=language,
+                auto_generated=auto_generated
+            )
+        record.update({
+            "status": "success",
+            "status_code": 200,
+            "language": detected_lang or language,
+            "transcript": transcript,
+            "cache": metadata.get("cache", "miss")
+        })
+    except HTTPException as he:
+        record.update({
+            "status": "error",
+            "status_code": he.status_code,
+            "error": he.detail if isinstance(he.detail, dict) else {"error": "transcript_error", "message": str(he.detail)}
+        })
+        if he.headers and "Retry-After" in he.headers:
+            record["retry_after"] = int(he.headers["Retry-After"])
+    except Exception as e:
+        logger.exception(f"[BATCH] Unexpected error for item {index} ({item.url}): {str(e)}")
+        record.update({
+            "status": "error",
+            "status_code": 500,
+            "error": {"error": "internal_error", "message": str(e)}
+        })
+    record["elapsed"] = round(time.monotonic() - start_time, 3)
+    return record
+
+
+@json_api_router.post("/transcripts/batch")
+async def get_transcripts_batch(request: Request, batch: BatchTranscriptRequest):
+    """
+    Get transcripts for several videos in one request.
+    
+    Items are fetched concurrently, at most BATCH_CONCURRENCY (or the lower
+    ``concurrency`` of the request) at a time, and each result is streamed as one
+    NDJSON line as soon as it completes; ``index`` refers to the position of the
+    item in the request. A final line with a ``summary`` object closes the stream.
+    
+    Returns:
+        application/x-ndjson stream of per-item results
+    """
+    if not batch.items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(error="empty_batch", message="The batch contains no items").dict()
+        )
+    if len(batch.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                error="batch_too_large",
+                message=f"A batch may contain at most {settings.BATCH_MAX_ITEMS} items"
+            ).dict()
+        )
+    
+    concurrency = min(batch.concurrency or settings.BATCH_CONCURRENCY, settings.BATCH_CONCURRENCY)
+    budget = parse_timeout(request.headers.get("X-Request-Timeout") or request.query_params.get("timeout"))
+    logger.info(f"[BATCH] {len(batch.items)} items, concurrency {concurrency}, {budget:.0f}s per item")
+    transcript_service = TranscriptService()
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch(index: int, item: BatchTranscriptItem) -> Dict[str, Any]:
+        async with semaphore:
+            return await _fetch_batch_item(transcript_service, index, item, batch, budget)
+    
+    async def stream() -> AsyncIterator[str]:
+        start_time = time.monotonic()
+        tasks = [asyncio.ensure_future(fetch(index, item)) for index, item in enumerate(batch.items)]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                record = await next_done
+                succeeded += record["status"] == "success"
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        finally:
+            # The client went away; stop fetching transcripts nobody will read
+            for task in tasks:
+                task.cancel()
+        summary = {
+            "total": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
+            "elapsed": round(time.monotonic() - start_time, 3)
+        }
+        logger.info(f"[BATCH] Completed: {summary}")
+        yield json.dumps({"summary": summary}) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 def _format_success_response(
     transcript: str,
     video_id: str,
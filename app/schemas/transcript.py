@@ -2,7 +2,7 @@
 Pydantic models for transcript API responses and requests.
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -35,3 +35,26 @@ class TranscriptRequest(BaseModel):
     url: str
     language: str = "auto"
     auto_generated: bool = False
+
+
+class BatchTranscriptItem(BaseModel):
+    """One video in a batch transcript request; unset options fall back to the batch defaults."""
+    url: str
+    language: Optional[str] = None
+    auto_generated: Optional[bool] = None
+
+
+class BatchTranscriptRequest(BaseModel):
+    """Batch transcript request model."""
+    items: List[BatchTranscriptItem]
+    language: str = "auto"
+    auto_generated: bool = False
+    concurrency: Optional[int] = Field(None, ge=1, description="Transcripts fetched at once (capped by the server)")
+
+
+class HarvestJobRequest(BaseModel):
+    """Channel harvest job request model."""
+    channel_id: str
+    languages: List[str] = Field(default_factory=lambda: ["auto"])
+    auto_generated: bool = False
+    max_videos: int = Field(50, ge=1, description="Most recent videos to harvest (capped by the server)")
@@ -2,9 +2,29 @@
 Services package - contains business logic for the application.
 """
 
+from ..config import settings
 from .youtube import YouTubeService
 from .subtitles import SubtitleService
+from .transcript_cache import TranscriptCache
+from .single_flight import SingleFlight
+from .negative_cache import NegativeCache
+# Load the channel helpers module now: importing it later would rebind the
+# package attribute ``youtube_service`` from the instance below to the module.
+from . import youtube_service as _youtube_service_module  # noqa: F401
 
 # Initialize services
 youtube_service = YouTubeService()
 subtitle_service = SubtitleService()
+transcript_cache = TranscriptCache(
+    settings.TRANSCRIPT_CACHE_PATH,
+    ttl=settings.TRANSCRIPT_CACHE_TTL,
+    max_bytes=settings.TRANSCRIPT_CACHE_MAX_BYTES,
+    stale_ttl=max(settings.TRANSCRIPT_CACHE_STALE_WHILE_REVALIDATE, settings.TRANSCRIPT_CACHE_STALE_IF_ERROR)
+) if settings.TRANSCRIPT_CACHE_ENABLED else None
+transcript_flight = SingleFlight("transcript")
+negative_cache = NegativeCache({
+    "unavailable": settings.NEGATIVE_CACHE_TTL_UNAVAILABLE,
+    "private": settings.NEGATIVE_CACHE_TTL_PRIVATE,
+    "disabled": settings.NEGATIVE_CACHE_TTL_DISABLED,
+    "no_transcript": settings.NEGATIVE_CACHE_TTL_NO_TRANSCRIPT
+}) if settings.NEGATIVE_CACHE_ENABLED else None
@@ -0,0 +1,71 @@
+"""
+Latency and outcome counters for subtitle retrieval backends.
+"""
+
+import statistics
+import threading
+from collections import deque
+from typing import Any, Dict
+
+
+class BackendStats:
+    """Per-backend attempt, win and latency counters."""
+
+    def __init__(self, window: int = 100):
+        """
+        Initialize the counters.
+
+        Args:
+            window: Number of recent attempts per backend used for rolling figures
+        """
+        self.window = window
+        self._backends: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _backend(self, backend: str) -> Dict[str, Any]:
+        entry = self._backends.get(backend)
+        if entry is None:
+            entry = {
+                "attempts": 0,
+                "successes": 0,
+                "failures": 0,
+                "wins": 0,
+                "total_latency": 0.0,
+                "last_latency": None,
+                "recent": deque(maxlen=self.window)
+            }
+            self._backends[backend] = entry
+        return entry
+
+    def record(self, backend: str, latency: float, success: bool) -> None:
+        """Record one finished attempt of a backend."""
+        with self._lock:
+            entry = self._backend(backend)
+            entry["attempts"] += 1
+            entry["successes" if success else "failures"] += 1
+            entry["total_latency"] += latency
+            entry["last_latency"] = latency
+            entry["recent"].append((success, latency))
+
+    def record_win(self, backend: str) -> None:
+        """Record that a backend produced the transcript returned to the client."""
+        with self._lock:
+            self._backend(backend)["wins"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a JSON-serializable copy of all counters."""
+        with self._lock:
+            result = {}
+            for backend, entry in self._backends.items():
+                recent = list(entry["recent"])
+                result[backend] = {
+                    "attempts": entry["attempts"],
+                    "successes": entry["successes"],
+                    "failures": entry["failures"],
+                    "wins": entry["wins"],
+                    "avg_latency": entry["total_latency"] / entry["attempts"] if entry["attempts"] else None,
+                    "last_latency": entry["last_latency"],
+                    "p50_latency": statistics.median(l for _, l in recent) if recent else None,
+                    "success_rate": sum(1 for ok, _ in recent if ok) / len(recent) if recent else None
+                }
+            return result
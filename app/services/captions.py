@@ -0,0 +1,163 @@
+"""
+In-memory parsers for YouTube caption files.
+
+YouTube serves the same track as json3, srv3 (timedtext XML) or WebVTT. json3 and
+srv3 are preferred: they carry each line once, without the rolling duplicates and
+inline timing tags of auto-generated VTT, and json3 decodes in a single json.loads.
+"""
+
+import json
+import re
+import xml.etree.ElementTree as ET
+from html import unescape
+from typing import Dict, List, Any, Union
+
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+def _vtt_timestamp(value: str) -> float:
+    """Convert a VTT timestamp (HH:MM:SS.mmm or MM:SS.mmm) to seconds."""
+    parts = value.replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    if len(parts) > 1:
+        seconds += int(parts[-2]) * 60
+    if len(parts) > 2:
+        seconds += int(parts[-3]) * 3600
+    return seconds
+
+
+def parse_json3(content: Union[str, bytes]) -> List[Dict[str, Any]]:
+    """
+    Parse YouTube json3 captions into segments with one JSON decode.
+
+    Args:
+        content: json3 document
+
+    Returns:
+        List of segments with start, duration (in seconds) and text
+    """
+    segments = []
+    for event in json.loads(content).get("events", ()):
+        segs = event.get("segs")
+        if not segs:
+            continue
+        text = "".join(seg.get("utf8", "") for seg in segs).strip()
+        if not text:
+            # Auto-generated captions use "\n" append events as line breaks
+            continue
+        segments.append({
+            "start": event.get("tStartMs", 0) / 1000,
+            "duration": event.get("dDurationMs", 0) / 1000,
+            "text": text
+        })
+    return segments
+
+
+def parse_timedtext_xml(content: Union[str, bytes]) -> List[Dict[str, Any]]:
+    """
+    Parse timedtext XML captions (srv3 ``<p t= d=>`` or srv1 ``<text start= dur=>``).
+
+    Args:
+        content: XML document
+
+    Returns:
+        List of segments with start, duration (in seconds) and text
+    """
+    segments = []
+    for element in ET.fromstring(content).iter():
+        if element.tag == "p":
+            start = int(element.get("t", 0)) / 1000
+            duration = int(element.get("d", 0)) / 1000
+        elif element.tag == "text":
+            start = float(element.get("start", 0))
+            duration = float(element.get("dur", 0))
+        else:
+            continue
+        text = "".join(element.itertext()).strip()
+        if element.tag == "text":
+            # srv1 escapes markup inside the already escaped XML text
+            text = unescape(text)
+        if text:
+            segments.append({"start": start, "duration": duration, "text": text})
+    return segments
+
+
+def parse_vtt(content: str) -> List[Dict[str, Any]]:
+    """
+    Parse WebVTT captions into segments in a single pass.
+
+    Inline timing tags (``<00:00:01.000><c>``) are stripped, and the rolling
+    lines that YouTube repeats from the previous cue in auto-generated captions
+    are dropped.
+
+    Args:
+        content: VTT file content
+
+    Returns:
+        List of segments with start, duration (in seconds) and text
+    """
+    segments = []
+    last_line = None
+    start = end = 0.0
+    lines: List[str] = []
+    in_cue = False
+
+    for raw_line in content.splitlines():
+        if '-->' in raw_line:
+            begin, _, rest = raw_line.partition('-->')
+            start = _vtt_timestamp(begin.strip())
+            end = _vtt_timestamp(rest.split()[0])
+            lines = []
+            in_cue = True
+            continue
+        if not in_cue:
+            # Header, NOTE blocks and cue identifiers
+            continue
+        if not raw_line:
+            # An empty line ends the cue; whitespace-only lines inside cues are just skipped
+            if lines:
+                segments.append({"start": start, "duration": round(end - start, 3), "text": "\n".join(lines)})
+            in_cue = False
+            continue
+        line = _TAG_RE.sub('', raw_line).strip() if '<' in raw_line else raw_line.strip()
+        if not line or line == last_line:
+            continue
+        lines.append(line)
+        last_line = line
+
+    if in_cue and lines:
+        segments.append({"start": start, "duration": round(end - start, 3), "text": "\n".join(lines)})
+    return segments
+
+
+_PARSERS = {
+    "json3": parse_json3,
+    "srv3": parse_timedtext_xml,
+    "srv2": parse_timedtext_xml,
+    "srv1": parse_timedtext_xml,
+    "vtt": parse_vtt,
+}
+
+
+def parse_captions(content: Union[str, bytes], ext: str) -> List[Dict[str, Any]]:
+    """
+    Parse captions in any supported format.
+
+    Args:
+        content: Caption document as text or raw bytes
+        ext: Format name as used by YouTube and yt-dlp (json3, srv3, srv1, vtt)
+
+    Returns:
+        List of segments with start, duration (in seconds) and text
+    """
+    parser = _PARSERS.get(ext)
+    if parser is None:
+        raise ValueError(f"Unsupported caption format: {ext}")
+    if parser is parse_vtt and isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    return parser(content)
+
+
+def segments_to_text(segments: List[Dict[str, Any]]) -> str:
+    """Join segment texts with newlines, like TextFormatter does for youtube-transcript-api."""
+    return "\n".join(segment["text"] for segment in segments)
@@ -0,0 +1,235 @@
+"""
+Cursor pagination over a channel's uploads.
+
+The /videos tab of a channel shows about 30 uploads; the rest are loaded with
+InnerTube continuation tokens, one grid page per token. A cursor records the
+token of the grid page to resume from and how many of its videos were already
+returned, so every request fetches at most the grid pages it needs and the
+server keeps no state between pages. A first page served from another source
+(the RSS feed, which also lists Shorts) records the IDs it returned instead,
+and the next page resumes after the last of them found on the /videos tab.
+Cursors are opaque to clients (URL-safe base64 of a small JSON object).
+"""
+
+import base64
+import binascii
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.page_data import extract_initial_data, renderer_text, walk_renderers
+from .http_session import youtube_get, youtube_post
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_VIDEOS_URL = "https://www.youtube.com/channel/{channel_id}/videos"
+BROWSE_URL = "https://www.youtube.com/youtubei/v1/browse"
+
+# Used when the page does not expose its own client version
+DEFAULT_CLIENT_VERSION = "2.20250519.01.00"
+
+_API_KEY_PATTERN = re.compile(r'"INNERTUBE_API_KEY":"([^"]+)"')
+_CLIENT_VERSION_PATTERN = re.compile(r'"INNERTUBE_CLIENT_VERSION":"([^"]+)"')
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or belongs to another channel."""
+
+
+def encode_cursor(channel_id: str, token: Optional[str], skip: int, api_key: Optional[str] = None,
+                  client_version: Optional[str] = None, after: Optional[List[str]] = None) -> str:
+    """
+    Build an opaque cursor.
+
+    Args:
+        channel_id: Channel the cursor belongs to
+        token: Continuation token of the grid page to resume from; None for the first page
+        skip: Videos of that grid page already returned
+        api_key: InnerTube API key of the channel page, if known
+        client_version: InnerTube client version of the channel page, if known
+        after: IDs of videos already returned from another source; the walk
+            resumes after the last of them on the first grid page
+    """
+    state = {"c": channel_id, "t": token, "s": skip, "k": api_key, "v": client_version}
+    if after:
+        state["a"] = list(after)
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, channel_id: str) -> Dict[str, Any]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded or was issued for another channel
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(state, dict) or not isinstance(state.get("s"), int) or state["s"] < 0:
+        raise InvalidCursor("Malformed cursor")
+    after = state.get("a")
+    if after is not None and (not isinstance(after, list) or not all(isinstance(video_id, str) for video_id in after)):
+        raise InvalidCursor("Malformed cursor")
+    if state.get("c") != channel_id:
+        raise InvalidCursor("Cursor belongs to another channel")
+    return state
+
+
+def video_from_renderer(renderer: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a videoRenderer into the video dictionary returned by the API."""
+    thumbnails = (renderer.get("thumbnail") or {}).get("thumbnails") or []
+    return {
+        "video_id": renderer["videoId"],
+        "title": renderer_text(renderer.get("title"), "Без названия"),
+        "duration": renderer_text(renderer.get("lengthText"), "N/A"),
+        "published_time": renderer_text(renderer.get("publishedTimeText")),
+        "view_count": renderer_text(renderer.get("viewCountText"), "N/A"),
+        "thumbnail": thumbnails[-1]["url"] if thumbnails else ""
+    }
+
+
+def parse_grid_page(data: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Extract the videos of one grid page and the token of the next one.
+
+    Works on both the ytInitialData of the /videos tab and InnerTube browse
+    continuation responses.
+
+    Returns:
+        Tuple of (videos, continuation token or None on the last page)
+    """
+    videos = []
+    token = None
+    for name, renderer in walk_renderers(data, ("videoRenderer", "continuationItemRenderer")):
+        if name == "videoRenderer":
+            if renderer.get("videoId"):
+                videos.append(video_from_renderer(renderer))
+        else:
+            command = (renderer.get("continuationEndpoint") or {}).get("continuationCommand") or {}
+            token = command.get("token") or token
+    return videos, token
+
+
+def fetch_first_page(channel_id: str) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str], Optional[str]]:
+    """
+    Fetch the /videos tab of a channel.
+
+    Returns:
+        Tuple of (videos, continuation token, InnerTube API key, client version)
+
+    Raises:
+        requests.HTTPError: If the page cannot be fetched
+        ValueError: If the page has no ytInitialData
+    """
+    response = youtube_get(CHANNEL_VIDEOS_URL.format(channel_id=channel_id))
+    response.raise_for_status()
+    html = response.text
+    data = extract_initial_data(html)
+    if data is None:
+        raise ValueError(f"No ytInitialData on the videos page of channel {channel_id}")
+    api_key = _API_KEY_PATTERN.search(html)
+    client_version = _CLIENT_VERSION_PATTERN.search(html)
+    videos, token = parse_grid_page(data)
+    return (
+        videos, token,
+        api_key.group(1) if api_key else None,
+        client_version.group(1) if client_version else None
+    )
+
+
+def fetch_continuation(token: str, api_key: Optional[str], client_version: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch the grid page behind a continuation token from the InnerTube browse API.
+
+    Returns:
+        Tuple of (videos, next continuation token)
+    """
+    params = {"prettyPrint": "false"}
+    if api_key:
+        params["key"] = api_key
+    payload = {
+        "context": {"client": {"clientName": "WEB", "clientVersion": client_version or DEFAULT_CLIENT_VERSION, "hl": "en"}},
+        "continuation": token
+    }
+    response = youtube_post(BROWSE_URL, params=params, json=payload)
+    response.raise_for_status()
+    return parse_grid_page(response.json())
+
+
+def iter_channel_videos(channel_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Walk a channel's uploads newest first, fetching grid pages only as they are consumed.
+
+    Blocking. Every grid page is a separate youtube_get/youtube_post, so each
+    one takes a rate governor token, is checked for throttling and respects
+    the request deadline; stop iterating and later pages are never requested.
+
+    Raises:
+        DeadlineExceeded: If the request deadline passes before the next page can be fetched
+    """
+    items, token, api_key, client_version = fetch_first_page(channel_id)
+    while True:
+        yield from items
+        if not token:
+            return
+        items, next_token = fetch_continuation(token, api_key, client_version)
+        token = next_token if next_token != token else None
+
+
+def get_channel_videos_page(channel_id: str, page_size: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return one page of a channel's uploads, newest first.
+
+    Blocking; run it through run_blocking. Only the grid pages covering the
+    requested page are fetched, and only one of them is held at a time.
+
+    Args:
+        channel_id: YouTube channel ID
+        page_size: Videos per page
+        cursor: Cursor returned with the previous page; None for the first page
+
+    Returns:
+        Dictionary with videos and next_cursor (None after the last page)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or belongs to another channel
+    """
+    state = decode_cursor(cursor, channel_id) if cursor else {"t": None, "s": 0, "k": None, "v": None}
+    page_token, skip = state["t"], state["s"]
+    api_key, client_version = state.get("k"), state.get("v")
+
+    if page_token is None:
+        items, token, page_key, page_version = fetch_first_page(channel_id)
+        api_key, client_version = api_key or page_key, client_version or page_version
+        if state.get("a"):
+            # Resume after the newest-first page that came from another source
+            seen = set(state["a"])
+            skip = max((index + 1 for index, item in enumerate(items) if item["video_id"] in seen), default=0)
+    else:
+        items, token = fetch_continuation(page_token, api_key, client_version)
+
+    videos: List[Dict[str, Any]] = []
+    next_cursor = None
+    while True:
+        taken = items[skip:skip + page_size - len(videos)]
+        videos.extend(taken)
+        skip += len(taken)
+        if len(videos) >= page_size:
+            if skip < len(items):
+                next_cursor = encode_cursor(channel_id, page_token, skip, api_key, client_version)
+            elif token:
+                next_cursor = encode_cursor(channel_id, token, 0, api_key, client_version)
+            break
+        if not token or token == page_token:
+            break
+        # A skip past this grid page (a deep first page from yt-dlp) carries over to the next one
+        page_token, skip = token, max(skip - len(items), 0)
+        items, token = fetch_continuation(page_token, api_key, client_version)
+
+    logger.info(f"Fetched a page of {len(videos)} videos for channel {channel_id}, more: {next_cursor is not None}")
+    return {"videos": videos, "next_cursor": next_cursor}
@@ -0,0 +1,248 @@
+"""
+Resolve a channel from several alias queries.
+
+The alias queries (e.g. a name in Hebrew, English and Russian) are searched
+concurrently, the candidates are scored across all result lists and the winner
+is kept in SQLite for CHANNEL_RESOLVE_TTL, so later lookups are a single
+primary-key read. Concurrent resolutions of the same name share one search.
+Async callers read and write the table on the disk executor.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from ..config import settings
+from .executor import run_disk_io
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+SearchFunc = Callable[..., Awaitable[Dict[str, Any]]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resolved_channels (
+    name TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    title TEXT,
+    url TEXT,
+    score REAL NOT NULL,
+    resolved_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def score_candidates(results: Sequence[Dict[str, Any]], keywords: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    Rank the channels found by several searches.
+
+    A channel earns a point for every query that found it, plus up to one more
+    for its rank in that query's results, plus two if its title contains any of
+    the keywords.
+
+    Args:
+        results: Search results (``{"status", "results"}``), one per alias query
+        keywords: Words that mark the wanted channel in a title
+
+    Returns:
+        Candidates best first, each with channel_id, title, url, score and hits
+    """
+    keywords = [keyword.lower() for keyword in keywords]
+    candidates: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        if result.get("status") != "success":
+            continue
+        channels = result.get("results") or []
+        for rank, channel in enumerate(channels):
+            candidate = candidates.setdefault(channel["channel_id"], {
+                "channel_id": channel["channel_id"],
+                "title": channel.get("title", ""),
+                "url": channel.get("url") or f"https://www.youtube.com/channel/{channel['channel_id']}",
+                "score": 0.0,
+                "hits": 0
+            })
+            candidate["hits"] += 1
+            candidate["score"] += 1 + (len(channels) - rank) / len(channels)
+    for candidate in candidates.values():
+        if any(keyword in candidate["title"].lower() for keyword in keywords):
+            candidate["score"] += 2
+    # sorted is stable, so ties keep the order in which channels were first found
+    return sorted(candidates.values(), key=lambda candidate: candidate["score"], reverse=True)
+
+
+class ChannelResolver:
+    """Finds a channel from alias queries once and remembers the answer."""
+
+    def __init__(self, path: str, search: SearchFunc, ttl: float = 30 * 24 * 3600, max_results: int = 5):
+        """
+        Initialize the resolver.
+
+        Args:
+            path: Path to the SQLite database file
+            search: Async channel search, called as ``search(query, max_results=...)``
+            ttl: Seconds a resolved channel is trusted
+            max_results: Results requested per alias query
+        """
+        self.path = path
+        self.search = search
+        self.ttl = ttl
+        self.max_results = max_results
+        self._flight = SingleFlight("channel_resolve")
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the stored resolution of a name, expired or not, or None."""
+        row = self._connect().execute("SELECT * FROM resolved_channels WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    async def fresh(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the stored resolution of a name if it has not expired, without searching."""
+        stored = await run_disk_io(self.lookup, name)
+        if stored and stored["expires_at"] > time.time():
+            return {**stored, "cached": True}
+        return None
+
+    def forget(self, name: str) -> None:
+        """Drop the stored resolution of a name."""
+        self._connect().execute("DELETE FROM resolved_channels WHERE name = ?", (name,))
+
+    def _store(self, name: str, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a winning candidate and return the stored row."""
+        now = time.time()
+        self._connect().execute(
+            """
+            INSERT OR REPLACE INTO resolved_channels (name, channel_id, title, url, score, resolved_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (name, candidate["channel_id"], candidate["title"], candidate["url"], candidate["score"], now, now + self.ttl)
+        )
+        return self.lookup(name)
+
+    async def resolve(
+        self,
+        name: str,
+        queries: Sequence[str],
+        keywords: Iterable[str] = (),
+        refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the channel a name refers to.
+
+        Args:
+            name: Stable key of the resolution, e.g. ``rabbi-ginsburgh``
+            queries: Alias queries searched concurrently on a miss
+            keywords: Words that mark the wanted channel in a title
+            refresh: Search again even if a fresh resolution is stored
+
+        Returns:
+            Dictionary with channel_id, title, url, score, resolved_at, expires_at
+            and cached (served from the store without searching), or None if no
+            query found a channel and nothing was stored before
+        """
+        stored = await run_disk_io(self.lookup, name)
+        if stored and not refresh and stored["expires_at"] > time.time():
+            return {**stored, "cached": True}
+
+        keywords = list(keywords)
+        resolved = await self._flight.do(name, lambda: self._search_and_store(name, queries, keywords))
+        if resolved is None and stored:
+            # Searches failed or found nothing: an old answer beats none
+            logger.warning(f"[RESOLVE] {name}: no candidates, serving the stored resolution")
+            return {**stored, "cached": True}
+        return resolved
+
+    def resolve_blocking(
+        self,
+        name: str,
+        queries: Sequence[str],
+        search: Callable[..., Dict[str, Any]],
+        keywords: Iterable[str] = (),
+        refresh: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Blocking variant of resolve for scripts and worker threads.
+
+        The alias queries run one after another; the answer is read from and
+        stored in the same table as resolve's.
+
+        Args:
+            name: Stable key of the resolution
+            queries: Alias queries searched on a miss
+            search: Blocking channel search, called as ``search(query, max_results=...)``
+            keywords: Words that mark the wanted channel in a title
+            refresh: Search again even if a fresh resolution is stored
+        """
+        stored = self.lookup(name)
+        if stored and not refresh and stored["expires_at"] > time.time():
+            return {**stored, "cached": True}
+
+        results = [search(query, max_results=self.max_results) for query in queries]
+        best = self._best(name, queries, results, list(keywords))
+        if best is None:
+            if stored:
+                logger.warning(f"[RESOLVE] {name}: no candidates, serving the stored resolution")
+                return {**stored, "cached": True}
+            return None
+        return {**self._store(name, best), "cached": False}
+
+    def _best(
+        self,
+        name: str,
+        queries: Sequence[str],
+        results: Sequence[Any],
+        keywords: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Score the candidates of the search results (failed searches are skipped) and return the winner."""
+        candidates = score_candidates([result for result in results if isinstance(result, dict)], keywords)
+        logger.info(
+            f"[RESOLVE] {name}: {len(queries)} queries, {len(candidates)} candidates, "
+            f"best: {candidates[0]['channel_id'] if candidates else None}"
+        )
+        return candidates[0] if candidates else None
+
+    async def _search_and_store(self, name: str, queries: Sequence[str], keywords: List[str]) -> Optional[Dict[str, Any]]:
+        """Run the alias queries concurrently, score the candidates and store the winner."""
+        results = await asyncio.gather(
+            *(self.search(query, max_results=self.max_results) for query in queries),
+            return_exceptions=True
+        )
+        best = self._best(name, queries, results, keywords)
+        if best is None:
+            return None
+        return {**await run_disk_io(self._store, name, best), "cached": False}
+
+
+_resolver: Optional[ChannelResolver] = None
+
+
+def get_channel_resolver() -> ChannelResolver:
+    """Return the shared channel resolver, creating it on first use."""
+    global _resolver
+    if _resolver is None:
+        # Imported here because youtube_search resolves its channels through this module
+        from .youtube_search import YouTubeSearcher
+        _resolver = ChannelResolver(
+            settings.CHANNEL_DB_PATH,
+            YouTubeSearcher.search_channels_async,
+            ttl=settings.CHANNEL_RESOLVE_TTL
+        )
+    return _resolver
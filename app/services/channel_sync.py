@@ -0,0 +1,199 @@
+"""
+Incremental channel sync.
+
+For every subscriber and channel the newest video IDs and the newest publish
+time that subscriber was sent are kept in SQLite. A sync walks the upload
+listing newest first and stops at the first video it already knows, so polling
+a channel without new uploads costs one listing page instead of the whole
+/videos page. Every listing page is fetched within the outbound rate budget.
+State is per subscriber: one client's sync never advances the watermark of
+another.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..config import settings
+from .deadline import DeadlineExceeded, remaining
+from .channel_pages import iter_channel_videos
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_sync (
+    subscriber TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    newest_video_id TEXT NOT NULL,
+    newest_published TEXT,
+    known_ids TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (subscriber, channel_id)
+);
+"""
+
+
+class ChannelSync:
+    """Remembers the newest uploads per subscriber and channel and returns only what is new since the last sync."""
+
+    def __init__(
+        self,
+        path: str,
+        list_videos: Callable[[str], Iterable[Dict[str, Any]]],
+        known_ids: int = 50,
+        max_new: int = 200
+    ):
+        """
+        Initialize the sync state.
+
+        Args:
+            path: Path to the SQLite database file
+            list_videos: Returns a channel's videos newest first, lazily
+            known_ids: Newest video IDs remembered per subscriber and channel; more than one, so
+                a deleted or privated newest video does not hide the boundary
+            max_new: Most new videos returned by one sync
+        """
+        self.path = path
+        self.list_videos = list_videos
+        self.known_ids = known_ids
+        self.max_new = max_new
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        # State from before subscribers was shared by all clients and cannot be attributed; start over
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(channel_sync)")}
+        if columns and "subscriber" not in columns:
+            conn.execute("DROP TABLE channel_sync")
+        conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def state(self, subscriber: str, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Return what a subscriber has seen of a channel, or None if it never synced it."""
+        row = self._connect().execute(
+            "SELECT * FROM channel_sync WHERE subscriber = ? AND channel_id = ?", (subscriber, channel_id)
+        ).fetchone()
+        if row is None:
+            return None
+        state = dict(row)
+        state["known_ids"] = json.loads(state["known_ids"])
+        return state
+
+    def reset(self, subscriber: str, channel_id: str) -> None:
+        """Forget a subscriber's state of a channel, so its next sync starts from scratch."""
+        self._connect().execute(
+            "DELETE FROM channel_sync WHERE subscriber = ? AND channel_id = ?", (subscriber, channel_id)
+        )
+
+    def sync(self, subscriber: str, channel_id: str, initial: int = 10) -> Dict[str, Any]:
+        """
+        Return the videos uploaded since the subscriber's previous sync of a channel.
+
+        Blocking; run it through run_blocking.
+
+        Args:
+            subscriber: Client-chosen ID that owns the sync state
+            channel_id: YouTube channel ID
+            initial: Videos returned by the first sync of a channel
+
+        Returns:
+            Dictionary with new_videos (newest first), first_sync, truncated (the
+            limit was reached before known content), newest_video_id,
+            newest_published and previous_sync_at
+        """
+        state = self.state(subscriber, channel_id)
+        known = set(state["known_ids"]) if state else set()
+        newest_published = state["newest_published"] if state else None
+        limit = initial if state is None else self.max_new
+
+        new_videos: List[Dict[str, Any]] = []
+        reached_known = False
+        for video in self.list_videos(channel_id):
+            published = video.get("published_time") or None
+            # Stop at the first known video, or at anything older than the newest one seen
+            if video["video_id"] in known or (published and newest_published and published < newest_published):
+                reached_known = True
+                break
+            if len(new_videos) >= limit:
+                break
+            new_videos.append(video)
+
+        # A caller that has already given up would never see the delta; keep it for the next sync
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded()
+
+        if new_videos:
+            ids = [video["video_id"] for video in new_videos]
+            ids += [video_id for video_id in (state["known_ids"] if state else []) if video_id not in ids]
+            published_times = [video["published_time"] for video in new_videos if video.get("published_time")]
+            if newest_published:
+                published_times.append(newest_published)
+            self._connect().execute(
+                """
+                INSERT OR REPLACE INTO channel_sync
+                    (subscriber, channel_id, newest_video_id, newest_published, known_ids, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    subscriber, channel_id, ids[0], max(published_times) if published_times else None,
+                    json.dumps(ids[:self.known_ids]), time.time()
+                )
+            )
+        elif state:
+            self._connect().execute(
+                "UPDATE channel_sync SET synced_at = ? WHERE subscriber = ? AND channel_id = ?",
+                (time.time(), subscriber, channel_id)
+            )
+
+        truncated = state is not None and not reached_known and len(new_videos) >= limit
+        logger.info(
+            f"[SYNC] Channel {channel_id} for {subscriber}: {len(new_videos)} new video(s), "
+            f"first sync: {state is None}, truncated: {truncated}"
+        )
+        current = self.state(subscriber, channel_id)
+        return {
+            "new_videos": new_videos,
+            "first_sync": state is None,
+            "truncated": truncated,
+            "newest_video_id": current["newest_video_id"] if current else None,
+            "newest_published": current["newest_published"] if current else None,
+            "previous_sync_at": state["synced_at"] if state else None
+        }
+
+
+def _list_uploads(channel_id: str) -> Iterable[Dict[str, Any]]:
+    """List a channel's uploads for syncing, page by page from the /videos grid."""
+    for video in iter_channel_videos(channel_id):
+        # The grid only has relative times ("3 days ago"), which do not order; compare IDs only
+        yield {**video, "published_time": ""}
+
+
+_channel_sync: Optional[ChannelSync] = None
+
+
+def get_channel_sync() -> ChannelSync:
+    """Return the shared channel sync state, creating it on first use."""
+    global _channel_sync
+    if _channel_sync is None:
+        _channel_sync = ChannelSync(
+            settings.CHANNEL_DB_PATH,
+            _list_uploads,
+            known_ids=settings.CHANNEL_SYNC_KNOWN_IDS,
+            max_new=settings.CHANNEL_SYNC_MAX_NEW
+        )
+    return _channel_sync
@@ -0,0 +1,111 @@
+"""
+Circuit breakers for the subtitle retrieval backends.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probes.
+
+    The breaker opens after ``failure_threshold`` consecutive failures. While open,
+    calls are refused until ``reset_timeout`` seconds have passed; then up to
+    ``half_open_probes`` calls are let through. A successful probe closes the
+    breaker, a failed one opens it again for another ``reset_timeout``.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_probes: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"[CIRCUIT] {self.name}: half-open, letting a probe through")
+        return self._state
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        Ask whether a call may go through.
+
+        In the half-open state this takes one of the probe slots; the caller must
+        report the outcome with record_success, record_failure or release.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """Report a healthy call; closes a half-open breaker."""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"[CIRCUIT] {self.name}: probe succeeded, closing")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        """Report a failed call; opens the breaker at the threshold or after a failed probe."""
+        with self._lock:
+            self._consecutive_failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                logger.warning(
+                    f"[CIRCUIT] {self.name}: opening after {self._consecutive_failures} consecutive failures"
+                )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes_in_flight = 0
+                self._times_opened += 1
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the breaker."""
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0) if state == OPEN else None,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected
+            }
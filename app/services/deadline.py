@@ -0,0 +1,112 @@
+"""
+End-to-end request deadlines.
+
+Each API request gets a time budget, from the X-Request-Timeout header or the
+``timeout`` query parameter, or REQUEST_TIMEOUT_DEFAULT. The absolute deadline
+travels in the ``current_deadline`` context variable (run_blocking carries it
+into executor threads), so every backend attempt can stop waiting when the
+client would no longer read the answer, and outbound HTTP timeouts never run
+past it.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from ..config import settings
+
+T = TypeVar("T")
+
+# time.monotonic() value by which the current request must be answered, if any
+current_deadline: ContextVar[Optional[float]] = ContextVar("current_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out."""
+
+    def __init__(self, message: str = "Request deadline exceeded"):
+        super().__init__(message)
+
+
+def parse_timeout(value: Optional[str]) -> float:
+    """
+    Turn a client-supplied timeout into a request budget.
+
+    Args:
+        value: Seconds as sent by the client, or None
+
+    Returns:
+        The budget in seconds, REQUEST_TIMEOUT_DEFAULT for missing or malformed
+        values, and never more than REQUEST_TIMEOUT_MAX
+    """
+    try:
+        seconds = float(value) if value is not None else settings.REQUEST_TIMEOUT_DEFAULT
+    except ValueError:
+        seconds = settings.REQUEST_TIMEOUT_DEFAULT
+    if seconds <= 0:
+        seconds = settings.REQUEST_TIMEOUT_DEFAULT
+    return min(seconds, settings.REQUEST_TIMEOUT_MAX)
+
+
+@contextmanager
+def deadline_scope(seconds: float, replace: bool = False) -> Iterator[float]:
+    """
+    Run the block with a deadline ``seconds`` from now (or the enclosing deadline, if earlier).
+
+    Args:
+        seconds: Time budget of the block
+        replace: Ignore the enclosing deadline (for work items that each get their own budget)
+
+    Yields:
+        The absolute deadline on the time.monotonic() clock
+    """
+    deadline = time.monotonic() + seconds
+    enclosing = current_deadline.get()
+    if enclosing is not None and not replace:
+        deadline = min(deadline, enclosing)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left until the current deadline, or None if there is none."""
+    deadline = current_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def http_timeout(timeout: float) -> float:
+    """
+    Clamp a per-request HTTP timeout to the current deadline.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(timeout, left)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """
+    Await with the current deadline; the awaitable is cancelled when it runs out.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(left, 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded() from None
@@ -0,0 +1,186 @@
+"""
+Dedicated thread pools for blocking YouTube and disk I/O.
+
+Everything that would otherwise block the event loop (youtube-transcript-api calls,
+yt-dlp extraction) runs on the upstream executor instead of on the default executor,
+so transcript fetches cannot starve other users of that pool. Local SQLite cache
+access runs on a small disk executor of its own, so a cache hit never queues behind
+slow network calls when YouTube fetches fill the upstream pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """Thread pool that tracks active, queued and completed tasks and their queue wait time."""
+
+    def __init__(self, name: str, max_workers: int, window: int = 500):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._recent_waits = deque(maxlen=window)
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        submitted_at = time.monotonic()
+        with self._stats_lock:
+            self._queued += 1
+
+        def run() -> Any:
+            wait = time.monotonic() - submitted_at
+            with self._stats_lock:
+                self._queued -= 1
+                self._active += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+                self._recent_waits.append(wait)
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                with self._stats_lock:
+                    self._active -= 1
+                    self._completed += 1
+                    if failed:
+                        self._failed += 1
+
+        try:
+            future = super().submit(run)
+        except Exception:
+            with self._stats_lock:
+                self._queued -= 1
+            raise
+        # Tasks cancelled before they started never run the wrapper
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            with self._stats_lock:
+                self._queued -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool's counters; wait times are in seconds."""
+        with self._stats_lock:
+            waits = list(self._recent_waits)
+            started = self._completed + self._active
+            if len(waits) >= 2:
+                p95_wait = statistics.quantiles(waits, n=20)[-1]
+            else:
+                p95_wait = waits[0] if waits else 0.0
+            return {
+                "name": self.name,
+                "max_workers": self._max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait": self._total_wait / started if started else 0.0,
+                "max_wait": self._max_wait,
+                "p50_wait": statistics.median(waits) if waits else 0.0,
+                "p95_wait": p95_wait
+            }
+
+
+_executor: Optional[InstrumentedExecutor] = None
+_disk_executor: Optional[InstrumentedExecutor] = None
+
+
+def get_upstream_executor() -> InstrumentedExecutor:
+    """Return the shared upstream executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = InstrumentedExecutor("youtube-io", max_workers=settings.UPSTREAM_EXECUTOR_WORKERS)
+        logger.info(f"[EXECUTOR] Upstream executor started with {settings.UPSTREAM_EXECUTOR_WORKERS} workers")
+    return _executor
+
+
+def get_disk_executor() -> InstrumentedExecutor:
+    """Return the shared disk executor for local SQLite access, creating it on first use."""
+    global _disk_executor
+    if _disk_executor is None:
+        _disk_executor = InstrumentedExecutor("disk-io", max_workers=settings.DISK_EXECUTOR_WORKERS)
+        logger.info(f"[EXECUTOR] Disk executor started with {settings.DISK_EXECUTOR_WORKERS} workers")
+    return _disk_executor
+
+
+async def _run_in(executor: InstrumentedExecutor, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function on the upstream executor without blocking the event loop.
+    
+    The caller's context variables (request priority, deadline) are visible to func.
+    
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The return value of func
+    """
+    return await _run_in(get_upstream_executor(), func, *args, **kwargs)
+
+
+async def run_disk_io(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking local disk or SQLite operation on the disk executor.
+    
+    Like run_blocking, but never waits behind YouTube calls; use it only for
+    work that does not leave the host.
+    
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The return value of func
+    """
+    return await _run_in(get_disk_executor(), func, *args, **kwargs)
+
+
+def shutdown_upstream_executor() -> None:
+    """Stop the upstream and disk executors; they are recreated on the next use."""
+    global _executor, _disk_executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _disk_executor is not None:
+        _disk_executor.shutdown(wait=False, cancel_futures=True)
+        _disk_executor = None
+
+
+def upstream_executor_stats() -> Dict[str, Any]:
+    """Return the upstream executor counters."""
+    return get_upstream_executor().stats()
+
+
+def disk_executor_stats() -> Dict[str, Any]:
+    """Return the disk executor counters."""
+    return get_disk_executor().stats()
@@ -0,0 +1,571 @@
+"""
+Server-side channel harvest jobs.
+
+A harvest job enumerates a channel's videos through the channel service and
+fetches a transcript for every (video, language) pair as batch-priority work.
+Each transcript is written to a JSON file and recorded in a SQLite manifest, so
+a job interrupted by a restart resumes where it stopped and never fetches a
+completed video twice. The manifest may be shared by several worker processes:
+a worker runs a job only while it holds the job's lease, which it renews as
+the job runs, so every job runs in exactly one process and is taken over when
+its owner dies. Manifest and transcript file I/O runs on the disk executor,
+never on the upstream pool that YouTube calls wait for.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from ..config import settings
+from .deadline import deadline_scope
+from .executor import run_disk_io
+from .scheduler import AdmissionRejected, BATCH, current_priority, get_upstream_scheduler
+from .transcript_service import TranscriptService
+from .youtube_service import YouTubeService as ChannelService
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS harvest_jobs (
+    job_id TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    languages TEXT NOT NULL,
+    auto_generated INTEGER NOT NULL,
+    max_videos INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    enumerated INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS harvest_items (
+    job_id TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    title TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    output_path TEXT,
+    completed_at REAL,
+    PRIMARY KEY (job_id, video_id, language)
+);
+"""
+
+# Job states; jobs in an active state are resumed on startup
+PENDING = "pending"
+ENUMERATING = "enumerating"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATES = (PENDING, ENUMERATING, RUNNING)
+
+# Item states
+ITEM_PENDING = "pending"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+
+class HarvestStore:
+    """SQLite manifest of harvest jobs and their per-video progress."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the manifest.
+
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        # Manifests created before job leases existed lack the lease columns
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(harvest_jobs)")}
+        if "owner" not in columns:
+            conn.execute("ALTER TABLE harvest_jobs ADD COLUMN owner TEXT")
+        if "lease_until" not in columns:
+            conn.execute("ALTER TABLE harvest_jobs ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def create_job(self, channel_id: str, languages: List[str], auto_generated: bool, max_videos: int) -> str:
+        """Record a new job and return its ID."""
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        self._connect().execute(
+            """
+            INSERT INTO harvest_jobs
+            (job_id, channel_id, languages, auto_generated, max_videos, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, channel_id, json.dumps(languages), int(auto_generated), max_videos, PENDING, now, now)
+        )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job with its item counts, or None if it does not exist."""
+        row = self._connect().execute("SELECT * FROM harvest_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["languages"] = json.loads(job["languages"])
+        job["auto_generated"] = bool(job["auto_generated"])
+        job["enumerated"] = bool(job["enumerated"])
+        counts = {ITEM_PENDING: 0, ITEM_DONE: 0, ITEM_FAILED: 0}
+        for status, count in self._connect().execute(
+            "SELECT status, COUNT(*) FROM harvest_items WHERE job_id = ? GROUP BY status", (job_id,)
+        ):
+            counts[status] = count
+        job["counts"] = counts
+        return job
+
+    def list_jobs(self, states: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """Return all jobs (optionally only those in the given states), newest first."""
+        rows = self._connect().execute("SELECT job_id, status FROM harvest_jobs ORDER BY created_at DESC").fetchall()
+        return [self.get_job(row["job_id"]) for row in rows if states is None or row["status"] in states]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Change the state of a job; a cancelled job stays cancelled."""
+        self._connect().execute(
+            "UPDATE harvest_jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status != ?",
+            (status, error, time.time(), job_id, CANCELLED)
+        )
+
+    def cancel_job(self, job_id: str) -> bool:
+        """
+        Mark an active job cancelled, whichever worker runs it.
+
+        Returns:
+            False if the job does not exist or is no longer active
+        """
+        return self._connect().execute(
+            f"""
+            UPDATE harvest_jobs SET status = ?, updated_at = ?
+            WHERE job_id = ? AND status IN ({", ".join("?" * len(ACTIVE_STATES))})
+            """,
+            (CANCELLED, time.time(), job_id, *ACTIVE_STATES)
+        ).rowcount == 1
+
+    def claim(self, job_id: str, owner: str, lease: float) -> bool:
+        """
+        Take the lease of an active job unless another live owner holds it.
+
+        Args:
+            job_id: Job to claim
+            owner: Identifier of the claiming process
+            lease: Seconds the lease is valid unless renewed
+
+        Returns:
+            True if the caller now owns the job
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            claimed = conn.execute(
+                f"""
+                UPDATE harvest_jobs SET owner = ?, lease_until = ?
+                WHERE job_id = ? AND status IN ({", ".join("?" * len(ACTIVE_STATES))})
+                AND (owner IS NULL OR owner = ? OR lease_until < ?)
+                """,
+                (owner, now + lease, job_id, *ACTIVE_STATES, owner, now)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return claimed
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Extend a lease held by owner; returns False if the job was taken over or is no longer active."""
+        return self._connect().execute(
+            f"""
+            UPDATE harvest_jobs SET lease_until = ?
+            WHERE job_id = ? AND owner = ? AND status IN ({", ".join("?" * len(ACTIVE_STATES))})
+            """,
+            (time.time() + lease, job_id, owner, *ACTIVE_STATES)
+        ).rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        """Give up a lease so any worker may claim the job right away."""
+        self._connect().execute(
+            "UPDATE harvest_jobs SET owner = NULL, lease_until = 0 WHERE job_id = ? AND owner = ?",
+            (job_id, owner)
+        )
+
+    def add_items(self, job_id: str, videos: List[Dict[str, Any]], languages: List[str]) -> None:
+        """Record the enumerated videos; items already in the manifest keep their state."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO harvest_items (job_id, video_id, language, title, status) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (job_id, video["video_id"], language, video.get("title"), ITEM_PENDING)
+                    for video in videos for language in languages
+                ]
+            )
+            conn.execute(
+                "UPDATE harvest_jobs SET enumerated = 1, updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def pending_items(self, job_id: str) -> List[Dict[str, Any]]:
+        """Return the items that still need a transcript, in enumeration order."""
+        rows = self._connect().execute(
+            "SELECT video_id, language, title, attempts FROM harvest_items "
+            "WHERE job_id = ? AND status = ? ORDER BY rowid",
+            (job_id, ITEM_PENDING)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def finish_item(
+        self,
+        job_id: str,
+        video_id: str,
+        language: str,
+        status: str,
+        error: Optional[str] = None,
+        output_path: Optional[str] = None
+    ) -> None:
+        """Record the outcome of one attempt; ITEM_PENDING leaves the item for a retry."""
+        self._connect().execute(
+            """
+            UPDATE harvest_items
+            SET status = ?, attempts = attempts + 1, error = ?, output_path = ?, completed_at = ?
+            WHERE job_id = ? AND video_id = ? AND language = ?
+            """,
+            (status, error, output_path, time.time() if status != ITEM_PENDING else None, job_id, video_id, language)
+        )
+
+
+class HarvestManager:
+    """Runs harvest jobs as background tasks and reports their progress."""
+
+    def __init__(self, store: HarvestStore, output_dir: str, concurrency: int, max_attempts: int, lease: float = 60.0):
+        """
+        Initialize the manager.
+
+        Args:
+            store: Job manifest
+            output_dir: Directory for transcript files (one subdirectory per channel)
+            concurrency: Transcripts fetched at once per job
+            max_attempts: Attempts per item before a transient failure becomes final
+            lease: Seconds a job stays owned by this process without a renewal
+        """
+        self.store = store
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.transcript_service = TranscriptService()
+        self.channel_service = ChannelService()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # Items finished by this process per job, for throughput: (run start, count)
+        self._runs: Dict[str, List[float]] = {}
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def create(self, channel_id: str, languages: List[str], auto_generated: bool, max_videos: int) -> str:
+        """Record a job and start it in the background."""
+        job_id = await run_disk_io(self.store.create_job, channel_id, languages, auto_generated, max_videos)
+        logger.info(f"[HARVEST] Created job {job_id} for channel {channel_id} ({', '.join(languages)})")
+        if await run_disk_io(self.store.claim, job_id, self.owner, self.lease):
+            self._start(job_id)
+        return job_id
+
+    def _start(self, job_id: str) -> None:
+        # Run in a fresh context so the job does not inherit the priority or
+        # deadline of the request that created it
+        self._runs[job_id] = [time.monotonic(), 0]
+        task = asyncio.get_running_loop().create_task(self._run(job_id), context=contextvars.Context())
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def resume(self) -> List[str]:
+        """
+        Restart the active jobs that no other worker holds a live lease on.
+
+        Returns:
+            IDs of the jobs started by this call
+        """
+        jobs = await run_disk_io(self.store.list_jobs, ACTIVE_STATES)
+        resumed = []
+        for job in jobs:
+            if job["job_id"] in self._tasks:
+                continue
+            if not await run_disk_io(self.store.claim, job["job_id"], self.owner, self.lease):
+                continue
+            logger.info(f"[HARVEST] Resuming job {job['job_id']} ({job['counts'][ITEM_DONE]} items done)")
+            self._start(job["job_id"])
+            resumed.append(job["job_id"])
+        return resumed
+
+    def watch(self) -> None:
+        """Resume jobs now and then take over every job whose owner stopped renewing its lease."""
+        if self._watcher is None:
+            self._watcher = asyncio.get_running_loop().create_task(self._watch(), context=contextvars.Context())
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                await self.resume()
+            except Exception as e:
+                logger.error(f"[HARVEST] Resuming jobs failed: {str(e)}")
+            await asyncio.sleep(self.lease)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        """Renew the lease of a running job; stop the job if it was cancelled or another worker took it over."""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not await run_disk_io(self.store.renew, job_id, self.owner, self.lease):
+                logger.warning(f"[HARVEST] Job {job_id} was cancelled or taken over, stopping it here")
+                task = self._tasks.get(job_id)
+                if task is not None:
+                    task.cancel()
+                return
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Stop a job, whichever worker runs it; returns False if it is not active.
+
+        The manifest is marked first, so no watcher can claim the job once its
+        lease is released. A job running in another worker stops at its next
+        lease renewal, within a third of the lease.
+        """
+        if not await run_disk_io(self.store.cancel_job, job_id):
+            return False
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        logger.info(f"[HARVEST] Cancelled job {job_id}")
+        return True
+
+    async def shutdown(self) -> None:
+        """Stop all running jobs, leaving them active in the manifest so they resume on the next start."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job_id: str) -> None:
+        current_priority.set(BATCH)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            await self._harvest(job_id)
+        finally:
+            heartbeat.cancel()
+            # Shielded so a cancelled job still hands its lease back
+            await asyncio.shield(run_disk_io(self.store.release, job_id, self.owner))
+
+    async def _harvest(self, job_id: str) -> None:
+        job = await run_disk_io(self.store.get_job, job_id)
+        try:
+            if not job["enumerated"]:
+                await run_disk_io(self.store.set_status, job_id, ENUMERATING)
+                try:
+                    async with get_upstream_scheduler().slot():
+                        videos = await self.channel_service.get_channel_videos(job["channel_id"], job["max_videos"])
+                except Exception as e:
+                    # Not enumerated yet: the job stays active and the watcher retries it after a lease period
+                    logger.warning(f"[HARVEST] Job {job_id}: listing channel {job['channel_id']} failed, will retry: {str(e)}")
+                    await run_disk_io(self.store.set_status, job_id, PENDING, f"Enumeration failed: {str(e)}")
+                    return
+                await run_disk_io(self.store.add_items, job_id, videos, job["languages"])
+                logger.info(f"[HARVEST] Job {job_id}: {len(videos)} videos in channel {job['channel_id']}")
+
+            await run_disk_io(self.store.set_status, job_id, RUNNING)
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(item: Dict[str, Any]) -> None:
+                async with semaphore:
+                    await self._fetch_item(job, item)
+
+            # Items with a transient failure stay pending and are retried in the next pass
+            while True:
+                items = [
+                    item for item in await run_disk_io(self.store.pending_items, job_id)
+                    if item["attempts"] < self.max_attempts
+                ]
+                if not items:
+                    break
+                await asyncio.gather(*(fetch(item) for item in items))
+
+            await run_disk_io(self.store.set_status, job_id, COMPLETED)
+            logger.info(f"[HARVEST] Job {job_id} completed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[HARVEST] Job {job_id} failed: {str(e)}", exc_info=True)
+            await run_disk_io(self.store.set_status, job_id, FAILED, str(e))
+
+    async def _fetch_item(self, job: Dict[str, Any], item: Dict[str, Any]) -> None:
+        """Fetch one transcript, write it to disk and record the outcome in the manifest."""
+        job_id, video_id, language = job["job_id"], item["video_id"], item["language"]
+        while True:
+            try:
+                with deadline_scope(settings.HARVEST_VIDEO_TIMEOUT, replace=True):
+                    transcript, detected_lang, _ = await self.transcript_service.get_transcript(
+                        video_id, language, job["auto_generated"]
+                    )
+                break
+            except AdmissionRejected as e:
+                # The server is busy with interactive work; wait for a slot instead of failing the item
+                await asyncio.sleep(e.retry_after)
+            except HTTPException as e:
+                message = json.dumps(e.detail, ensure_ascii=False) if isinstance(e.detail, dict) else str(e.detail)
+                # 404s are definitive; anything else is retried up to max_attempts
+                await self._fail_item(job_id, item, message, definitive=e.status_code == 404)
+                return
+            except Exception as e:
+                # Unmapped timeouts and the like fail this item only, never the whole job
+                await self._fail_item(job_id, item, str(e) or type(e).__name__)
+                return
+
+        try:
+            output_path = await run_disk_io(self._write_transcript, job, item, transcript, detected_lang)
+        except (OSError, ValueError) as e:
+            logger.error(f"[HARVEST] Job {job_id}: cannot save {video_id} ({language}): {str(e)}")
+            await self._fail_item(job_id, item, str(e))
+            return
+        await run_disk_io(self.store.finish_item, job_id, video_id, language, ITEM_DONE, None, output_path)
+        self._count(job_id, True)
+
+    async def _fail_item(self, job_id: str, item: Dict[str, Any], message: str, definitive: bool = False) -> None:
+        """Record a failed attempt; the item stays pending for a retry until max_attempts is reached."""
+        final = definitive or item["attempts"] + 1 >= self.max_attempts
+        await run_disk_io(
+            self.store.finish_item, job_id, item["video_id"], item["language"],
+            ITEM_FAILED if final else ITEM_PENDING, message
+        )
+        self._count(job_id, final)
+
+    def _count(self, job_id: str, finished: bool) -> None:
+        if finished and job_id in self._runs:
+            self._runs[job_id][1] += 1
+
+    def _write_transcript(
+        self,
+        job: Dict[str, Any],
+        item: Dict[str, Any],
+        transcript: str,
+        detected_lang: Optional[str]
+    ) -> str:
+        """
+        Write a transcript file and return its path.
+
+        Raises:
+            ValueError: If the file would land outside the output directory
+        """
+        root = os.path.realpath(self.output_dir)
+        directory = os.path.realpath(os.path.join(root, job["channel_id"]))
+        path = os.path.realpath(os.path.join(directory, f"{item['video_id']}_{item['language']}.json"))
+        if os.path.commonpath([root, path]) != root or os.path.dirname(path) != directory:
+            raise ValueError(f"Refusing to write outside {self.output_dir}: {path}")
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "video_id": item["video_id"],
+                "title": item["title"],
+                "url": f"https://www.youtube.com/watch?v={item['video_id']}",
+                "requested_language": item["language"],
+                "language": detected_lang or item["language"],
+                "auto_generated": job["auto_generated"],
+                "transcript": transcript,
+                "retrieved_at": datetime.utcnow().isoformat()
+            }, f, ensure_ascii=False, indent=2)
+        return path
+
+    async def progress(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe the progress of a job.
+
+        Returns:
+            Job state, item counts, throughput (items per minute finished by this
+            process since the job started or resumed) and ETA in seconds, or None
+            if the job does not exist
+        """
+        job = await run_disk_io(self.store.get_job, job_id)
+        if job is None:
+            return None
+        counts = job["counts"]
+        total = sum(counts.values())
+        finished = counts[ITEM_DONE] + counts[ITEM_FAILED]
+        remaining = counts[ITEM_PENDING]
+        throughput = None
+        eta = None
+        run = self._runs.get(job_id)
+        if run and run[1]:
+            elapsed = time.monotonic() - run[0]
+            throughput = run[1] / elapsed * 60 if elapsed > 0 else None
+            if throughput and job["status"] in ACTIVE_STATES:
+                eta = remaining / throughput * 60
+        return {
+            "job_id": job_id,
+            "channel_id": job["channel_id"],
+            "languages": job["languages"],
+            "auto_generated": job["auto_generated"],
+            "status": job["status"],
+            "error": job["error"],
+            "running": job_id in self._tasks,
+            "total": total if job["enumerated"] else None,
+            "done": counts[ITEM_DONE],
+            "failed": counts[ITEM_FAILED],
+            "pending": remaining,
+            "percent": round(finished / total * 100, 1) if total else 0.0,
+            "throughput_per_minute": round(throughput, 2) if throughput is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "created_at": datetime.utcfromtimestamp(job["created_at"]).isoformat(),
+            "updated_at": datetime.utcfromtimestamp(job["updated_at"]).isoformat()
+        }
+
+
+_manager: Optional[HarvestManager] = None
+
+
+def get_harvest_manager() -> HarvestManager:
+    """Return the shared harvest job manager, creating it on first use."""
+    global _manager
+    if _manager is None:
+        _manager = HarvestManager(
+            HarvestStore(settings.HARVEST_DB_PATH),
+            output_dir=settings.HARVEST_OUTPUT_DIR,
+            concurrency=settings.HARVEST_CONCURRENCY,
+            max_attempts=settings.HARVEST_MAX_ATTEMPTS,
+            lease=settings.HARVEST_LEASE_SECONDS
+        )
+    return _manager
@@ -0,0 +1,230 @@
+"""
+Shared pooled HTTP session for requests to YouTube.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import settings
+from .deadline import http_timeout
+from .rate_governor import RateGovernor, is_throttled, is_throttling_error, retry_after
+from .scheduler import current_priority, get_upstream_scheduler
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8,he;q=0.7',
+}
+
+_session: Optional[requests.Session] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_governor: Optional[RateGovernor] = None
+_class_governors: Dict[str, RateGovernor] = {}
+_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session, creating it on first use.
+    
+    The connection pool is as large as the upstream executor, so every worker
+    thread can hold a connection to YouTube open.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=settings.UPSTREAM_EXECUTOR_WORKERS
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def close_http_session() -> None:
+    """Close the shared session and its pooled connections."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide async keep-alive client, creating it on first use.
+    
+    Opened at startup and closed at shutdown; it belongs to the event loop that
+    first uses it, so blocking code in executor threads keeps using the
+    requests session.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=settings.ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ASYNC_HTTP_MAX_KEEPALIVE
+            )
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the async client and its pooled connections."""
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_youtube_governor() -> RateGovernor:
+    """Return the process-wide rate governor for outbound YouTube requests, creating it on first use."""
+    global _governor
+    if _governor is None:
+        with _lock:
+            if _governor is None:
+                _governor = RateGovernor(
+                    "youtube",
+                    rate=settings.YOUTUBE_RATE_LIMIT,
+                    burst=settings.YOUTUBE_RATE_BURST,
+                    backoff_base=settings.YOUTUBE_BACKOFF_BASE,
+                    backoff_max=settings.YOUTUBE_BACKOFF_MAX,
+                    state_path=settings.YOUTUBE_RATE_STATE_PATH or None
+                )
+    return _governor
+
+
+def _class_governor() -> Optional[RateGovernor]:
+    """Return the bucket limiting the current priority class to its rate share, if it has one."""
+    priority = current_priority.get()
+    share = get_upstream_scheduler().rate_share(priority)
+    if share >= 1:
+        return None
+    governor = _class_governors.get(priority)
+    if governor is None:
+        with _lock:
+            governor = _class_governors.get(priority)
+            if governor is None:
+                governor = RateGovernor(
+                    f"youtube-{priority}",
+                    rate=settings.YOUTUBE_RATE_LIMIT * share,
+                    burst=max(1, round(settings.YOUTUBE_RATE_BURST * share)),
+                    state_path=settings.YOUTUBE_RATE_STATE_PATH or None
+                )
+                _class_governors[priority] = governor
+    return governor
+
+
+def _acquire(governor: RateGovernor) -> None:
+    """Wait for the current class's rate share, then for the global budget."""
+    class_governor = _class_governor()
+    if class_governor is not None:
+        class_governor.acquire()
+    governor.acquire()
+
+
+async def _acquire_async(governor: RateGovernor) -> None:
+    """Like _acquire, without blocking the event loop."""
+    class_governor = _class_governor()
+    if class_governor is not None:
+        await class_governor.acquire_async()
+    await governor.acquire_async()
+
+
+def _youtube_request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request over the shared session within the outbound rate budget, retrying throttled responses."""
+    governor = get_youtube_governor()
+    send = getattr(get_http_session(), method.lower())
+    timeout = kwargs.pop("timeout", settings.UPSTREAM_HTTP_TIMEOUT)
+    for attempt in range(settings.YOUTUBE_THROTTLE_RETRIES + 1):
+        _acquire(governor)
+        response = send(url, timeout=http_timeout(timeout), **kwargs)
+        if not is_throttled(response):
+            governor.report_ok()
+            return response
+        governor.report_throttled(retry_after(response))
+        logger.warning(f"[HTTP] Throttled by YouTube on attempt {attempt + 1}: {method} {url}")
+    return response
+
+
+def youtube_get(url: str, **kwargs) -> requests.Response:
+    """
+    GET a YouTube URL over the shared session within the outbound rate budget.
+    
+    Throttled responses (429, consent or "sorry" pages) pause the governor and are
+    retried up to YOUTUBE_THROTTLE_RETRIES times; the last response is returned
+    as is, so the caller's raise_for_status still reports the 429.
+    
+    Args:
+        url: URL to fetch
+        **kwargs: Passed to requests.Session.get (timeout defaults to UPSTREAM_HTTP_TIMEOUT
+            and never runs past the request deadline)
+    
+    Raises:
+        DeadlineExceeded: If the request deadline passes before a request can be sent
+    """
+    return _youtube_request("GET", url, **kwargs)
+
+
+def youtube_post(url: str, **kwargs) -> requests.Response:
+    """POST to a YouTube URL (e.g. the InnerTube API) with the same budget and retries as youtube_get."""
+    return _youtube_request("POST", url, **kwargs)
+
+
+async def youtube_get_async(url: str, **kwargs) -> httpx.Response:
+    """
+    GET a YouTube URL over the shared async client; the counterpart of youtube_get
+    for code running on the event loop.
+    
+    Args:
+        url: URL to fetch
+        **kwargs: Passed to httpx.AsyncClient.get (timeout defaults to UPSTREAM_HTTP_TIMEOUT
+            and never runs past the request deadline)
+    
+    Raises:
+        DeadlineExceeded: If the request deadline passes before a request can be sent
+    """
+    governor = get_youtube_governor()
+    client = get_async_client()
+    timeout = kwargs.pop("timeout", settings.UPSTREAM_HTTP_TIMEOUT)
+    for attempt in range(settings.YOUTUBE_THROTTLE_RETRIES + 1):
+        await _acquire_async(governor)
+        response = await client.get(url, timeout=http_timeout(timeout), **kwargs)
+        if not is_throttled(response):
+            await governor.report_ok_async()
+            return response
+        await governor.report_throttled_async(retry_after(response))
+        logger.warning(f"[HTTP] Throttled by YouTube on attempt {attempt + 1}: GET {url}")
+    return response
+
+
+def call_youtube(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Call a client library function that talks to YouTube (yt-dlp, youtube-transcript-api)
+    within the outbound rate budget, pausing the governor if it reports throttling.
+    """
+    governor = get_youtube_governor()
+    _acquire(governor)
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        if is_throttling_error(e):
+            governor.report_throttled()
+        raise
+    governor.report_ok()
+    return result
@@ -0,0 +1,150 @@
+"""
+In-memory cache of classified transcript retrieval failures.
+
+Videos that are removed, private or have subtitles disabled fail the same way
+on every request, after running through every backend. Such failures are
+remembered for a short, per-class time so repeat requests fail immediately.
+Transient errors (network problems, rate limiting, parser errors) are never
+cached.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Union
+
+from ..utils.ttl_cache import TTLCache
+
+# Failure classes that apply to the whole video, whatever language is requested
+VIDEO_FAILURES = ("unavailable", "private", "disabled")
+
+_VIDEO_MESSAGES = {
+    "unavailable": ("video is not available", "video unavailable", "has been removed"),
+    "private": ("video is private", "private video", "requires sign-in", "members only"),
+    "disabled": ("subtitles are disabled", "transcripts are disabled"),
+}
+
+_NO_TRANSCRIPT_MESSAGES = (
+    "no transcript found in",
+    "transcript available in",
+    "no subtitles available in",
+    "no subtitles available for this video",
+)
+
+# Backends that did not run say nothing about the video
+_NEUTRAL_MESSAGES = ("not attempted", "not installed", "yt-dlp is not available", "youtube-transcript-api not available")
+
+
+def classify_failure(error: Union[str, Dict[str, Any], None]) -> Optional[str]:
+    """
+    Classify the error returned by YouTubeService.get_subtitles.
+
+    Args:
+        error: Definitive error message, or the error dictionary built when all backends failed
+
+    Returns:
+        "unavailable", "private", "disabled" or "no_transcript", or None if the
+        failure may be transient and must not be cached
+    """
+    if isinstance(error, str):
+        message = error.lower()
+        for failure_class, needles in _VIDEO_MESSAGES.items():
+            if any(needle in message for needle in needles):
+                return failure_class
+        if any(needle in message for needle in _NO_TRANSCRIPT_MESSAGES):
+            return "no_transcript"
+        return None
+
+    if isinstance(error, dict):
+        details = error.get("details")
+        if not isinstance(details, dict):
+            return None
+        # Only cache when every backend that ran reported a missing transcript
+        attempted = [
+            str(message).lower() for message in details.values()
+            if not any(neutral in str(message).lower() for neutral in _NEUTRAL_MESSAGES)
+        ]
+        classes = {classify_failure(message) for message in attempted}
+        if len(classes) == 1:
+            return classes.pop()
+    return None
+
+
+class NegativeCache:
+    """Per-class TTL cache of failed transcript lookups."""
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            ttls: Time-to-live in seconds per failure class; classes missing here are not cached
+            max_entries: Maximum number of remembered failures
+        """
+        self.ttls = ttls
+        self._entries = TTLCache(ttl=max(ttls.values(), default=0), max_entries=max_entries)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._stored = 0
+
+    @staticmethod
+    def _keys(video_id: str, language: str, auto_generated: bool):
+        return (video_id,), (video_id, language, auto_generated)
+
+    def get(self, video_id: str, language: str, auto_generated: bool) -> Optional[Dict[str, Any]]:
+        """
+        Look up a remembered failure for a request.
+
+        Returns:
+            Dictionary with failure_class, error, age and expires_in, or None
+        """
+        for key in self._keys(video_id, language, auto_generated):
+            entry = self._entries.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._hits += 1
+                now = time.time()
+                return {
+                    "failure_class": entry["failure_class"],
+                    "error": entry["error"],
+                    "age": now - entry["stored_at"],
+                    "expires_in": max(entry["expires_at"] - now, 0.0)
+                }
+        return None
+
+    def put(
+        self,
+        video_id: str,
+        language: str,
+        auto_generated: bool,
+        failure_class: str,
+        error: Dict[str, Any]
+    ) -> None:
+        """Remember a classified failure; video-wide classes apply to every language."""
+        ttl = self.ttls.get(failure_class)
+        if not ttl:
+            return
+        video_key, request_key = self._keys(video_id, language, auto_generated)
+        key: Hashable = video_key if failure_class in VIDEO_FAILURES else request_key
+        now = time.time()
+        self._entries.set(key, {
+            "failure_class": failure_class,
+            "error": error,
+            "stored_at": now,
+            "expires_at": now + ttl
+        }, ttl=ttl)
+        with self._lock:
+            self._stored += 1
+
+    def clear(self) -> None:
+        """Forget all failures."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry, hit and store counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "stored": self._stored,
+                "ttls": dict(self.ttls)
+            }
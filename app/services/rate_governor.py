@@ -0,0 +1,356 @@
+"""
+Process-wide (optionally host-wide) budget for outbound requests to YouTube.
+
+Every call that reaches YouTube first takes a token from a token bucket. When
+YouTube answers with HTTP 429, a consent interstitial or its "sorry" page, the
+whole bucket is paused with jittered exponential backoff (or for the
+Retry-After the response asks for), so one throttled request slows every
+caller down instead of each of them hammering YouTube on its own.
+
+With a state path the bucket lives in a SQLite file, so all uvicorn workers on
+the host share one budget. Async callers then reach the file through the disk
+executor, never from the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from .deadline import DeadlineExceeded, remaining
+from .executor import run_disk_io
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_governor (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    blocked_until REAL NOT NULL,
+    throttle_streak INTEGER NOT NULL
+);
+"""
+
+_THROTTLE_MARKERS = ("429", "too many requests", "consent.youtube.com", "consent.google.com", "/sorry/")
+
+
+def is_throttled(response) -> bool:
+    """
+    Tell whether a response means YouTube is throttling us.
+
+    Args:
+        response: requests or httpx response
+
+    Returns:
+        True for HTTP 429, consent interstitials and Google's "sorry" page
+    """
+    if response.status_code == 429:
+        return True
+    url = str(getattr(response, "url", "") or "")
+    return "consent.youtube.com" in url or "consent.google.com" in url or "/sorry/" in url
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """Tell whether an exception raised by a client library reports throttling."""
+    message = str(error).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS) or type(error).__name__ in (
+        "TooManyRequests", "RequestBlocked", "IpBlocked"
+    )
+
+
+def retry_after(response) -> Optional[float]:
+    """
+    Read the Retry-After header of a response.
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    value = response.headers.get("Retry-After") if getattr(response, "headers", None) else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateGovernor:
+    """Token bucket with a shared backoff pause for outbound YouTube requests."""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        state_path: Optional[str] = None,
+        window: int = 500
+    ):
+        """
+        Initialize the governor.
+
+        Args:
+            name: Bucket name (several governors can share one state file)
+            rate: Sustained requests per second
+            burst: Bucket capacity
+            backoff_base: First backoff pause in seconds after a throttled response
+            backoff_max: Upper bound for the backoff pause
+            state_path: SQLite file for a host-wide bucket, or None for a per-process one
+            window: Number of recent waits used for percentiles
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.state_path = state_path or None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._state = {"tokens": float(burst), "updated_at": time.time(), "blocked_until": 0.0, "throttle_streak": 0}
+        self._waits = deque(maxlen=window)
+        self._acquired = 0
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._throttled = 0
+        self._deadline_rejected = 0
+        # Throttle streak as of the last read of the bucket, so successes only write when it must be reset
+        self._streak_seen = 0
+
+        if self.state_path:
+            directory = os.path.dirname(os.path.abspath(self.state_path))
+            os.makedirs(directory, exist_ok=True)
+            self._connect().executescript(_SCHEMA)
+            logger.info(f"[GOVERNOR] {name}: sharing {rate}/s (burst {burst}) through {self.state_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.state_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _update(self, change) -> Any:
+        """
+        Apply change(state, now) to the bucket state atomically and return its result.
+
+        The state is the in-process dictionary, or the row in the shared SQLite file
+        read and written inside one IMMEDIATE transaction.
+        """
+        now = time.time()
+        with self._lock:
+            if not self.state_path:
+                result = change(self._state, now)
+                self._streak_seen = self._state["throttle_streak"]
+                return result
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until, throttle_streak FROM rate_governor WHERE name = ?",
+                    (self.name,)
+                ).fetchone()
+                state = dict(zip(("tokens", "updated_at", "blocked_until", "throttle_streak"), row)) if row else {
+                    "tokens": float(self.burst), "updated_at": now, "blocked_until": 0.0, "throttle_streak": 0
+                }
+                result = change(state, now)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rate_governor (name, tokens, updated_at, blocked_until, throttle_streak) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.name, state["tokens"], state["updated_at"], state["blocked_until"], state["throttle_streak"])
+                )
+                conn.execute("COMMIT")
+                self._streak_seen = state["throttle_streak"]
+                return result
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _read(self) -> Dict[str, Any]:
+        """Return a snapshot of the bucket state; a plain SELECT, never the shared file's write lock."""
+        if not self.state_path:
+            with self._lock:
+                return dict(self._state)
+        row = self._connect().execute(
+            "SELECT tokens, updated_at, blocked_until, throttle_streak FROM rate_governor WHERE name = ?",
+            (self.name,)
+        ).fetchone()
+        if row is None:
+            return {"tokens": float(self.burst), "updated_at": time.time(), "blocked_until": 0.0, "throttle_streak": 0}
+        return dict(zip(("tokens", "updated_at", "blocked_until", "throttle_streak"), row))
+
+    def _reserve(self, state: Dict[str, Any], now: float, limit: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token (possibly from the future) and return how long the caller must wait for it.
+
+        Returns None, leaving the bucket untouched, if the wait would exceed limit.
+        """
+        # The refill clock starts at the end of a backoff pause, so tokens do not pile up during it
+        start = max(now, state["updated_at"])
+        tokens = min(self.burst, state["tokens"] + max(now - state["updated_at"], 0.0) * self.rate) - 1
+        debt = -tokens / self.rate if tokens < 0 else 0.0
+        wait = (start - now) + debt
+        if limit is not None and wait > limit:
+            return None
+        state["tokens"] = tokens
+        state["updated_at"] = start
+        return wait
+
+    def _reserve_and_record(self) -> float:
+        """
+        Reserve a token the caller can use before its deadline and return the wait for it.
+
+        Raises:
+            DeadlineExceeded: If the token would only be available after the current deadline
+        """
+        limit = remaining()
+        wait = self._update(lambda state, now: self._reserve(state, now, limit))
+        if wait is None:
+            with self._lock:
+                self._deadline_rejected += 1
+            logger.info(f"[GOVERNOR] {self.name}: no outbound request slot before the request deadline")
+            raise DeadlineExceeded(f"No outbound request slot for {self.name} before the deadline")
+        with self._lock:
+            self._acquired += 1
+            self._waits.append(wait)
+            if wait > 0:
+                self._waited += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+        if wait > 0:
+            logger.info(f"[GOVERNOR] {self.name}: waiting {wait:.2f}s for an outbound request slot")
+        return wait
+
+    def acquire(self) -> float:
+        """
+        Block the calling thread until a request may be sent.
+
+        The wait never runs past the current deadline: when the bucket is paused
+        longer than that, no token is taken and the caller fails at once.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            DeadlineExceeded: If no request may be sent before the current deadline
+        """
+        wait = self._reserve_and_record()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Wait without blocking the event loop until a request may be sent.
+
+        Raises:
+            DeadlineExceeded: If no request may be sent before the current deadline
+        """
+        wait = await self._off_loop(self._reserve_and_record)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    async def _off_loop(self, func, *args: Any) -> Any:
+        """Call func directly for an in-process bucket, or on the disk executor for a shared one."""
+        if self.state_path:
+            return await run_disk_io(func, *args)
+        return func(*args)
+
+    def report_throttled(self, retry_after_seconds: Optional[float] = None) -> float:
+        """
+        Pause the whole bucket after YouTube throttled a request.
+
+        The pause is Retry-After when YouTube sent one, and otherwise doubles with
+        every consecutive throttled response, with full jitter over its upper half.
+
+        Returns:
+            Length of the pause in seconds
+        """
+        def change(state: Dict[str, Any], now: float) -> float:
+            state["throttle_streak"] += 1
+            if retry_after_seconds is not None:
+                delay = min(retry_after_seconds, self.backoff_max)
+            else:
+                delay = min(self.backoff_base * 2 ** (state["throttle_streak"] - 1), self.backoff_max)
+                delay = random.uniform(delay / 2, delay)
+            state["blocked_until"] = max(state["blocked_until"], now + delay)
+            state["tokens"] = min(state["tokens"], 0.0)
+            state["updated_at"] = max(state["updated_at"], state["blocked_until"])
+            return delay
+
+        delay = self._update(change)
+        with self._lock:
+            self._throttled += 1
+        logger.warning(f"[GOVERNOR] {self.name}: YouTube is throttling, pausing outbound requests for {delay:.1f}s")
+        return delay
+
+    async def report_throttled_async(self, retry_after_seconds: Optional[float] = None) -> float:
+        """Like report_throttled, without blocking the event loop on the shared state file."""
+        return await self._off_loop(self.report_throttled, retry_after_seconds)
+
+    def report_ok(self) -> None:
+        """
+        Reset the backoff after a request that was not throttled.
+
+        Writes only when the last seen throttle streak is not already zero, so
+        successful requests do not take the shared state file's write lock.
+        """
+        def change(state: Dict[str, Any], now: float) -> None:
+            state["throttle_streak"] = 0
+
+        if self._streak_seen:
+            self._update(change)
+
+    async def report_ok_async(self) -> None:
+        """Like report_ok, without blocking the event loop on the shared state file."""
+        if self._streak_seen:
+            await self._off_loop(self.report_ok)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return request, wait and throttling counters.
+
+        Read-only, but blocking for a shared bucket; async callers run it through run_disk_io.
+        """
+        bucket = self._read()
+        now = time.time()
+        state = {
+            "tokens": min(self.burst, bucket["tokens"] + max(now - bucket["updated_at"], 0.0) * self.rate),
+            "paused_for": max(bucket["blocked_until"] - now, 0.0),
+            "throttle_streak": bucket["throttle_streak"]
+        }
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "shared": bool(self.state_path),
+                "tokens": round(state["tokens"], 3),
+                "paused_for": round(state["paused_for"], 3),
+                "throttle_streak": state["throttle_streak"],
+                "acquired": self._acquired,
+                "waited": self._waited,
+                "throttled": self._throttled,
+                "deadline_rejected": self._deadline_rejected,
+                "total_wait": round(self._wait_total, 3),
+                "max_wait": round(self._wait_max, 3),
+                "p50_wait": statistics.median(waits) if waits else None,
+                "p95_wait": waits[int(len(waits) * 0.95) - 1] if len(waits) >= 20 else None
+            }
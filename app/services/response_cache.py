@@ -0,0 +1,173 @@
+"""
+Stale-while-revalidate cache for channel search and listing responses.
+
+Entries are fresh for a soft TTL and served as is. After that they are still
+served immediately, marked stale, while one background task fetches a new
+copy; only entries older than the soft TTL plus the stale window (or missing
+ones) make the caller wait for YouTube. Background refreshes run at batch
+priority, outside the request's deadline but within REQUEST_TIMEOUT_MAX of
+their own, so a hung fetch cannot block later refreshes of its key.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from ..config import settings
+from ..utils.ttl_cache import TTLCache
+from .deadline import deadline_scope
+from .scheduler import BATCH, current_priority
+from .single_flight import SingleFlight
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Cache states reported to clients (X-Cache header)
+HIT = "hit"
+STALE = "stale"
+MISS = "miss"
+
+
+class ResponseCache:
+    """In-memory response cache with a soft TTL and background revalidation."""
+
+    def __init__(self, name: str, fresh_ttl: float, stale_ttl: float, max_entries: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Name used in logs
+            fresh_ttl: Seconds an entry is served without revalidation
+            stale_ttl: Seconds past fresh_ttl an entry may still be served while it is refreshed
+            max_entries: Maximum number of entries; the oldest are dropped first
+        """
+        self.name = name
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self._entries = TTLCache(fresh_ttl + stale_ttl, max_entries)
+        self._flight = SingleFlight(f"{name}_cache")
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._counts = {HIT: 0, STALE: 0, MISS: 0, "refreshed": 0, "refresh_failed": 0}
+
+    async def get(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = lambda value: True
+    ) -> Tuple[T, str]:
+        """
+        Return the cached value for key, fetching it on a miss.
+
+        Args:
+            key: Identifies interchangeable responses
+            fetch: Coroutine factory producing a fresh value; also used for background refreshes
+            cacheable: Tells whether a fetched value may be stored (e.g. only successful results)
+
+        Returns:
+            Tuple of (value, state), state being "hit", "stale" or "miss"
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.monotonic() - stored_at <= self.fresh_ttl:
+                self._counts[HIT] += 1
+                return value, HIT
+            self._counts[STALE] += 1
+            self._revalidate(key, fetch, cacheable)
+            return value, STALE
+
+        self._counts[MISS] += 1
+        value = await self._flight.do(key, fetch)
+        if cacheable(value):
+            self.put(key, value)
+        return value, MISS
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a fresh value."""
+        self._entries.set(key, (time.monotonic(), value))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop an entry, so the next request fetches it again."""
+        self._entries.pop(key)
+
+    def _revalidate(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]) -> None:
+        """Start one background refresh for key unless one is already running."""
+        if key in self._refreshing:
+            return
+        # A fresh context: the refresh must not inherit the request's deadline or priority
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(key, fetch, cacheable), context=contextvars.Context()
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _, k=key: self._refreshing.pop(k, None))
+
+    async def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], cacheable: Callable[[Any], bool]) -> None:
+        """Fetch a new value for key at batch priority and store it if it is cacheable."""
+        current_priority.set(BATCH)
+        try:
+            with deadline_scope(settings.REQUEST_TIMEOUT_MAX):
+                value = await self._flight.do(key, fetch)
+        except Exception as e:
+            self._counts["refresh_failed"] += 1
+            logger.warning(f"[CACHE] {self.name}: background refresh of {key} failed, keeping the stale entry: {e}")
+            return
+        if cacheable(value):
+            self.put(key, value)
+            self._counts["refreshed"] += 1
+            logger.info(f"[CACHE] {self.name}: refreshed {key} in the background")
+        else:
+            self._counts["refresh_failed"] += 1
+
+    async def shutdown(self) -> None:
+        """Cancel running background refreshes."""
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/stale/miss counters and the number of entries."""
+        return {
+            "entries": len(self._entries),
+            "refreshing": len(self._refreshing),
+            "fresh_ttl": self.fresh_ttl,
+            "stale_ttl": self.stale_ttl,
+            **self._counts
+        }
+
+
+_channel_cache: Optional[ResponseCache] = None
+
+
+def get_channel_cache() -> Optional[ResponseCache]:
+    """Return the shared cache of channel search and listing responses, or None if it is disabled."""
+    global _channel_cache
+    if _channel_cache is None and settings.CHANNEL_CACHE_ENABLED:
+        _channel_cache = ResponseCache(
+            "channel",
+            fresh_ttl=settings.CHANNEL_CACHE_FRESH_TTL,
+            stale_ttl=settings.CHANNEL_CACHE_STALE_TTL,
+            max_entries=settings.CHANNEL_CACHE_MAX_ENTRIES
+        )
+    return _channel_cache
+
+
+async def shutdown_channel_cache() -> None:
+    """Cancel the background refreshes of the shared channel cache, if it was created."""
+    if _channel_cache is not None:
+        await _channel_cache.shutdown()
+
+
+async def cached_channel_response(
+    key: Hashable,
+    fetch: Callable[[], Awaitable[T]],
+    cacheable: Callable[[T], bool] = lambda value: True
+) -> Tuple[T, str]:
+    """Serve a channel response through the shared cache, or fetch it directly when caching is disabled."""
+    cache = get_channel_cache()
+    if cache is None:
+        return await fetch(), MISS
+    return await cache.get(key, fetch, cacheable)
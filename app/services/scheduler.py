@@ -0,0 +1,286 @@
+"""
+Priority scheduling of upstream YouTube work.
+
+Interactive API requests and batch work (channel harvests, prefetching) share
+one upstream capacity. Each priority class has its own concurrency limit and a
+share of the outbound request rate; when capacity frees up, waiting interactive
+work is always admitted before batch work.
+
+The class of the current request travels in the ``current_priority`` context
+variable, which run_blocking carries into executor threads.
+
+API requests are admission-controlled: each class has a bounded wait queue and
+a maximum queue wait. Work that cannot be queued is rejected right away with
+503 and a Retry-After estimated from the queue length and recent service
+times, instead of piling up until the client gives up.
+"""
+
+import asyncio
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..config import settings
+from .deadline import remaining
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Priority class of the work running in the current request or job
+current_priority: ContextVar[str] = ContextVar("current_priority", default=INTERACTIVE)
+
+
+class AdmissionRejected(HTTPException):
+    """Upstream work was not admitted because its class queue is full or the wait ran out."""
+
+    def __init__(self, priority: str, reason: str, retry_after: int):
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "status": "error",
+                "error": "overloaded",
+                "message": f"Server is busy ({reason}), retry in {retry_after}s",
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class _PriorityClass:
+    """Limits, queue and counters of one priority class."""
+
+    def __init__(self, name: str, concurrency: int, rate_share: float, window: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.rate_share = rate_share
+        self.active = 0
+        self.waiters: "deque[Tuple[asyncio.Future, float]]" = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=window)
+
+
+class PriorityScheduler:
+    """Admits upstream work by priority class within a shared concurrency limit."""
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        classes: Dict[str, Tuple[int, float]],
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        window: int = 500
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Scheduler name for logs
+            capacity: Upstream operations allowed to run at once across all classes
+            classes: Class name to (concurrency limit, rate share), highest priority first
+            max_queue: Waiting operations allowed per class before bounded acquires are rejected
+            queue_timeout: Longest time a bounded acquire waits in the queue, in seconds
+            window: Number of recent queue waits per class (and service times) used for percentiles
+        """
+        self.name = name
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout or None
+        self._classes = {
+            class_name: _PriorityClass(class_name, concurrency, rate_share, window)
+            for class_name, (concurrency, rate_share) in classes.items()
+        }
+        self._active = 0
+        self._service_times = deque(maxlen=window)
+
+    def _class(self, priority: Optional[str]) -> _PriorityClass:
+        priority = priority or current_priority.get()
+        entry = self._classes.get(priority)
+        if entry is None:
+            # Unknown classes are treated as the lowest priority
+            entry = list(self._classes.values())[-1]
+        return entry
+
+    def rate_share(self, priority: Optional[str] = None) -> float:
+        """Fraction of the outbound request rate the class may use."""
+        return self._class(priority).rate_share
+
+    def _can_run(self, entry: _PriorityClass) -> bool:
+        return self._active < self.capacity and entry.active < entry.concurrency
+
+    def _admit(self, entry: _PriorityClass, wait: float) -> None:
+        self._active += 1
+        entry.active += 1
+        entry.admitted += 1
+        entry.total_wait += wait
+        entry.max_wait = max(entry.max_wait, wait)
+        entry.recent_waits.append(wait)
+
+    def _wake(self) -> None:
+        """Hand free capacity to waiting work, highest priority class first."""
+        now = time.monotonic()
+        for entry in self._classes.values():
+            while entry.waiters and self._can_run(entry):
+                future, queued_at = entry.waiters.popleft()
+                if future.done():
+                    continue
+                self._admit(entry, now - queued_at)
+                future.set_result(None)
+
+    def retry_after(self, priority: Optional[str] = None) -> int:
+        """
+        Estimate when new work of a class is likely to be admitted.
+
+        Everything queued in the class and in higher priority classes has to
+        start first; it drains through the class's slots at the median recent
+        service time.
+
+        Returns:
+            Whole seconds, between 1 and 120
+        """
+        entry = self._class(priority)
+        ahead = 0
+        for other in self._classes.values():
+            ahead += len(other.waiters)
+            if other is entry:
+                break
+        service_time = statistics.median(self._service_times) if self._service_times else 1.0
+        slots = max(min(self.capacity, entry.concurrency), 1)
+        return min(max(math.ceil((ahead + 1) * service_time / slots), 1), 120)
+
+    def _reject(self, entry: _PriorityClass, reason: str) -> AdmissionRejected:
+        entry.rejected += 1
+        retry_after = self.retry_after(entry.name)
+        logger.warning(f"[SCHEDULER] {self.name}: rejecting {entry.name} work ({reason}), retry after {retry_after}s")
+        return AdmissionRejected(entry.name, reason, retry_after)
+
+    async def acquire(self, priority: Optional[str] = None, bounded: bool = False) -> str:
+        """
+        Wait until work of the given class may start.
+
+        Args:
+            priority: Class name; defaults to current_priority
+            bounded: Apply max_queue and queue_timeout (for API requests a client is waiting on)
+
+        Returns:
+            The class the work was admitted under; pass it to release
+
+        Raises:
+            AdmissionRejected: If bounded and the class queue is full or the wait timed out
+        """
+        entry = self._class(priority)
+        # Waiting work of other classes is only blocked by its own class limit
+        # whenever shared capacity is free, so only this class's queue is ahead
+        if self._can_run(entry) and not entry.waiters:
+            self._admit(entry, 0.0)
+            return entry.name
+        if bounded and self.max_queue is not None and len(entry.waiters) >= self.max_queue:
+            raise self._reject(entry, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry.waiters.append((future, time.monotonic()))
+        logger.info(f"[SCHEDULER] {self.name}: {entry.name} work queued ({len(entry.waiters)} waiting)")
+        timeout = None
+        if bounded:
+            # Never queue past the request deadline
+            limits = [limit for limit in (self.queue_timeout, remaining()) if limit is not None]
+            timeout = max(min(limits), 0.0) if limits else None
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Admitted just as the wait ran out
+                return entry.name
+            future.cancel()
+            entry.waiters = deque(item for item in entry.waiters if item[0] is not future)
+            raise self._reject(entry, "queue wait timed out")
+        except asyncio.CancelledError:
+            if future.done():
+                # Admitted just before the cancellation arrived
+                self.release(entry.name)
+            else:
+                future.cancel()
+                entry.waiters = deque(item for item in entry.waiters if item[0] is not future)
+            raise
+        return entry.name
+
+    def release(self, priority: str) -> None:
+        """Mark work of a class as finished and admit waiting work."""
+        entry = self._classes[priority]
+        self._active -= 1
+        entry.active -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None, bounded: bool = False) -> AsyncIterator[str]:
+        """Hold one unit of upstream capacity for the duration of the block (see acquire)."""
+        admitted = await self.acquire(priority, bounded=bounded)
+        started = time.monotonic()
+        try:
+            yield admitted
+        finally:
+            self._service_times.append(time.monotonic() - started)
+            self.release(admitted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-class limits, activity and queue wait times in seconds."""
+        service_times = sorted(self._service_times)
+        result = {
+            "capacity": self.capacity,
+            "active": self._active,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "p50_service_time": statistics.median(service_times) if service_times else None,
+            "classes": {}
+        }
+        for entry in self._classes.values():
+            waits = sorted(entry.recent_waits)
+            result["classes"][entry.name] = {
+                "concurrency": entry.concurrency,
+                "rate_share": entry.rate_share,
+                "active": entry.active,
+                "queued": len(entry.waiters),
+                "admitted": entry.admitted,
+                "rejected": entry.rejected,
+                "retry_after": self.retry_after(entry.name),
+                "avg_wait": entry.total_wait / entry.admitted if entry.admitted else 0.0,
+                "max_wait": entry.max_wait,
+                "p50_wait": statistics.median(waits) if waits else 0.0,
+                "p95_wait": statistics.quantiles(waits, n=20)[-1] if len(waits) >= 2 else (waits[0] if waits else 0.0)
+            }
+        return result
+
+
+_scheduler: Optional[PriorityScheduler] = None
+
+
+def get_upstream_scheduler() -> PriorityScheduler:
+    """Return the shared upstream scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = PriorityScheduler(
+            "upstream",
+            capacity=settings.SCHEDULER_CAPACITY,
+            classes={
+                INTERACTIVE: (settings.SCHEDULER_INTERACTIVE_CONCURRENCY, settings.SCHEDULER_INTERACTIVE_RATE_SHARE),
+                BATCH: (settings.SCHEDULER_BATCH_CONCURRENCY, settings.SCHEDULER_BATCH_RATE_SHARE)
+            },
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT
+        )
+    return _scheduler
@@ -0,0 +1,111 @@
+"""
+In-process request coalescing for identical concurrent upstream calls.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from ..config import settings
+from .deadline import DeadlineExceeded, current_deadline, remaining, within_deadline
+from .scheduler import BATCH, INTERACTIVE, current_priority
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest first; the shared call runs at the best class among its callers
+_PRIORITY_ORDER = (INTERACTIVE, BATCH)
+
+
+def _rank(priority: str) -> int:
+    return _PRIORITY_ORDER.index(priority) if priority in _PRIORITY_ORDER else len(_PRIORITY_ORDER)
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time and share its result with every concurrent caller.
+
+    Each caller awaits the shared task through ``asyncio.shield``, so a client that disconnects
+    does not cancel the work for the others. The shared task is only cancelled once every
+    caller waiting on it has gone away.
+
+    The shared task runs in its own context rather than the first caller's: its deadline is
+    the server maximum (REQUEST_TIMEOUT_MAX, or the first caller's budget if longer) and its
+    priority is raised to the highest class among the callers waiting on it. Each caller
+    stops waiting at its own deadline.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._contexts: Dict[Hashable, contextvars.Context] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``func()`` for the given key, joining an in-flight call if one exists.
+
+        Args:
+            key: Identifies calls that are interchangeable
+            func: Coroutine factory that performs the actual work
+
+        Returns:
+            The result of the shared call; its exception is raised to every caller
+
+        Raises:
+            DeadlineExceeded: If the caller's deadline passes before the shared call finishes
+        """
+        priority = current_priority.get()
+        task = self._calls.get(key)
+        if task is None:
+            context = contextvars.Context()
+            context.run(current_priority.set, priority)
+            budget = max(settings.REQUEST_TIMEOUT_MAX, remaining() or 0.0)
+            context.run(current_deadline.set, time.monotonic() + budget)
+            task = asyncio.get_running_loop().create_task(func(), context=context)
+            self._calls[key] = task
+            self._contexts[key] = context
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"[SINGLE_FLIGHT] {self.name}: joined in-flight call for {key}")
+            context = self._contexts[key]
+            if _rank(priority) < _rank(context.get(current_priority)):
+                # The shared task is suspended while we run, so its context can be updated;
+                # upstream slots it acquires from now on use the caller's higher class
+                context.run(current_priority.set, priority)
+
+        self._waiters[key] += 1
+        try:
+            return await within_deadline(asyncio.shield(task))
+        except (asyncio.CancelledError, DeadlineExceeded):
+            if self._calls.get(key) is task and self._waiters[key] == 1 and not task.done():
+                logger.info(f"[SINGLE_FLIGHT] {self.name}: last caller for {key} left, cancelling")
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop the finished task so the next call for the key starts fresh."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._contexts[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has already left
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return coalescing counters."""
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "coalesced": self.coalesced
+        }
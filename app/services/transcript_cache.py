@@ -0,0 +1,210 @@
+"""
+Persistent on-disk cache for retrieved transcripts.
+
+Entries live in a SQLite database opened in WAL mode, so the cache survives
+restarts and can be shared by several uvicorn workers on the same host.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    video_id TEXT NOT NULL,
+    requested_language TEXT NOT NULL,
+    auto_generated INTEGER NOT NULL,
+    resolved_language TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    cleaned TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (video_id, requested_language, auto_generated, resolved_language)
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_last_access ON transcripts (last_access);
+"""
+
+
+class TranscriptCache:
+    """SQLite-backed transcript cache with a TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path: str, ttl: int, max_bytes: int, stale_ttl: int = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Time in seconds after which an entry is considered expired
+            max_bytes: Upper bound for the total size of cached transcripts
+            stale_ttl: Time in seconds past ttl during which expired entries are
+                still returned to callers that accept stale ones
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+        self._local = threading.local()
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+        logger.info(f"[CACHE] Transcript cache initialized at {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return the connection owned by the current thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def get(
+        self,
+        video_id: str,
+        language: str,
+        auto_generated: bool,
+        allow_stale: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached transcript.
+
+        Args:
+            video_id: YouTube video ID
+            language: Requested language code or 'auto'
+            auto_generated: Whether auto-generated subtitles were requested
+            allow_stale: Also return entries past the TTL, up to stale_ttl seconds
+
+        Returns:
+            Dictionary with raw, cleaned, language, age and stale (older than the
+            TTL) of the entry, or None on a miss
+        """
+        conn = self._connect()
+        row = conn.execute(
+            """
+            SELECT resolved_language, raw, cleaned, created_at FROM transcripts
+            WHERE video_id = ? AND requested_language = ? AND auto_generated = ?
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (video_id, language, int(auto_generated))
+        ).fetchone()
+
+        now = time.time()
+        age = now - row["created_at"] if row is not None else None
+        max_age = self.ttl + self.stale_ttl if allow_stale else self.ttl
+        if row is None or age > max_age:
+            self._misses += 1
+            return None
+
+        conn.execute(
+            """
+            UPDATE transcripts SET last_access = ?
+            WHERE video_id = ? AND requested_language = ? AND auto_generated = ? AND resolved_language = ?
+            """,
+            (now, video_id, language, int(auto_generated), row["resolved_language"])
+        )
+        stale = age > self.ttl
+        if stale:
+            self._stale_hits += 1
+        else:
+            self._hits += 1
+        return {
+            "raw": row["raw"],
+            "cleaned": row["cleaned"],
+            "language": row["resolved_language"],
+            "age": age,
+            "stale": stale
+        }
+
+    def put(
+        self,
+        video_id: str,
+        language: str,
+        auto_generated: bool,
+        resolved_language: str,
+        raw: str,
+        cleaned: str
+    ) -> None:
+        """
+        Store a transcript and evict least recently used entries if the cache is over budget.
+
+        Args:
+            video_id: YouTube video ID
+            language: Requested language code or 'auto'
+            auto_generated: Whether auto-generated subtitles were requested
+            resolved_language: Language actually returned by YouTube
+            raw: Transcript as returned by the retrieval backend
+            cleaned: Output of SubtitleService.clean_subtitles
+        """
+        now = time.time()
+        size = len(raw.encode("utf-8")) + len(cleaned.encode("utf-8"))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO transcripts
+                (video_id, requested_language, auto_generated, resolved_language,
+                 raw, cleaned, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (video_id, language, int(auto_generated), resolved_language or "",
+                 raw, cleaned, size, now, now)
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used entries until the total size fits into max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT rowid, size FROM transcripts ORDER BY last_access ASC"
+        ).fetchall()
+        victims = []
+        for rowid, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((rowid,))
+            total -= size
+
+        conn.executemany("DELETE FROM transcripts WHERE rowid = ?", victims)
+        self._evictions += len(victims)
+        logger.info(f"[CACHE] Evicted {len(victims)} transcript(s) to stay within {self.max_bytes} bytes")
+
+    def clear(self) -> None:
+        """Remove all cached transcripts."""
+        self._connect().execute("DELETE FROM transcripts")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return counters and current size of the cache."""
+        entries, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+        ).fetchone()
+        return {
+            "entries": entries,
+            "size_bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "evictions": self._evictions
+        }
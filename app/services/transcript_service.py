@@ -1,24 +1,33 @@
 """
 Core service for handling transcript-related operations.
 """
+import asyncio
+import contextvars
 import logging
 import time
 from typing import Tuple, Optional, Dict, Any
 
 from fastapi import HTTPException, status
 
+from app.config import settings
 from app.schemas.transcript import ErrorResponse
-from app.services.youtube import YouTubeService
-from app.services import subtitle_service
+from app.services import youtube_service, subtitle_service, transcript_cache, transcript_flight, negative_cache
+from app.services.negative_cache import classify_failure
+from app.services.executor import run_disk_io
+from app.services.scheduler import BATCH, current_priority, get_upstream_scheduler
+from app.services.deadline import DeadlineExceeded, deadline_scope
 
 logger = logging.getLogger(__name__)
 
+# Background refreshes of stale transcripts, one per (video_id, language, auto_generated)
+_revalidations: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+
 class TranscriptService:
     """Service for handling transcript-related operations."""
 
     def __init__(self):
         """Initialize the TranscriptService with required services."""
-        self.youtube_service = YouTubeService()
+        self.youtube_service = youtube_service
 
     async def get_transcript(
         self,
@@ -29,6 +38,12 @@ class TranscriptService:
         """
         Get transcript for a YouTube video.
         
+        Concurrent requests for the same video, language and auto_generated flag
+        share a single retrieval. Transcripts past the cache TTL are returned at
+        once while one background refresh runs (stale-while-revalidate), and
+        older ones are returned when YouTube fails (stale-if-error); both report
+        cache "stale" in the metadata.
+        
         Args:
             video_id: YouTube video ID
             language: Language code or 'auto' for auto-detection
@@ -37,6 +52,28 @@ class TranscriptService:
         Returns:
             Tuple of (transcript, detected_language, metadata)
         """
+        try:
+            return await transcript_flight.do(
+                (video_id, language, auto_generated),
+                lambda: self._get_transcript(video_id, language, auto_generated)
+            )
+        except DeadlineExceeded:
+            # This caller's budget ran out; the shared retrieval may still finish for the others
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=ErrorResponse(
+                    error="deadline_exceeded",
+                    message=f"Transcript of video {video_id} was not retrieved in time"
+                ).dict()
+            )
+
+    async def _get_transcript(
+        self,
+        video_id: str,
+        language: str,
+        auto_generated: bool
+    ) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+        """Retrieve, clean and cache a transcript without request coalescing."""
         logger.info("[TRANSCRIPT] Starting transcript retrieval")
         logger.info(f"[TRANSCRIPT] Video ID: {video_id}")
         logger.info(f"[TRANSCRIPT] Language: {language if language != 'auto' else 'auto (will detect)'}")
@@ -45,76 +82,39 @@ class TranscriptService:
         try:
             start_time = time.time()
             
-            # Get subtitles from YouTube
-            logger.info("[TRANSCRIPT] Fetching subtitles from YouTube API")
-            try:
-                logger.info(f"[TRANSCRIPT] Calling YouTubeService.get_subtitles with params: video_id={video_id}, lang={language if language != 'auto' else None}, auto_generated={auto_generated}")
-                transcript, detected_lang = await self.youtube_service.get_subtitles(
-                    video_id,
-                    lang=language if language != 'auto' else None,
-                    auto_generated=auto_generated
-                )
-                logger.info(f"[TRANSCRIPT] YouTubeService.get_subtitles returned: transcript={bool(transcript)}, detected_lang={detected_lang}")
-                logger.info(f"[TRANSCRIPT] Successfully retrieved subtitles")
-                if detected_lang:
-                    logger.info(f"[TRANSCRIPT] Detected language: {detected_lang}")
-            except Exception as e:
-                error_msg = f"Error fetching subtitles: {str(e)}"
-                logger.error(f"[TRANSCRIPT] {error_msg}", exc_info=True)
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=ErrorResponse(
-                        error="youtube_api_error",
-                        message=error_msg
-                    ).dict()
-                )
-            
-            request_duration = time.time() - start_time
-            logger.info(f"[TRANSCRIPT] Subtitle retrieval completed in {request_duration:.2f} seconds")
-            
-            if not transcript:
-                # If the error message is a dictionary, use it directly
-                if isinstance(detected_lang, dict):
-                    error_response = detected_lang
-                else:
-                    error_response = {
-                        "error": "no_subtitles",
-                        "message": f"No subtitles found for video {video_id}",
-                        "details": {
-                            "video_id": video_id,
-                            "language": language,
-                            "auto_generated": auto_generated
-                        }
-                    }
-                
-                logger.error(f"[TRANSCRIPT] {error_response}")
+            # Fail fast for videos that recently failed in a way that will not change soon
+            failure = negative_cache.get(video_id, language, auto_generated) if negative_cache else None
+            if failure:
+                logger.info(f"[TRANSCRIPT] Negative cache hit for video {video_id} ({failure['failure_class']})")
+                error_response = dict(failure["error"])
+                error_response["cached"] = True
+                error_response["cache_age"] = round(failure["age"], 3)
+                error_response["cache_expires_in"] = round(failure["expires_in"], 3)
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
-                    detail=error_response
+                    detail=error_response,
+                    headers={"X-Cache": "NEGATIVE-HIT"}
                 )
             
-            # Clean the transcript
-            logger.info("[TRANSCRIPT] Cleaning subtitles")
-            try:
-                cleaned_transcript = subtitle_service.clean_subtitles(transcript)
-                logger.info(f"[TRANSCRIPT] Subtitles cleaned. Original length: {len(transcript)}, Cleaned length: {len(cleaned_transcript)}")
-            except Exception as e:
-                error_msg = f"Error cleaning subtitles: {str(e)}"
-                logger.error(f"[TRANSCRIPT] {error_msg}", exc_info=True)
-                # Fallback to original transcript if cleaning fails
-                cleaned_transcript = transcript
-            
-            # Prepare metadata
-            metadata = {
-                "processing_time": request_duration,
-                "original_length": len(transcript),
-                "cleaned_length": len(cleaned_transcript),
-                "language_detected": detected_lang or language,
-                "auto_generated": auto_generated
-            }
+            # Serve previously retrieved transcripts from the persistent cache;
+            # expired ones are kept for stale-while-revalidate and stale-if-error
+            cached = await run_disk_io(self._read_cache, video_id, language, auto_generated)
+            if cached and not cached["stale"]:
+                logger.info(f"[TRANSCRIPT] Cache hit for video {video_id} (age: {cached['age']:.0f}s)")
+                return self._cached_result(cached, language, auto_generated, start_time, "hit")
+            if cached and cached["age"] <= transcript_cache.ttl + settings.TRANSCRIPT_CACHE_STALE_WHILE_REVALIDATE:
+                logger.info(f"[TRANSCRIPT] Serving stale transcript for video {video_id} (age: {cached['age']:.0f}s), refreshing in the background")
+                self._revalidate(video_id, language, auto_generated)
+                return self._cached_result(cached, language, auto_generated, start_time, "stale")
             
-            logger.info(f"[TRANSCRIPT] Transcript processing completed successfully")
-            return cleaned_transcript, detected_lang, metadata
+            try:
+                return await self._fetch_transcript(video_id, language, auto_generated, start_time)
+            except HTTPException as he:
+                stale_if_error = cached and cached["age"] <= transcript_cache.ttl + settings.TRANSCRIPT_CACHE_STALE_IF_ERROR
+                if stale_if_error and self._is_transient(he):
+                    logger.warning(f"[TRANSCRIPT] YouTube failed for video {video_id} (HTTP {he.status_code}), serving the stale transcript")
+                    return self._cached_result(cached, language, auto_generated, start_time, "stale")
+                raise
             
         except HTTPException as he:
             logger.error(f"[TRANSCRIPT] HTTP Error: {str(he.detail) if hasattr(he, 'detail') else str(he)}")
@@ -130,6 +130,205 @@ class TranscriptService:
                 ).dict()
             )
 
+    async def _fetch_transcript(
+        self,
+        video_id: str,
+        language: str,
+        auto_generated: bool,
+        start_time: float
+    ) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+        """
+        Retrieve a transcript from YouTube, clean it and store it in the cache.
+        
+        Raises:
+            HTTPException: 404 if there are no subtitles, 5xx if retrieval failed
+        """
+        # Get subtitles from YouTube
+        logger.info("[TRANSCRIPT] Fetching subtitles from YouTube API")
+        try:
+            logger.info(f"[TRANSCRIPT] Calling YouTubeService.get_subtitles with params: video_id={video_id}, lang={language if language != 'auto' else None}, auto_generated={auto_generated}")
+            # Interactive requests are admitted ahead of batch work; when the
+            # queue is full this fails fast with 503 and Retry-After
+            async with get_upstream_scheduler().slot(bounded=True):
+                transcript, detected_lang = await self.youtube_service.get_subtitles(
+                    video_id,
+                    lang=language if language != 'auto' else None,
+                    auto_generated=auto_generated
+                )
+            logger.info(f"[TRANSCRIPT] YouTubeService.get_subtitles returned: transcript={bool(transcript)}, detected_lang={detected_lang}")
+            logger.info(f"[TRANSCRIPT] Successfully retrieved subtitles")
+            if detected_lang:
+                logger.info(f"[TRANSCRIPT] Detected language: {detected_lang}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            error_msg = f"Error fetching subtitles: {str(e)}"
+            logger.error(f"[TRANSCRIPT] {error_msg}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=ErrorResponse(
+                    error="youtube_api_error",
+                    message=error_msg
+                ).dict()
+            )
+        
+        request_duration = time.time() - start_time
+        logger.info(f"[TRANSCRIPT] Subtitle retrieval completed in {request_duration:.2f} seconds")
+        
+        if not transcript:
+            # If the error message is a dictionary, use it directly
+            if isinstance(detected_lang, dict):
+                error_response = detected_lang
+            else:
+                error_response = {
+                    "error": "no_subtitles",
+                    "message": f"No subtitles found for video {video_id}",
+                    "details": {
+                        "video_id": video_id,
+                        "language": language,
+                        "auto_generated": auto_generated,
+                        "reason": detected_lang
+                    }
+                }
+            
+            logger.error(f"[TRANSCRIPT] {error_response}")
+            if error_response.get("error") == "deadline_exceeded":
+                # The backends ran out of time; say so instead of reporting missing subtitles
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail=error_response
+                )
+            failure_class = classify_failure(detected_lang)
+            if failure_class and negative_cache:
+                error_response["failure_class"] = failure_class
+                negative_cache.put(video_id, language, auto_generated, failure_class, error_response)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=error_response
+            )
+        
+        # Clean the transcript
+        logger.info("[TRANSCRIPT] Cleaning subtitles")
+        try:
+            cleaned_transcript = subtitle_service.clean_subtitles(transcript)
+            logger.info(f"[TRANSCRIPT] Subtitles cleaned. Original length: {len(transcript)}, Cleaned length: {len(cleaned_transcript)}")
+        except Exception as e:
+            error_msg = f"Error cleaning subtitles: {str(e)}"
+            logger.error(f"[TRANSCRIPT] {error_msg}", exc_info=True)
+            # Fallback to original transcript if cleaning fails
+            cleaned_transcript = transcript
+        
+        # Prepare metadata
+        metadata = {
+            "processing_time": request_duration,
+            "original_length": len(transcript),
+            "cleaned_length": len(cleaned_transcript),
+            "language_detected": detected_lang or language,
+            "auto_generated": auto_generated,
+            "cache": "miss"
+        }
+        
+        await run_disk_io(
+            self._write_cache,
+            video_id, language, auto_generated, detected_lang, transcript, cleaned_transcript
+        )
+        
+        logger.info(f"[TRANSCRIPT] Transcript processing completed successfully")
+        return cleaned_transcript, detected_lang, metadata
+
+    @staticmethod
+    def _cached_result(
+        cached: Dict[str, Any],
+        language: str,
+        auto_generated: bool,
+        start_time: float,
+        cache_state: str
+    ) -> Tuple[Optional[str], Optional[str], Dict[str, Any]]:
+        """Build the transcript result for a cache entry; cache_state is "hit" or "stale"."""
+        metadata = {
+            "processing_time": time.time() - start_time,
+            "original_length": len(cached["raw"]),
+            "cleaned_length": len(cached["cleaned"]),
+            "language_detected": cached["language"] or language,
+            "auto_generated": auto_generated,
+            "cache": cache_state,
+            "cache_age": cached["age"]
+        }
+        return cached["cleaned"], cached["language"] or None, metadata
+
+    @staticmethod
+    def _is_transient(error: HTTPException) -> bool:
+        """
+        Tell whether a failed retrieval may be answered with a stale transcript.
+        
+        Server-side failures (errors, overload, deadlines) and backend failures that
+        are not classified as definitive are; removed, private or subtitle-less
+        videos are not.
+        """
+        if error.status_code >= 500:
+            return True
+        detail = error.detail if isinstance(error.detail, dict) else {}
+        return (
+            error.status_code == 404
+            and detail.get("error") == "retrieval_failed"
+            and "failure_class" not in detail
+            and classify_failure(detail) is None
+        )
+
+    def _revalidate(self, video_id: str, language: str, auto_generated: bool) -> None:
+        """Refresh a stale transcript in the background unless a refresh is already running."""
+        key = (video_id, language, auto_generated)
+        if key in _revalidations:
+            return
+        # A fresh context: the refresh must not inherit the request's deadline or priority
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(video_id, language, auto_generated), context=contextvars.Context()
+        )
+        _revalidations[key] = task
+        task.add_done_callback(lambda _: _revalidations.pop(key, None))
+
+    async def _refresh(self, video_id: str, language: str, auto_generated: bool) -> None:
+        """Fetch a transcript again at batch priority, keeping the stale entry if that fails."""
+        current_priority.set(BATCH)
+        try:
+            with deadline_scope(settings.REQUEST_TIMEOUT_MAX):
+                await self._fetch_transcript(video_id, language, auto_generated, time.time())
+            logger.info(f"[TRANSCRIPT] Refreshed stale transcript for video {video_id}")
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            logger.warning(f"[TRANSCRIPT] Background refresh of video {video_id} failed, keeping the stale transcript: {detail}")
+
+    @staticmethod
+    def _read_cache(video_id: str, language: str, auto_generated: bool) -> Optional[Dict[str, Any]]:
+        """Look up a transcript in the persistent cache, treating cache errors as misses."""
+        if transcript_cache is None:
+            return None
+        try:
+            return transcript_cache.get(video_id, language, auto_generated, allow_stale=True)
+        except Exception as e:
+            logger.warning(f"[TRANSCRIPT] Could not read transcript cache: {str(e)}")
+            return None
+
+    @staticmethod
+    def _write_cache(
+        video_id: str,
+        language: str,
+        auto_generated: bool,
+        detected_lang: Optional[str],
+        transcript: str,
+        cleaned_transcript: str
+    ) -> None:
+        """Store a transcript in the persistent cache, logging instead of failing on cache errors."""
+        if transcript_cache is None:
+            return
+        try:
+            transcript_cache.put(
+                video_id, language, auto_generated,
+                detected_lang or "", transcript, cleaned_transcript
+            )
+        except Exception as e:
+            logger.warning(f"[TRANSCRIPT] Could not write transcript cache: {str(e)}")
+
     @staticmethod
     def validate_language(language: str) -> None:
         """
@@ -6,17 +6,21 @@ import asyncio
 import logging
 import pkg_resources
 import json
-import tempfile
 import os
-from typing import Optional, Tuple, List, Dict, Any
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from typing import Optional, Tuple, List, Dict, Any, Awaitable, Set
 
 # Try to import youtube-transcript-api
 try:
     from youtube_transcript_api import YouTubeTranscriptApi
+    from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
     from youtube_transcript_api.formatters import TextFormatter
     YOUTUBE_TRANSCRIPT_AVAILABLE = True
 except ImportError:
     YOUTUBE_TRANSCRIPT_AVAILABLE = False
+    # Nothing raises them then; keep the except clauses below valid
+    NoTranscriptFound = TranscriptsDisabled = VideoUnavailable = type("TranscriptApiUnavailable", (Exception,), {})
     logger = logging.getLogger(__name__)
     logger.warning("youtube-transcript-api not available. Only yt-dlp will be used.")
 
@@ -29,10 +33,40 @@ except ImportError:
     logger = logging.getLogger(__name__)
     logger.warning("yt-dlp not available. Some features may be limited.")
 
+from ..config import settings
 from ..utils.helpers import extract_video_id
+from ..utils.ttl_cache import TTLCache
+from ..utils.page_data import extract_player_response
+from .backend_stats import BackendStats
+from .executor import run_blocking
+from .http_session import youtube_get, call_youtube, get_youtube_governor
+from .captions import parse_captions, segments_to_text
+from .circuit_breaker import CircuitBreaker, CLOSED, OPEN
+from .deadline import DeadlineExceeded, http_timeout, remaining, within_deadline
+from .negative_cache import classify_failure
 
 logger = logging.getLogger(__name__)
 
+# Reported for a backend that was still running when the request deadline ran out
+DEADLINE_MESSAGE = "Timed out: request deadline reached"
+
+# Caption formats accepted from yt-dlp, in order of preference.
+# json3/srv3 are smaller than VTT and parse without regex clean-up passes.
+CAPTION_FORMAT_PREFERENCE = ("json3", "srv3", "vtt")
+
+# LOGIN_REQUIRED covers both videos that need an account and YouTube's bot check;
+# the playability reason tells them apart
+SIGN_IN_REASONS = ("private", "members-only", "members only", "confirm your age")
+BOT_CHECK_REASONS = ("not a bot", "unusual traffic")
+
+# Expected seconds to a transcript per backend, used for ordering until
+# a backend has enough measured attempts
+BACKEND_PRIORS = {
+    "transcript_api": 1.0,
+    "timedtext": 1.5,
+    "yt_dlp": 5.0
+}
+
 def get_youtube_transcript_api_version() -> str:
     """Get the installed version of youtube-transcript-api."""
     if not YOUTUBE_TRANSCRIPT_AVAILABLE:
@@ -50,25 +84,89 @@ class YouTubeService:
         self.api_version = get_youtube_transcript_api_version() if YOUTUBE_TRANSCRIPT_AVAILABLE else "not_installed"
         logger.info(f"Using youtube-transcript-api version: {self.api_version}")
         logger.info(f"Using yt-dlp: {'available' if YT_DLP_AVAILABLE else 'not available'}")
+        # Short-lived snapshots of the caption inventory per video
+        self._inventory = TTLCache(ttl=settings.TRANSCRIPT_INVENTORY_TTL)
+        self.backend_stats = BackendStats()
+        self.breakers = {
+            backend: CircuitBreaker(
+                backend,
+                failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+            )
+            for backend in BACKEND_PRIORS
+        }
     
     def get_video_id(self, url: str) -> Optional[str]:
         """Extract video ID from URL."""
         return extract_video_id(url)
     
-    async def _handle_old_api(self, video_id: str, lang: str = "ru") -> Tuple[Optional[str], Optional[str]]:
-        """Handle transcript retrieval for older versions of the API (<=0.6.1)."""
+    @staticmethod
+    def _list_transcripts(video_id: str):
+        """List the caption tracks of a video with whichever API style is installed."""
+        if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+            return YouTubeTranscriptApi.list_transcripts(video_id)
+        return YouTubeTranscriptApi().list(video_id)
+    
+    async def get_transcript_list(self, video_id: str):
+        """
+        Get the caption inventory (TranscriptList) of a video.
+        
+        The inventory is fetched from YouTube at most once per TRANSCRIPT_INVENTORY_TTL
+        and shared by every retrieval step and the available-languages endpoint.
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            TranscriptList snapshot for the video
+        """
+        transcript_list = self._inventory.get(video_id)
+        if transcript_list is None:
+            transcript_list = await run_blocking(call_youtube, self._list_transcripts, video_id)
+            self._inventory.set(video_id, transcript_list)
+        else:
+            logger.info(f"[SUBTITLES] Using cached caption inventory for video {video_id}")
+        return transcript_list
+    
+    async def get_video_languages(self, video_id: str) -> List[Dict[str, str]]:
+        """
+        Get the languages in which subtitles exist for a video.
+        
+        Args:
+            video_id: YouTube video ID
+            
+        Returns:
+            List of dictionaries with language code and name
+        """
+        transcript_list = await self.get_transcript_list(video_id)
+        languages = []
+        seen = set()
+        for transcript in transcript_list:
+            if transcript.language_code in seen:
+                continue
+            seen.add(transcript.language_code)
+            languages.append({"code": transcript.language_code, "name": transcript.language})
+        return languages
+    
+    async def _handle_old_api(self, video_id: str, lang: str = "ru", transcript_list=None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Handle transcript retrieval for older versions of the API (<=0.6.1).
+        
+        When a TranscriptList snapshot is given, transcripts are looked up in it
+        instead of letting get_transcript list the tracks again.
+        """
         try:
-            loop = asyncio.get_event_loop()
+            if transcript_list is not None:
+                return await self._handle_old_api_snapshot(transcript_list, lang)
             
             # First try to get the transcript in the specified language
             try:
-                transcript = await loop.run_in_executor(
-                    None,
-                    lambda: YouTubeTranscriptApi.get_transcript(
-                        video_id,
-                        languages=[lang] if lang else None,
-                        preserve_formatting=True
-                    )
+                transcript = await run_blocking(
+                    call_youtube,
+                    YouTubeTranscriptApi.get_transcript,
+                    video_id,
+                    languages=[lang] if lang else None,
+                    preserve_formatting=True
                 )
                 if transcript:
                     formatter = TextFormatter()
@@ -77,12 +175,11 @@ class YouTubeService:
             except Exception as e:
                 # If that fails, try to get any available transcript
                 try:
-                    transcript = await loop.run_in_executor(
-                        None,
-                        lambda: YouTubeTranscriptApi.get_transcript(
-                            video_id,
-                            preserve_formatting=True
-                        )
+                    transcript = await run_blocking(
+                        call_youtube,
+                        YouTubeTranscriptApi.get_transcript,
+                        video_id,
+                        preserve_formatting=True
                     )
                     if transcript:
                         # We don't know the actual language with the old API, just return what we found
@@ -100,29 +197,48 @@ class YouTubeService:
             
         except Exception as e:
             return None, str(e)
+    
+    async def _handle_old_api_snapshot(self, transcript_list, lang: str) -> Tuple[Optional[str], Optional[str]]:
+        """Old API fallback that reads from an already fetched TranscriptList."""
+        # First try to get the transcript in the specified language
+        try:
+            transcript = transcript_list.find_transcript([lang] if lang else [])
+            transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
+            formatter = TextFormatter()
+            return formatter.format_transcript(transcript_pieces), lang
+        except Exception as e:
+            # If that fails, take any available transcript
+            try:
+                transcript = next(iter(transcript_list))
+                transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
+                formatter = TextFormatter()
+                return formatter.format_transcript(transcript_pieces), transcript.language_code
+            except Exception as e2:
+                logger.debug(f"Could not get any transcript: {str(e2)}")
+            
+            error_msg = str(e).lower()
+            if "no transcript found" in error_msg or "could not find a transcript" in error_msg:
+                return None, f"No {'auto-generated ' if lang == 'en' else ''}transcript available in {lang}"
+            return None, f"Error retrieving transcript (old API): {str(e)}"
             
-    async def _handle_new_api(self, video_id: str, lang: str = "ru", auto_generated: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    async def _handle_new_api(self, video_id: str, lang: str = "ru", auto_generated: bool = False, transcript_list=None) -> Tuple[Optional[str], Optional[str]]:
         """Handle transcript retrieval for newer versions of the API (>0.6.1)."""
         if not YOUTUBE_TRANSCRIPT_AVAILABLE:
             return None, "youtube-transcript-api not available"
             
         try:
-            loop = asyncio.get_event_loop()
-            
-            # Run the synchronous list_transcripts in a thread pool
-            transcript_list = await loop.run_in_executor(
-                None,
-                lambda: YouTubeTranscriptApi.list_transcripts(video_id)
-            )
+            # Reuse the request's inventory snapshot when the caller already has one
+            if transcript_list is None:
+                transcript_list = await self.get_transcript_list(video_id)
             
             # Try to get manual transcript first if auto_generated is False
             if not auto_generated:
                 try:
-                    transcript = await loop.run_in_executor(
-                        None,
-                        lambda: transcript_list.find_manually_created_transcript([lang] if lang else None)
+                    transcript = await run_blocking(
+                        transcript_list.find_manually_created_transcript,
+                        [lang] if lang else None
                     )
-                    transcript_pieces = await loop.run_in_executor(None, transcript.fetch)
+                    transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
                     formatter = TextFormatter()
                     return formatter.format_transcript(transcript_pieces), transcript.language_code
                 except Exception as e:
@@ -130,11 +246,11 @@ class YouTubeService:
             
             # If no manual transcript found or auto_generated is True, try auto-generated
             try:
-                transcript = await loop.run_in_executor(
-                    None,
-                    lambda: transcript_list.find_generated_transcript([lang] if lang else None)
+                transcript = await run_blocking(
+                    transcript_list.find_generated_transcript,
+                    [lang] if lang else None
                 )
-                transcript_pieces = await loop.run_in_executor(None, transcript.fetch)
+                transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
                 formatter = TextFormatter()
                 return formatter.format_transcript(transcript_pieces), f"{transcript.language_code} (auto-generated)"
             except Exception as e:
@@ -150,58 +266,466 @@ class YouTubeService:
                 return None, f"No transcript found in {lang}"
             return None, f"Error retrieving transcript (new API): {str(e)}"
     
+    @staticmethod
+    def _select_caption_track(info: Dict[str, Any], lang: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Pick the best caption track from the subtitles yt-dlp already extracted.
+        
+        Manual subtitles win over automatic captions, an exact language match wins over
+        a regional variant (``en`` matches ``en-US``), and formats are taken in the order
+        of CAPTION_FORMAT_PREFERENCE.
+        
+        Args:
+            info: Result of YoutubeDL.extract_info
+            lang: Requested language code, or None for the video's own language
+            
+        Returns:
+            Dictionary with url, ext, language and auto_generated, or None if nothing matches
+        """
+        wanted = lang or info.get('language')
+        for source, auto_generated in (('subtitles', False), ('automatic_captions', True)):
+            tracks = info.get(source) or {}
+            if wanted:
+                candidates = [code for code in tracks if code == wanted]
+                candidates += [code for code in tracks if code.split('-')[0] == wanted and code != wanted]
+            else:
+                candidates = [] if auto_generated else list(tracks)
+            for code in candidates:
+                formats = {fmt.get('ext'): fmt for fmt in tracks[code] if fmt.get('url')}
+                for ext in CAPTION_FORMAT_PREFERENCE:
+                    if ext in formats:
+                        return {
+                            'url': formats[ext]['url'],
+                            'ext': ext,
+                            'language': code,
+                            'auto_generated': auto_generated
+                        }
+        return None
+    
+    @staticmethod
+    def _select_timedtext_track(
+        player_response: Dict[str, Any],
+        lang: Optional[str],
+        auto_generated: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pick a caption track from the captionTracks of ytInitialPlayerResponse.
+        
+        Manual tracks win over speech recognition (``kind: asr``) tracks unless
+        auto_generated is set, and an exact language match wins over a regional variant.
+        Without a language the player's default track is used.
+        
+        Args:
+            player_response: Decoded ytInitialPlayerResponse
+            lang: Requested language code, or None for the video's own language
+            auto_generated: Whether to prefer auto-generated tracks
+            
+        Returns:
+            The captionTracks entry, or None if nothing matches
+        """
+        renderer = (player_response.get('captions') or {}).get('playerCaptionsTracklistRenderer') or {}
+        tracks = [track for track in renderer.get('captionTracks') or [] if track.get('baseUrl')]
+        if not tracks:
+            return None
+        
+        if not lang:
+            for audio_track in renderer.get('audioTracks') or []:
+                index = audio_track.get('defaultCaptionTrackIndex')
+                if isinstance(index, int) and 0 <= index < len(renderer['captionTracks']):
+                    track = renderer['captionTracks'][index]
+                    if track.get('baseUrl'):
+                        return track
+            manual = [track for track in tracks if track.get('kind') != 'asr']
+            return (manual or tracks)[0]
+        
+        kinds = (True, False) if auto_generated else (False, True)
+        for want_asr in kinds:
+            candidates = [track for track in tracks if (track.get('kind') == 'asr') == want_asr]
+            for track in candidates:
+                if track.get('languageCode') == lang:
+                    return track
+            for track in candidates:
+                if (track.get('languageCode') or '').split('-')[0] == lang:
+                    return track
+        return None
+    
+    def _get_subtitles_with_timedtext(
+        self,
+        video_id: str,
+        lang: Optional[str] = "ru",
+        auto_generated: bool = False
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get subtitles straight from YouTube's timedtext endpoint.
+        
+        The watch page is fetched once over the shared HTTP session, the caption
+        tracks are read from ytInitialPlayerResponse, and the chosen track's baseUrl
+        is requested as json3. This needs two HTTP requests and no extractor.
+        """
+        try:
+            logger.info(f"[SUBTITLES] Fetching watch page for video {video_id}")
+            response = youtube_get(f"https://www.youtube.com/watch?v={video_id}&hl=en&bpctr=9999999999&has_verified=1")
+            response.raise_for_status()
+            
+            player_response = extract_player_response(response.text)
+            if player_response is None:
+                return None, "Could not find ytInitialPlayerResponse in the watch page"
+            
+            playability = player_response.get('playabilityStatus') or {}
+            status = playability.get('status')
+            if status == 'LOGIN_REQUIRED':
+                reason = " ".join([str(playability.get('reason') or '')] + [str(message) for message in playability.get('messages') or []])
+                if any(marker in reason.lower() for marker in BOT_CHECK_REASONS):
+                    # A bot check is throttling, not a property of the video
+                    get_youtube_governor().report_throttled()
+                    return None, f"Throttled by YouTube: {reason.strip()}"
+                if any(marker in reason.lower() for marker in SIGN_IN_REASONS):
+                    return None, "Video is private or requires sign-in"
+                return None, f"YouTube asked to sign in: {reason.strip() or 'no reason given'}"
+            if status in ('ERROR', 'UNPLAYABLE'):
+                return None, "Video is not available (may have been removed)"
+            if not player_response.get('captions'):
+                return None, "No subtitles available for this video"
+            
+            track = self._select_timedtext_track(player_response, lang, auto_generated)
+            if track is None:
+                return None, f"No subtitles available in {lang}"
+            
+            # Ask for json3 regardless of the format in the track URL
+            parts = urlsplit(track['baseUrl'])
+            query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'fmt']
+            query.append(('fmt', 'json3'))
+            url = urlunsplit(parts._replace(query=urlencode(query)))
+            
+            language = track.get('languageCode') or lang
+            logger.info(f"[SUBTITLES] Fetching timedtext track ({language}) for video {video_id}")
+            response = youtube_get(url)
+            response.raise_for_status()
+            if not response.content:
+                return None, "YouTube returned an empty timedtext response"
+            
+            segments = parse_captions(response.content, 'json3')
+            if not segments:
+                return None, "Downloaded subtitles are empty"
+            
+            if track.get('kind') == 'asr':
+                language = f"{language} (auto-generated)"
+            return segments_to_text(segments), language
+            
+        except Exception as e:
+            logger.error(f"[SUBTITLES] Error in timedtext: {str(e)}")
+            return None, f"Error retrieving transcript with timedtext: {str(e)}"
+    
     def _get_subtitles_with_ytdlp(self, video_id: str, lang: str = "ru") -> Tuple[Optional[str], Optional[str]]:
-        """Get subtitles using yt-dlp as a fallback."""
+        """
+        Get subtitles using yt-dlp as a fallback.
+        
+        The watch page is extracted once; the caption track URL is taken from the
+        extracted info and fetched over the shared HTTP session, so nothing is
+        written to disk.
+        """
         if not YT_DLP_AVAILABLE:
             return None, "yt-dlp is not available"
             
         try:
-            # Create a temporary directory for the subtitles
-            with tempfile.TemporaryDirectory() as temp_dir:
-                ydl_opts = {
-                    'skip_download': True,
-                    'writesubtitles': True,
-                    'writeautomaticsub': True,
-                    'subtitleslangs': [lang],
-                    'quiet': True,
-                    'no_warnings': True,
-                    'outtmpl': os.path.join(temp_dir, '%(id)s')
-                }
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Extract info to get available subtitles
-                    logger.info(f"[SUBTITLES] Extracting info for video {video_id}")
-                    info = ydl.extract_info(f'https://www.youtube.com/watch?v={video_id}', download=False)
-                    
-                    # Check if subtitles are available
-                    if not info.get('automatic_captions') and not info.get('subtitles'):
-                        return None, "No subtitles available for this video"
-                    
-                    # Download the subtitles
-                    logger.info(f"[SUBTITLES] Downloading subtitles for video {video_id}")
-                    ydl.download([f'https://www.youtube.com/watch?v={video_id}'])
-                    
-                    # Look for the downloaded subtitle file
-                    sub_file = os.path.join(temp_dir, f"{video_id}.{lang}.vtt")
-                    if not os.path.exists(sub_file):
-                        # Try with auto-generated subtitles
-                        sub_file = os.path.join(temp_dir, f"{video_id}.{lang}.vtt")
-                        if not os.path.exists(sub_file):
-                            return None, "Could not find downloaded subtitles"
-                    
-                    # Read and return the subtitle content
-                    logger.info(f"[SUBTITLES] Reading subtitles from {sub_file}")
-                    with open(sub_file, 'r', encoding='utf-8') as f:
-                        return f.read(), None
+            ydl_opts = {
+                'skip_download': True,
+                'quiet': True,
+                'no_warnings': True,
+                'socket_timeout': http_timeout(settings.UPSTREAM_HTTP_TIMEOUT)
+            }
+            
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                # Extract info to get available subtitles
+                logger.info(f"[SUBTITLES] Extracting info for video {video_id}")
+                info = call_youtube(ydl.extract_info, f'https://www.youtube.com/watch?v={video_id}', download=False)
+            
+            # Check if subtitles are available
+            if not info.get('automatic_captions') and not info.get('subtitles'):
+                return None, "No subtitles available for this video"
+            
+            track = self._select_caption_track(info, lang)
+            if track is None:
+                return None, f"No subtitles available in {lang}"
+            
+            # Fetch and parse the track in memory
+            logger.info(f"[SUBTITLES] Fetching {track['ext']} subtitles ({track['language']}) for video {video_id}")
+            response = youtube_get(track['url'])
+            response.raise_for_status()
+            
+            segments = parse_captions(response.content, track['ext'])
+            if not segments:
+                return None, "Downloaded subtitles are empty"
+            
+            language = track['language']
+            if track['auto_generated']:
+                language = f"{language} (auto-generated)"
+            return segments_to_text(segments), language
                         
         except Exception as e:
             logger.error(f"[SUBTITLES] Error in yt-dlp: {str(e)}")
             return None, f"Error retrieving transcript with yt-dlp: {str(e)}"
     
+    async def _get_subtitles_with_transcript_api(
+        self,
+        video_id: str,
+        lang: Optional[str],
+        auto_generated: bool,
+        errors: List[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get subtitles using youtube-transcript-api (native language, new API, then old API).
+        
+        Failures that another backend might overcome are appended to errors.
+        
+        Returns:
+            (transcript_text, language) on success, (None, message) when the video itself
+            is unavailable, private or has subtitles disabled, and (None, None) otherwise
+        """
+        try:
+            # Fetch the caption inventory once; every step below reuses this snapshot.
+            # If listing fails, the other youtube-transcript-api calls would fail the same way.
+            transcript_list = await self.get_transcript_list(video_id)
+            
+            # If no language specified, try to get native language subtitles
+            if lang is None:
+                logger.info("[SUBTITLES] No language specified, trying to get native language subtitles")
+                try:
+                    # First try to get the video's native language
+                    native_lang = transcript_list.video_language_code
+                    logger.info(f"[SUBTITLES] Found video's native language: {native_lang}")
+                    
+                    # Try to get manual subtitles in native language
+                    try:
+                        transcript = transcript_list.find_manually_created_transcript([native_lang])
+                        transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
+                        formatter = TextFormatter()
+                        return formatter.format_transcript(transcript_pieces), native_lang
+                    except Exception as e:
+                        logger.info(f"[SUBTITLES] No manual subtitles in native language, trying auto-generated: {str(e)}")
+                        # If no manual subtitles, try auto-generated in native language
+                        try:
+                            transcript = transcript_list.find_generated_transcript([native_lang])
+                            transcript_pieces = await run_blocking(call_youtube, transcript.fetch)
+                            formatter = TextFormatter()
+                            return formatter.format_transcript(transcript_pieces), f"{native_lang} (auto-generated)"
+                        except Exception as e2:
+                            logger.info(f"[SUBTITLES] No auto-generated subtitles in native language: {str(e2)}")
+                except Exception as e:
+                    logger.warning(f"[SUBTITLES] Could not determine native language: {str(e)}")
+                    pass  # Continue with the rest of the logic
+            
+            # If we get here, either a specific language was requested or we couldn't determine native language
+            logger.info(f"[SUBTITLES] Trying to get subtitles for language: {lang if lang else 'any'}")
+            
+            # Try with the new API first if available
+            if pkg_resources.parse_version(self.api_version) > pkg_resources.parse_version("0.6.1"):
+                logger.info("[SUBTITLES] Using new API")
+                result = await self._handle_new_api(video_id, lang, auto_generated, transcript_list)
+                if result[0] is not None:
+                    logger.info(f"[SUBTITLES] Successfully retrieved transcript using new API in language: {result[1]}")
+                    return result
+                errors.append(f"New API: {result[1] if len(result) > 1 else 'Unknown error'}")
+            
+            # Fall back to old API if new API fails or is not available
+            logger.info("[SUBTITLES] Using old API")
+            result = await self._handle_old_api(video_id, lang if lang else 'en', transcript_list)
+            if result[0] is not None:
+                logger.info(f"[SUBTITLES] Successfully retrieved transcript using old API in language: {result[1]}")
+                return result
+            errors.append(f"Old API: {result[1] if len(result) > 1 else 'Unknown error'}")
+                    
+        # Only the library's own verdicts about the video are definitive; request and
+        # HTTP errors (including a failed listing) may pass and stay uncached
+        except VideoUnavailable as e:
+            logger.info(f"[SUBTITLES] youtube-transcript-api: video unavailable ({type(e).__name__})")
+            return None, "Video is not available (may have been removed)"
+        except TranscriptsDisabled:
+            logger.info("[SUBTITLES] youtube-transcript-api: subtitles are disabled")
+            return None, "Subtitles are disabled for this video"
+        except NoTranscriptFound:
+            logger.info(f"[SUBTITLES] youtube-transcript-api: no transcript in {lang if lang else 'any language'}")
+            errors.append(f"youtube-transcript-api: No transcript found in {lang if lang else 'any language'}")
+        except Exception as e:
+            logger.error(f"[SUBTITLES] Error in youtube-transcript-api: {type(e).__name__}: {str(e)}")
+            errors.append(f"youtube-transcript-api error: {type(e).__name__}: {str(e)}")
+        
+        return None, None
+    
+    def _is_healthy(self, result: Tuple[Optional[str], Any], new_errors: List[str]) -> bool:
+        """
+        Decide whether a backend attempt says the backend itself works.
+        
+        A transcript, or a definitive answer about the video (private, disabled,
+        no transcript in the language), counts as healthy; errors such as timeouts,
+        HTTP 429 or parser failures do not.
+        """
+        if result[0] is not None:
+            return True
+        messages = [result[1]] if result[1] is not None else new_errors
+        return bool(messages) and all(classify_failure(message) is not None for message in messages)
+    
+    async def _timed(
+        self,
+        backend: str,
+        awaitable: Awaitable[Tuple[Optional[str], Any]],
+        errors: Optional[List[str]] = None
+    ) -> Tuple[Optional[str], Any]:
+        """
+        Await a backend attempt, record its latency and outcome, and report it to the backend's breaker.
+        
+        Args:
+            backend: Backend name
+            awaitable: The attempt
+            errors: Error list the attempt appends to, used to judge (None, None) results
+        """
+        breaker = self.breakers.get(backend)
+        mark = len(errors) if errors is not None else 0
+        start_time = time.monotonic()
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            if breaker:
+                breaker.release()
+            raise
+        except Exception:
+            self.backend_stats.record(backend, time.monotonic() - start_time, False)
+            if breaker:
+                breaker.record_failure()
+            raise
+        self.backend_stats.record(backend, time.monotonic() - start_time, result[0] is not None)
+        if breaker:
+            if self._is_healthy(result, errors[mark:] if errors is not None else []):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        return result
+    
+    def backend_order(self) -> List[str]:
+        """
+        Order the backends for sequential retrieval.
+        
+        Each backend is scored by its expected time to a transcript, rolling p50 latency
+        divided by rolling success rate; until it has SUBTITLE_BACKEND_MIN_SAMPLES attempts
+        its prior from BACKEND_PRIORS is used. Backends with an open breaker go last.
+        
+        Returns:
+            Backend names, best first
+        """
+        stats = self.backend_stats.snapshot()
+        
+        def score(backend: str) -> float:
+            entry = stats.get(backend)
+            if not entry or entry["attempts"] < settings.SUBTITLE_BACKEND_MIN_SAMPLES or entry["p50_latency"] is None:
+                return BACKEND_PRIORS[backend]
+            return entry["p50_latency"] / max(entry["success_rate"] or 0.0, 0.05)
+        
+        return sorted(BACKEND_PRIORS, key=lambda backend: (self.breakers[backend].state == OPEN, score(backend)))
+    
+    def _backend_available(self, backend: str) -> bool:
+        """Whether a backend is installed and enabled."""
+        if backend == "transcript_api":
+            return YOUTUBE_TRANSCRIPT_AVAILABLE
+        if backend == "yt_dlp":
+            return YT_DLP_AVAILABLE
+        return settings.SUBTITLE_TIMEDTEXT_ENABLED
+    
+    def _attempt(
+        self,
+        backend: str,
+        video_id: str,
+        lang: Optional[str],
+        auto_generated: bool,
+        errors: List[str]
+    ) -> Awaitable[Tuple[Optional[str], Optional[str]]]:
+        """Start one attempt of a backend."""
+        if backend == "transcript_api":
+            return self._get_subtitles_with_transcript_api(video_id, lang, auto_generated, errors)
+        if backend == "yt_dlp":
+            return run_blocking(self._get_subtitles_with_ytdlp, video_id, lang)
+        return run_blocking(self._get_subtitles_with_timedtext, video_id, lang, auto_generated)
+    
+    async def _get_subtitles_hedged(
+        self,
+        video_id: str,
+        lang: Optional[str],
+        auto_generated: bool,
+        errors: List[str],
+        backend_errors: Dict[str, str],
+        started: Set[str]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Race youtube-transcript-api against a delayed yt-dlp attempt.
+        
+        yt-dlp is only started if youtube-transcript-api has not answered within
+        SUBTITLE_HEDGE_DELAY seconds. The first valid transcript wins; the other
+        attempt is cancelled (or, for yt-dlp running in a thread, ignored).
+        The names of the backends that were started are added to started.
+        
+        Returns:
+            Same contract as _get_subtitles_with_transcript_api
+        """
+        started.add("transcript_api")
+        attempts = {
+            asyncio.ensure_future(self._timed(
+                "transcript_api",
+                self._get_subtitles_with_transcript_api(video_id, lang, auto_generated, errors),
+                errors
+            )): "transcript_api"
+        }
+        
+        done, _ = await asyncio.wait(attempts, timeout=settings.SUBTITLE_HEDGE_DELAY)
+        if not done:
+            logger.info(f"[SUBTITLES] No answer after {settings.SUBTITLE_HEDGE_DELAY}s, starting hedged yt-dlp attempt")
+            started.add("yt_dlp")
+            attempts[asyncio.ensure_future(self._timed(
+                "yt_dlp",
+                run_blocking(self._get_subtitles_with_ytdlp, video_id, lang)
+            ))] = "yt_dlp"
+        
+        pending = set(attempts)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    backend = attempts[task]
+                    result = task.result()
+                    if result[0] is not None:
+                        logger.info(f"[SUBTITLES] Hedged retrieval won by {backend}")
+                        self.backend_stats.record_win(backend)
+                        return result
+                    if backend == "yt_dlp":
+                        backend_errors["yt_dlp"] = f"yt-dlp: {result[1] if result[1] else 'Unknown error'}"
+                    elif result[1] is not None:
+                        # The video itself is unavailable; yt-dlp cannot do better
+                        return result
+                
+                # youtube-transcript-api failed before the hedge delay ran out
+                if not pending and len(attempts) == 1:
+                    started.add("yt_dlp")
+                    result = await self._timed(
+                        "yt_dlp",
+                        run_blocking(self._get_subtitles_with_ytdlp, video_id, lang)
+                    )
+                    if result[0] is not None:
+                        self.backend_stats.record_win("yt_dlp")
+                        return result
+                    backend_errors["yt_dlp"] = f"yt-dlp: {result[1] if result[1] else 'Unknown error'}"
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        return None, None
+    
     async def get_subtitles(self, video_id: str, lang: str = None, auto_generated: bool = False) -> Tuple[Optional[str], Optional[str]]:
         """
         Get subtitles for a YouTube video, trying multiple methods.
         
+        Backends are tried in the order chosen by backend_order; a backend whose
+        circuit breaker is open is skipped. Every attempt runs within the request
+        deadline (see app.services.deadline); when it runs out, outstanding attempts
+        are cancelled and the error reports what each backend had answered so far.
+        
         Args:
             video_id: YouTube video ID
             lang: Language code (e.g., 'en', 'ru', 'he'). If None, will try to get native language subtitles.
@@ -213,90 +737,109 @@ class YouTubeService:
         """
         logger.info(f"[SUBTITLES] Starting subtitle retrieval for video {video_id} with lang={lang}, auto_generated={auto_generated}")
         logger.info(f"[SUBTITLES] Using youtube-transcript-api version: {self.api_version}")
-        errors = []
+        errors = []  # youtube-transcript-api: new API, then old API
+        backend_errors: Dict[str, str] = {}
         
-        # Try youtube-transcript-api first if available
-        if YOUTUBE_TRANSCRIPT_AVAILABLE:
+        # Hedged mode races both backends instead of trying them one after another
+        hedge = (
+            settings.SUBTITLE_HEDGING_ENABLED and YOUTUBE_TRANSCRIPT_AVAILABLE and YT_DLP_AVAILABLE
+            and self.breakers["transcript_api"].state == CLOSED and self.breakers["yt_dlp"].state == CLOSED
+        )
+        if hedge:
+            started: Set[str] = set()
             try:
-                # If no language specified, try to get native language subtitles
-                if lang is None:
-                    logger.info("[SUBTITLES] No language specified, trying to get native language subtitles")
-                    try:
-                        # First try to get the video's native language
-                        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                        native_lang = transcript_list.video_language_code
-                        logger.info(f"[SUBTITLES] Found video's native language: {native_lang}")
-                        
-                        # Try to get manual subtitles in native language
-                        try:
-                            transcript = transcript_list.find_manually_created_transcript([native_lang])
-                            transcript_pieces = transcript.fetch()
-                            formatter = TextFormatter()
-                            return formatter.format_transcript(transcript_pieces), native_lang
-                        except Exception as e:
-                            logger.info(f"[SUBTITLES] No manual subtitles in native language, trying auto-generated: {str(e)}")
-                            # If no manual subtitles, try auto-generated in native language
-                            try:
-                                transcript = transcript_list.find_generated_transcript([native_lang])
-                                transcript_pieces = transcript.fetch()
-                                formatter = TextFormatter()
-                                return formatter.format_transcript(transcript_pieces), f"{native_lang} (auto-generated)"
-                            except Exception as e2:
-                                logger.info(f"[SUBTITLES] No auto-generated subtitles in native language: {str(e2)}")
-                    except Exception as e:
-                        logger.warning(f"[SUBTITLES] Could not determine native language: {str(e)}")
-                        pass  # Continue with the rest of the logic
-                
-                # If we get here, either a specific language was requested or we couldn't determine native language
-                logger.info(f"[SUBTITLES] Trying to get subtitles for language: {lang if lang else 'any'}")
-                
-                # Try with the new API first if available
-                if pkg_resources.parse_version(self.api_version) > pkg_resources.parse_version("0.6.1"):
-                    logger.info("[SUBTITLES] Using new API")
-                    result = await self._handle_new_api(video_id, lang, auto_generated)
-                    if result[0] is not None:
-                        logger.info(f"[SUBTITLES] Successfully retrieved transcript using new API in language: {result[1]}")
-                        return result
-                    errors.append(f"New API: {result[1] if len(result) > 1 else 'Unknown error'}")
-                
-                # Fall back to old API if new API fails or is not available
-                logger.info("[SUBTITLES] Using old API")
-                result = await self._handle_old_api(video_id, lang if lang else 'en')
-                if result[0] is not None:
-                    logger.info(f"[SUBTITLES] Successfully retrieved transcript using old API in language: {result[1]}")
-                    return result
-                errors.append(f"Old API: {result[1] if len(result) > 1 else 'Unknown error'}")
-                        
-            except Exception as e:
-                error_msg = str(e).lower()
-                logger.error(f"[SUBTITLES] Error in youtube-transcript-api: {error_msg}")
-                if any(term in error_msg for term in ["video unavailable", "not found", "does not exist"]):
-                    return None, "Video is not available (may have been removed)"
-                elif "private" in error_msg or "members only" in error_msg:
-                    return None, "Video is private or requires sign-in"
-                elif "disabled" in error_msg:
-                    return None, "Subtitles are disabled for this video"
-                errors.append(f"youtube-transcript-api error: {str(e)}")
+                result = await within_deadline(
+                    self._get_subtitles_hedged(video_id, lang, auto_generated, errors, backend_errors, started)
+                )
+            except DeadlineExceeded:
+                logger.warning(f"[SUBTITLES] Request deadline reached during hedged retrieval for video {video_id}")
+                if "transcript_api" in started and not errors:
+                    errors.append(DEADLINE_MESSAGE)
+                if "yt_dlp" in started:
+                    backend_errors.setdefault("yt_dlp", f"yt-dlp: {DEADLINE_MESSAGE}")
+                return None, self._failure_response(video_id, lang, errors, backend_errors, timed_out=True)
+            if result[0] is not None or result[1] is not None:
+                return result
+            order = ["timedtext"]
         else:
-            errors.append("youtube-transcript-api not installed")
+            order = self.backend_order()
+            logger.info(f"[SUBTITLES] Backend order: {order}")
         
-        # If we get here, youtube-transcript-api failed or is not available, try yt-dlp
-        if YT_DLP_AVAILABLE:
-            logger.info(f"[SUBTITLES] Trying yt-dlp for language: {lang}")
-            result = self._get_subtitles_with_ytdlp(video_id, lang)
+        for backend in order:
+            if not self._backend_available(backend):
+                if backend == "transcript_api":
+                    errors.append("youtube-transcript-api not installed")
+                elif backend == "yt_dlp":
+                    backend_errors["yt_dlp"] = "yt-dlp not installed"
+                continue
+            left = remaining()
+            if left is not None and left <= 0:
+                logger.warning(f"[SUBTITLES] Request deadline reached before trying {backend} for video {video_id}")
+                return None, self._failure_response(video_id, lang, errors, backend_errors, timed_out=True)
+            if not self.breakers[backend].allow():
+                logger.warning(f"[SUBTITLES] Skipping {backend}: circuit breaker open")
+                message = "Skipped: circuit breaker open"
+                if backend == "transcript_api":
+                    errors.append(message)
+                else:
+                    backend_errors[backend] = message
+                continue
+            
+            logger.info(f"[SUBTITLES] Trying {backend} for language: {lang}")
+            try:
+                result = await within_deadline(self._timed(
+                    backend,
+                    self._attempt(backend, video_id, lang, auto_generated, errors),
+                    errors if backend == "transcript_api" else None
+                ))
+            except DeadlineExceeded:
+                logger.warning(f"[SUBTITLES] Request deadline reached while trying {backend} for video {video_id}")
+                if backend == "transcript_api":
+                    errors.append(DEADLINE_MESSAGE)
+                elif backend == "yt_dlp":
+                    backend_errors["yt_dlp"] = f"yt-dlp: {DEADLINE_MESSAGE}"
+                else:
+                    backend_errors[backend] = DEADLINE_MESSAGE
+                return None, self._failure_response(video_id, lang, errors, backend_errors, timed_out=True)
             if result[0] is not None:
-                logger.info("[SUBTITLES] Successfully retrieved transcript using yt-dlp")
+                logger.info(f"[SUBTITLES] Successfully retrieved transcript using {backend}")
+                self.backend_stats.record_win(backend)
                 return result
+            if backend == "transcript_api":
+                if result[1] is not None:
+                    # The video itself is unavailable, private or has subtitles disabled
+                    return result
+            elif backend == "yt_dlp":
+                backend_errors["yt_dlp"] = f"yt-dlp: {result[1] if result[1] else 'Unknown error'}"
             else:
-                errors.append(f"yt-dlp: {result[1] if result[1] else 'Unknown error'}")
-        else:
-            errors.append("yt-dlp not installed")
+                backend_errors[backend] = result[1] or "Unknown error"
         
         # If we get here, all methods failed
+        return None, self._failure_response(video_id, lang, errors, backend_errors)
+    
+    def _failure_response(
+        self,
+        video_id: str,
+        lang: Optional[str],
+        errors: List[str],
+        backend_errors: Dict[str, str],
+        timed_out: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Build the error dictionary returned when no backend produced a transcript.
+        
+        Args:
+            video_id: YouTube video ID
+            lang: Requested language
+            errors: youtube-transcript-api errors (new API, then old API)
+            backend_errors: Errors of the other backends by name
+            timed_out: Whether retrieval stopped because the request deadline ran out
+        """
         error_details = {
             "new_api": errors[0] if len(errors) > 0 else "Not attempted",
             "old_api": errors[1] if len(errors) > 1 else "Not attempted",
-            "yt_dlp": errors[2] if len(errors) > 2 else "Not attempted"
+            "yt_dlp": backend_errors.get("yt_dlp", "Not attempted"),
+            "timedtext": backend_errors.get("timedtext", "Not attempted")
         }
         
         # Translate error messages to Russian
@@ -306,13 +849,17 @@ class YouTubeService:
             "old_api": error_details["old_api"].replace("Could not retrieve transcript (old API):\n", "Не удалось получить транскрипт (старый API):\n")
             if isinstance(error_details["old_api"], str) else error_details["old_api"],
             "yt_dlp": error_details["yt_dlp"].replace("Error retrieving transcript with yt-dlp: ERROR:", "Ошибка получения транскрипта с yt-dlp: ОШИБКА:")
-            if isinstance(error_details["yt_dlp"], str) else error_details["yt_dlp"]
+            if isinstance(error_details["yt_dlp"], str) else error_details["yt_dlp"],
+            "timedtext": error_details["timedtext"]
         }
         
-        logger.error(f"[SUBTITLES] All methods failed. Errors: {error_details}")
-        return None, {
-            "error": "retrieval_failed",
-            "message": "Не удалось получить транскрипт",
+        if timed_out:
+            logger.error(f"[SUBTITLES] Request deadline exceeded. Errors so far: {error_details}")
+        else:
+            logger.error(f"[SUBTITLES] All methods failed. Errors: {error_details}")
+        return {
+            "error": "deadline_exceeded" if timed_out else "retrieval_failed",
+            "message": "Время ожидания запроса истекло" if timed_out else "Не удалось получить транскрипт",
             "video": {
                 "url": f"https://www.youtube.com/watch?v={video_id}",
                 "id": video_id,
@@ -1,14 +1,90 @@
 import requests
+import httpx
 from urllib.parse import quote_plus, urlparse, parse_qs
-import re
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
+from app.config import settings
+from app.services.channel_feed import FEED_MAX_ENTRIES, get_channel_videos_feed, get_channel_videos_feed_async
+from app.services.channel_pages import video_from_renderer
+from app.services.channel_resolver import get_channel_resolver
+from app.services.deadline import DeadlineExceeded
+from app.services.http_session import youtube_get, youtube_get_async
+from app.services.scheduler import AdmissionRejected
+from app.utils.page_data import extract_initial_data, renderer_text, walk_renderers
+
+# Headers to mimic a browser
+SEARCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8,he;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+}
+VIDEOS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8,he;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+}
+
 class YouTubeSearcher:
     @staticmethod
-    def search_channels(query: str, max_results: int = 5) -> dict:
+    def _search_url(query: str) -> str:
+        """Build the search URL, filtering for channels."""
+        return f"https://www.youtube.com/results?search_query={quote_plus(query)}&sp=EgIQAg%3D%3D"
+    
+    @staticmethod
+    def _parse_channel_results(html: str, query: str, max_results: int) -> dict:
+        """Extract channel results from the channelRenderer items of a search page."""
+        data = extract_initial_data(html) or {}
+        
+        # Format the results
+        results = []
+        for _, renderer in walk_renderers(data, ("channelRenderer",)):
+            if len(results) >= max_results:
+                break
+            channel_id = renderer.get('channelId', '')
+            # Skip shorts and other non-channel results
+            if 'shorts' in channel_id.lower() or not channel_id.startswith('UC'):
+                continue
+                
+            results.append({
+                'channel_id': channel_id,
+                'title': renderer_text(renderer.get('title')),
+                'url': f'https://www.youtube.com/channel/{channel_id}'
+            })
+        
+        if not results:
+            return {
+                'status': 'error',
+                'message': 'No channels found matching the search criteria',
+                'error_type': 'NoResultsError'
+            }
+            
+        return {
+            'status': 'success',
+            'query': query,
+            'results': results,
+            'count': len(results)
+        }
+    
+    @staticmethod
+    def _error(e: Exception, network: bool = False) -> dict:
+        """Build the error result for a failed request."""
+        if network:
+            return {
+                'status': 'error',
+                'message': f'Network error occurred: {str(e)}',
+                'error_type': 'NetworkError'
+            }
+        return {
+            'status': 'error',
+            'message': f'An error occurred: {str(e)}',
+            'error_type': type(e).__name__
+        }
+    
+    @staticmethod
+    async def search_channels_async(query: str, max_results: int = 5) -> dict:
         """
-        Search for YouTube channels by query
+        Search for YouTube channels by query over the shared async client
         
         Args:
             query: Search query string
@@ -16,181 +92,215 @@ class YouTubeSearcher:
             
         Returns:
             Dictionary containing search results
+            
+        Raises:
+            DeadlineExceeded: If the request deadline passes first
+            AdmissionRejected: If the upstream scheduler turns the work away
         """
         try:
-            # Encode the search query
-            query_encoded = quote_plus(query)
-            
-            # Construct the search URL (filtering for channels)
-            url = f"https://www.youtube.com/results?search_query={query_encoded}&sp=EgIQAg%3D%3D"
-            
-            # Set headers to mimic a browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8,he;q=0.7',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            }
-            
-            # Make the request with a session
-            session = requests.Session()
-            response = session.get(url, headers=headers, timeout=10)
+            response = await youtube_get_async(YouTubeSearcher._search_url(query), headers=SEARCH_HEADERS)
             response.raise_for_status()
+            return YouTubeSearcher._parse_channel_results(response.text, query, max_results)
+        except (DeadlineExceeded, AdmissionRejected):
+            raise
+        except httpx.HTTPError as e:
+            return YouTubeSearcher._error(e, network=True)
+        except Exception as e:
+            return YouTubeSearcher._error(e)
+    
+    @staticmethod
+    def search_channels(query: str, max_results: int = 5) -> dict:
+        """
+        Search for YouTube channels by query (blocking variant of search_channels_async)
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results to return (max 20)
             
-            # Extract channel information using regex
-            channel_pattern = r'"channelRenderer":\{"channelId":"([^"]+)".*?"title":\{"simpleText":"([^"]+)"'
-            matches = re.findall(channel_pattern, response.text)
-            
-            # If no matches found, try alternative pattern
-            if not matches:
-                channel_pattern = r'"channelId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"'
-                matches = re.findall(channel_pattern, response.text)
-            
-            # Format the results
-            results = []
-            for channel_id, title in matches[:max_results]:
-                # Skip shorts and other non-channel results
-                if 'shorts' in channel_id.lower() or not channel_id.startswith('UC'):
-                    continue
-                    
-                results.append({
-                    'channel_id': channel_id,
-                    'title': title,
-                    'url': f'https://www.youtube.com/channel/{channel_id}'
-                })
-            
-            if not results:
-                return {
-                    'status': 'error',
-                    'message': 'No channels found matching the search criteria',
-                    'error_type': 'NoResultsError'
-                }
-                
-            return {
-                'status': 'success',
-                'query': query,
-                'results': results,
-                'count': len(results)
-            }
+        Returns:
+            Dictionary containing search results
             
+        Raises:
+            DeadlineExceeded: If the request deadline passes first
+        """
+        try:
+            # Make the request over the shared session, within the outbound rate budget
+            response = youtube_get(YouTubeSearcher._search_url(query), headers=SEARCH_HEADERS)
+            response.raise_for_status()
+            return YouTubeSearcher._parse_channel_results(response.text, query, max_results)
+        except DeadlineExceeded:
+            raise
         except requests.exceptions.RequestException as e:
-            return {
-                'status': 'error',
-                'message': f'Network error occurred: {str(e)}',
-                'error_type': 'NetworkError'
-            }
+            return YouTubeSearcher._error(e, network=True)
         except Exception as e:
-            return {
-                'status': 'error',
-                'message': f'An error occurred: {str(e)}',
-                'error_type': type(e).__name__
-            }
+            return YouTubeSearcher._error(e)
+    
+    # Alias queries and title keywords of Rabbi Ginsburgh's channel
+    RABBI_GINSBURGH_QUERIES = [
+        "יצחק גינזבורג",
+        "Yitzchak Ginsburgh",
+        "Рав Гинзбург",
+        "Рав Ицхак Гинзбург",
+        "הרב יצחק גינזבורג"
+    ]
+    RABBI_GINSBURGH_NAME = "rabbi-ginsburgh"
+    RABBI_GINSBURGH_KEYWORDS = ['הרב', 'גל', 'עיני', 'יצחק', 'גינזבורג', 'הרצאות', 'הרב יצחק', 'ginsburgh']
     
     @staticmethod
-    def find_rabbi_ginsburgh_channel() -> Optional[Dict]:
+    async def find_rabbi_ginsburgh_channel_async(refresh: bool = False) -> Optional[Dict]:
         """
         Specifically search for Rabbi Yitzchak Ginsburgh's official channel
+        
+        All alias queries run concurrently and the answer is stored for
+        CHANNEL_RESOLVE_TTL, so repeated calls do not search again.
+        
+        Args:
+            refresh: Search again even if a resolved channel is stored
+        """
+        return await get_channel_resolver().resolve(
+            YouTubeSearcher.RABBI_GINSBURGH_NAME,
+            YouTubeSearcher.RABBI_GINSBURGH_QUERIES,
+            YouTubeSearcher.RABBI_GINSBURGH_KEYWORDS,
+            refresh=refresh
+        )
+    
+    @staticmethod
+    async def stored_rabbi_ginsburgh_channel_async() -> Optional[Dict]:
+        """Return Rabbi Ginsburgh's channel if a fresh resolution is stored, without searching."""
+        return await get_channel_resolver().fresh(YouTubeSearcher.RABBI_GINSBURGH_NAME)
+    
+    @staticmethod
+    def find_rabbi_ginsburgh_channel(refresh: bool = False) -> Optional[Dict]:
         """
-        searches = [
-            "יצחק גינזבורג",
-            "Yitzchak Ginsburgh",
-            "Рав Гинзбург",
-            "Рав Ицхак Гинзбург",
-            "הרב יצחק גינזבורג"
-        ]
+        Specifically search for Rabbi Yitzchak Ginsburgh's official channel (blocking variant)
         
-        for query in searches:
-            result = YouTubeSearcher.search_channels(query, max_results=5)
-            if result['status'] == 'success' and result['count'] > 0:
-                # Look for the most likely official channel
-                official_keywords = ['הרב', 'גל', 'עיני', 'יצחק', 'גינזבורג', 'הרצאות', 'הרב יצחק', 'ginsburgh']
-                
-                for channel in result['results']:
-                    title = channel['title'].lower()
-                    if any(keyword.lower() in title for keyword in official_keywords):
-                        return channel
-                
-                # If no exact match, return the first result
-                return result['results'][0]
+        Reads and stores the same resolution as find_rabbi_ginsburgh_channel_async.
+        """
+        return get_channel_resolver().resolve_blocking(
+            YouTubeSearcher.RABBI_GINSBURGH_NAME,
+            YouTubeSearcher.RABBI_GINSBURGH_QUERIES,
+            YouTubeSearcher.search_channels,
+            YouTubeSearcher.RABBI_GINSBURGH_KEYWORDS,
+            refresh=refresh
+        )
+    
+    @staticmethod
+    def _feed_result(channel_id: str, videos: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Wrap videos from the RSS feed in a channel videos result."""
+        for video in videos:
+            video['url'] = f"https://www.youtube.com/watch?v={video['video_id']}"
+        return {
+            'status': 'success',
+            'channel_id': channel_id,
+            'videos': videos,
+            'count': len(videos),
+            'source': 'rss'
+        }
+    
+    @staticmethod
+    def _parse_channel_videos(html: str, channel_id: str, max_results: int) -> Dict[str, Any]:
+        """Extract videos from the videoRenderer items of a channel's videos page."""
+        data = extract_initial_data(html) or {}
+        
+        videos = []
+        for _, renderer in walk_renderers(data, ("videoRenderer",)):
+            if len(videos) >= max_results:
+                break
+            if not renderer.get('videoId'):
+                continue
+            video = video_from_renderer(renderer)
+            video['title'] = video['title'].replace('\n', ' ').strip()
+            video['url'] = f"https://www.youtube.com/watch?v={video['video_id']}"
+            video['thumbnail'] = video['thumbnail'] or f"https://img.youtube.com/vi/{video['video_id']}/hqdefault.jpg"
+            videos.append(video)
         
-        return None
+        if not videos:
+            return {
+                'status': 'error',
+                'message': 'Could not extract video information from the channel page',
+                'error_type': 'VideoExtractionError'
+            }
         
+        return {
+            'status': 'success',
+            'channel_id': channel_id,
+            'videos': videos,
+            'count': len(videos),
+            'source': 'html'
+        }
+    
     @staticmethod
-    def get_channel_videos(channel_id: str, max_results: int = 10) -> Dict[str, Any]:
+    async def get_channel_videos_async(channel_id: str, max_results: int = 10) -> Dict[str, Any]:
         """
-        Get the latest videos from a YouTube channel using the channel's videos page
+        Get the latest videos from a YouTube channel over the shared async client
         
         Args:
             channel_id: YouTube channel ID
             max_results: Maximum number of videos to return (max 50)
             
         Returns:
-            Dictionary containing the list of videos and metadata
+            Dictionary containing the list of videos and metadata; source tells
+            whether they came from the RSS feed ("rss") or the videos page ("html")
+            
+        Raises:
+            DeadlineExceeded: If the request deadline passes first
+            AdmissionRejected: If the upstream scheduler turns the work away
         """
+        if settings.CHANNEL_FEED_ENABLED and max_results <= FEED_MAX_ENTRIES:
+            try:
+                videos = await get_channel_videos_feed_async(channel_id, max_results)
+                return YouTubeSearcher._feed_result(channel_id, videos)
+            except (DeadlineExceeded, AdmissionRejected):
+                raise
+            except Exception:
+                # Fall back to scraping the videos page
+                pass
+        
         try:
-            # Directly access the channel's videos page
             videos_url = f"https://www.youtube.com/channel/{channel_id}/videos"
-            
-            # Set headers to mimic a browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9,ru;q=0.8,he;q=0.7',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            }
-            
-            # Get the channel's videos page
-            response = requests.get(videos_url, headers=headers, timeout=10)
+            response = await youtube_get_async(videos_url, headers=VIDEOS_HEADERS)
             response.raise_for_status()
-            
-            # Extract video information using regex
-            # This pattern looks for video entries in the page
-            video_pattern = r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}.*?"lengthText":\{"accessibility":\{"accessibilityData":\{"label":"([^"]+)"\}\}.*?"simpleText":"([^"]+)"\}.*?"viewCountText":\{"simpleText":"([^"]+)"\}.*?"publishedTimeText":\{"simpleText":"([^"]+)"\}'
-            video_matches = re.findall(video_pattern, response.text, re.DOTALL)
-            
-            if not video_matches:
-                # Try alternative pattern if the first one doesn't match
-                alt_pattern = r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}.*?"simpleText":"([^"]+)"\}.*?"viewCountText":\{"simpleText":"([^"]+)"\}.*?"publishedTimeText":\{"simpleText":"([^"]+)"\}'
-                video_matches = re.findall(alt_pattern, response.text, re.DOTALL)
-                
-                if not video_matches:
-                    return {
-                        'status': 'error',
-                        'message': 'Could not extract video information from the channel page',
-                        'error_type': 'VideoExtractionError'
-                    }
-                
-                # Format for the alternative pattern (without duration)
-                videos = []
-                for video_id, title, view_count, published_time in video_matches[:max_results]:
-                    videos.append({
-                        'video_id': video_id,
-                        'title': title.replace('\n', ' ').strip(),
-                        'url': f'https://www.youtube.com/watch?v={video_id}',
-                        'duration': 'N/A',
-                        'view_count': view_count,
-                        'published_time': published_time,
-                        'thumbnail': f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg'
-                    })
-            else:
-                # Format for the original pattern (with duration)
-                videos = []
-                for video_id, title, duration, duration_text, view_count, published_time in video_matches[:max_results]:
-                    videos.append({
-                        'video_id': video_id,
-                        'title': title.replace('\n', ' ').strip(),
-                        'url': f'https://www.youtube.com/watch?v={video_id}',
-                        'duration': duration_text,
-                        'view_count': view_count,
-                        'published_time': published_time,
-                        'thumbnail': f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg'
-                    })
-            
+            return YouTubeSearcher._parse_channel_videos(response.text, channel_id, max_results)
+        except (DeadlineExceeded, AdmissionRejected):
+            raise
+        except Exception as e:
             return {
-                'status': 'success',
-                'channel_id': channel_id,
-                'videos': videos,
-                'count': len(videos)
+                'status': 'error',
+                'message': str(e),
+                'error_type': type(e).__name__
             }
+    
+    @staticmethod
+    def get_channel_videos(channel_id: str, max_results: int = 10) -> Dict[str, Any]:
+        """
+        Get the latest videos from a YouTube channel (blocking variant of get_channel_videos_async)
+        
+        Args:
+            channel_id: YouTube channel ID
+            max_results: Maximum number of videos to return (max 50)
             
+        Returns:
+            Dictionary containing the list of videos and metadata
+            
+        Raises:
+            DeadlineExceeded: If the request deadline passes first
+        """
+        if settings.CHANNEL_FEED_ENABLED and max_results <= FEED_MAX_ENTRIES:
+            try:
+                return YouTubeSearcher._feed_result(channel_id, get_channel_videos_feed(channel_id, max_results))
+            except DeadlineExceeded:
+                raise
+            except Exception:
+                # Fall back to scraping the videos page
+                pass
+        
+        try:
+            videos_url = f"https://www.youtube.com/channel/{channel_id}/videos"
+            response = youtube_get(videos_url, headers=VIDEOS_HEADERS)
+            response.raise_for_status()
+            return YouTubeSearcher._parse_channel_videos(response.text, channel_id, max_results)
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             return {
                 'status': 'error',
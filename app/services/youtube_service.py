@@ -6,65 +6,77 @@ import os
 import yt_dlp
 from urllib.parse import quote_plus
 
+from ..config import settings
+from .channel_feed import FEED_MAX_ENTRIES, get_channel_videos_feed
+from .channel_pages import encode_cursor, get_channel_videos_page
+from .executor import run_blocking
+from .http_session import call_youtube
+
 # Configure logging
 logger = logging.getLogger(__name__)
 # Disable proxy for requests
 os.environ['no_proxy'] = '*'
 
+def _video_from_entry(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a flat yt-dlp playlist entry into the video dictionary returned by the API."""
+    video_id = entry.get('id', '')
+    if not video_id:
+        return None
+    
+    # Get the highest resolution thumbnail
+    thumbnails = entry.get('thumbnails') or []
+    thumbnail = thumbnails[-1]['url'] if thumbnails else ''
+    
+    return {
+        'video_id': video_id,
+        'title': entry.get('title', 'Без названия'),
+        'duration': str(entry.get('duration', 'N/A')),
+        'published_time': entry.get('upload_date', ''),
+        'view_count': str(entry.get('view_count', 'N/A')),
+        'thumbnail': thumbnail
+    }
+
+
 def get_channel_videos_ytdlp(channel_id: str, max_results: int = 10) -> List[Dict]:
     """
     Get videos from a YouTube channel using yt-dlp
+    
+    Raises:
+        yt_dlp.utils.DownloadError: If the listing cannot be fetched, so callers
+            can tell a failed listing from an empty channel
     """
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True,
-            'force_generic_extractor': True,
-            'skip_download': True,
-            'extract_flat': 'in_playlist',
-            'playlistend': max_results,
-        }
-        
-        # Try to get videos from the channel's videos page
-        url = f'https://www.youtube.com/channel/{channel_id}/videos'
-        videos = []
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            result = ydl.extract_info(url, download=False)
-            
-            if 'entries' in result:
-                for entry in result['entries']:
-                    if len(videos) >= max_results:
-                        break
-                        
-                    try:
-                        video_id = entry.get('id', '')
-                        if not video_id:
-                            continue
-                            
-                        # Get the highest resolution thumbnail
-                        thumbnails = entry.get('thumbnails', [])
-                        thumbnail = thumbnails[-1]['url'] if thumbnails else ''
-                        
-                        videos.append({
-                            'video_id': video_id,
-                            'title': entry.get('title', 'Без названия'),
-                            'duration': str(entry.get('duration', 'N/A')),
-                            'published_time': entry.get('upload_date', ''),
-                            'view_count': str(entry.get('view_count', 'N/A')),
-                            'thumbnail': thumbnail
-                        })
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing video entry: {str(e)}")
-                        continue
-        
-        return videos
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': True,
+        'force_generic_extractor': True,
+        'skip_download': True,
+        'extract_flat': 'in_playlist',
+        'playlistend': max_results,
+    }
+    
+    # Try to get videos from the channel's videos page
+    url = f'https://www.youtube.com/channel/{channel_id}/videos'
+    videos = []
+    
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        result = call_youtube(ydl.extract_info, url, download=False)
         
-    except Exception as e:
-        logger.error(f"Error getting channel videos with yt-dlp: {str(e)}")
-        return []
+        if 'entries' in result:
+            for entry in result['entries']:
+                if len(videos) >= max_results:
+                    break
+                    
+                try:
+                    video = _video_from_entry(entry)
+                    if video:
+                        videos.append(video)
+                    
+                except Exception as e:
+                    logger.error(f"Error processing video entry: {str(e)}")
+                    continue
+    
+    return videos
 
 class YouTubeService:
     async def search_channels(self, query: str, max_results: int = 10) -> List[Dict]:
@@ -79,7 +91,7 @@ class YouTubeService:
             Список словарей с информацией о каналах
         """
         try:
-            search = ChannelsSearch(query, limit=max_results)
+            search = await run_blocking(call_youtube, ChannelsSearch, query, limit=max_results)
             results = search.result()["result"]
             
             channels = []
@@ -109,18 +121,69 @@ class YouTubeService:
         Returns:
             Список словарей с информацией о видео
         """
+        return (await self.list_channel_videos(channel_id, max_results))["videos"]
+
+    async def list_channel_videos(self, channel_id: str, max_results: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Получение страницы списка видео канала с указанием источника
+        
+        The first page of up to FEED_MAX_ENTRIES videos comes from the channel's
+        RSS feed; deeper first pages, or a feed that cannot be read, go through
+        yt-dlp. Later pages follow the continuation tokens of the /videos tab.
+        The feed also lists Shorts, which the /videos tab leaves out, so after
+        a feed page the cursor carries the returned IDs rather than an offset.
+        
+        Args:
+            channel_id: ID канала
+            max_results: Максимальное количество видео на странице
+            cursor: Курсор следующей страницы из предыдущего ответа
+            
+        Returns:
+            Dictionary with videos, source ("rss", "yt_dlp" or "continuation")
+            and next_cursor (None after the last page)
+        
+        Raises:
+            InvalidCursor: If the cursor is malformed or belongs to another channel
+        """
+        if cursor:
+            page = await run_blocking(get_channel_videos_page, channel_id, max_results, cursor)
+            return {"videos": page["videos"], "source": "continuation", "next_cursor": page["next_cursor"]}
+        
+        result = await self._list_first_page(channel_id, max_results)
+        if len(result["videos"]) < max_results:
+            result["next_cursor"] = None
+        elif result["source"] == "rss":
+            # Offsets into the feed do not line up with the /videos tab, so resume after the returned videos
+            result["next_cursor"] = encode_cursor(
+                channel_id, None, 0, after=[video["video_id"] for video in result["videos"]]
+            )
+        else:
+            # yt-dlp read the /videos tab itself, so the walk resumes right after its first page
+            result["next_cursor"] = encode_cursor(channel_id, None, len(result["videos"]))
+        return result
+
+    async def _list_first_page(self, channel_id: str, max_results: int) -> Dict[str, Any]:
+        """Get the newest videos of a channel from the RSS feed or yt-dlp."""
         try:
             logger.info(f"Fetching videos for channel: {channel_id}")
             
+            if settings.CHANNEL_FEED_ENABLED and max_results <= FEED_MAX_ENTRIES:
+                try:
+                    videos = await run_blocking(get_channel_videos_feed, channel_id, max_results)
+                    logger.info(f"Successfully fetched {len(videos)} videos for channel: {channel_id} (rss)")
+                    return {"videos": videos, "source": "rss"}
+                except Exception as e:
+                    logger.warning(f"RSS feed unavailable for channel {channel_id}, falling back to yt-dlp: {str(e)}")
+            
             # Get videos from the channel using yt-dlp
-            videos = get_channel_videos_ytdlp(channel_id, max_results)
+            videos = await run_blocking(get_channel_videos_ytdlp, channel_id, max_results)
             
             if not videos:
                 logger.warning(f"No videos found for channel: {channel_id}")
-                return []
+                return {"videos": [], "source": "yt_dlp"}
                 
             logger.info(f"Successfully fetched {len(videos)} videos for channel: {channel_id}")
-            return videos
+            return {"videos": videos, "source": "yt_dlp"}
             
         except Exception as e:
             error_msg = f"Error fetching channel videos: {str(e)}"
@@ -0,0 +1,101 @@
+"""
+Extraction of the JSON blobs embedded in YouTube HTML pages.
+
+Watch, search and channel pages assign large JSON objects to page variables
+(``var ytInitialPlayerResponse = {...};``, ``var ytInitialData = {...};``).
+Instead of matching them with a lazy DOTALL regex over the whole page, the
+variable name is located with str.find and the object is decoded in place with
+json.JSONDecoder.raw_decode, which stops at the end of the object.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def extract_json_object(html: str, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode the JSON object assigned to a page variable.
+
+    Args:
+        html: Page source
+        name: Variable name, e.g. ``ytInitialPlayerResponse``
+
+    Returns:
+        The decoded object, or None if the page does not assign an object to name
+    """
+    position = html.find(name)
+    while position != -1:
+        index = position + len(name)
+        # Skip the closing quote and bracket of window["name"] assignments
+        while index < len(html) and html[index] in "\"']":
+            index += 1
+        while index < len(html) and html[index] in _WHITESPACE:
+            index += 1
+        if index < len(html) and html[index] == "=":
+            index += 1
+            while index < len(html) and html[index] in _WHITESPACE:
+                index += 1
+            if index < len(html) and html[index] == "{":
+                try:
+                    value, _ = _DECODER.raw_decode(html, index)
+                    return value
+                except ValueError:
+                    pass
+        position = html.find(name, position + len(name))
+    return None
+
+
+def extract_player_response(html: str) -> Optional[Dict[str, Any]]:
+    """Get ytInitialPlayerResponse (captions, playability, video details) from a watch page."""
+    return extract_json_object(html, "ytInitialPlayerResponse")
+
+
+def extract_initial_data(html: str) -> Optional[Dict[str, Any]]:
+    """Get ytInitialData (search results, channel tabs, related videos) from a page."""
+    return extract_json_object(html, "ytInitialData")
+
+
+def renderer_text(value: Optional[Dict[str, Any]], default: str = "") -> str:
+    """Read a renderer text object, either ``{"simpleText": ...}`` or ``{"runs": [{"text": ...}]}``."""
+    if not value:
+        return default
+    if "simpleText" in value:
+        return value["simpleText"]
+    runs = value.get("runs") or []
+    return "".join(run.get("text", "") for run in runs) or default
+
+
+def walk_renderers(data: Any, names: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield the named renderers of a ytInitialData (or InnerTube response) tree in document order.
+
+    The layout around renderers (tabs, sections, shelves, grids) changes often,
+    while the renderers themselves are stable, so they are found by key wherever
+    they sit. A matched renderer is not searched further.
+
+    Args:
+        data: Decoded JSON tree
+        names: Renderer keys to look for, e.g. ``videoRenderer``
+
+    Returns:
+        Iterator of (name, renderer) pairs
+    """
+    wanted = set(names)
+    # Entries are (name, node); a name marks a matched renderer waiting for its turn
+    stack: List[Tuple[Optional[str], Any]] = [(None, data)]
+    while stack:
+        name, node = stack.pop()
+        if name is not None:
+            yield name, node
+        elif isinstance(node, dict):
+            children = [
+                (key if key in wanted and isinstance(value, dict) else None, value)
+                for key, value in node.items()
+                if isinstance(value, (dict, list))
+            ]
+            stack.extend(reversed(children))
+        elif isinstance(node, list):
+            stack.extend((None, value) for value in reversed(node) if isinstance(value, (dict, list)))
@@ -1,6 +1,7 @@
 """
 URL parsing utilities for extracting video IDs from YouTube URLs.
 """
+import re
 from typing import Optional
 
 def extract_video_id(url: str) -> Optional[str]:
@@ -58,3 +59,15 @@ def _is_valid_video_id(video_id: str) -> bool:
     )
     
     return all(c in valid_chars for c in video_id)
+
+def is_valid_channel_id(channel_id: str) -> bool:
+    """
+    Check if a string is a YouTube channel ID (UC followed by 22 URL-safe characters).
+    
+    Args:
+        channel_id: String to validate
+        
+    Returns:
+        bool: True if valid YouTube channel ID, False otherwise
+    """
+    return bool(channel_id) and re.fullmatch(r'UC[\w-]{22}', channel_id, re.ASCII) is not None
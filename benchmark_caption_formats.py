@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare caption formats: bytes transferred and parse time.
+
+Uses the recorded fixtures in the repository:
+- transcript_ru.xml                        srv3 (timedtext format 3) for qp0HIF3SfI4
+- subtitles/qp0HIF3SfI4.ru.vtt             VTT of the same track
+- transcript_xXU4-tiX4Wk_xXU4-tiX4Wk.iw.vtt auto-generated Hebrew VTT (rolling lines)
+
+There are no recorded json3 files, so json3 payloads are rebuilt from the parsed
+fixtures in YouTube's json3 layout (compact separators, as served). Auto-generated
+tracks are rebuilt the way YouTube serves them: one seg per word with tOffsetMs and
+a separate line-break append event.
+
+Usage:
+    python benchmark_caption_formats.py [--repeat N]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+from app.services.captions import parse_json3, parse_timedtext_xml, parse_vtt, segments_to_text
+from app.services.subtitles import SubtitleService
+
+ROOT = Path(__file__).parent
+
+
+def to_json3(segments, per_word=False):
+    """Build a json3 document equivalent to the given segments."""
+    events = []
+    for segment in segments:
+        start = int(segment["start"] * 1000)
+        duration = int(segment["duration"] * 1000)
+        if per_word:
+            words = segment["text"].split()
+            step = duration // max(len(words), 1)
+            segs = [{"utf8": words[0]}] + [
+                {"utf8": " " + word, "tOffsetMs": i * step, "acAsrConf": 0}
+                for i, word in enumerate(words[1:], 1)
+            ]
+            events.append({"tStartMs": start, "dDurationMs": duration, "wWinId": 1, "segs": segs})
+            events.append({"tStartMs": start + duration, "dDurationMs": 10, "wWinId": 1, "aAppend": 1, "segs": [{"utf8": "\n"}]})
+        else:
+            events.append({"tStartMs": start, "dDurationMs": duration, "segs": [{"utf8": segment["text"]}]})
+    return json.dumps({"wireMagic": "pb3", "events": events}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(label, payload, parse, repeat):
+    """Time parse(payload) and print one result row."""
+    timer = timeit.Timer(lambda: parse(payload))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    segments = parse(payload)
+    text = segments if isinstance(segments, str) else segments_to_text(segments)
+    print(f"{label:<44} {len(payload):>9,} B {best * 1000:>9.3f} ms {len(text):>9,} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    cleaner = SubtitleService()
+    srv3 = (ROOT / "transcript_ru.xml").read_bytes()
+    vtt_ru = (ROOT / "subtitles" / "qp0HIF3SfI4.ru.vtt").read_bytes()
+    vtt_iw = (ROOT / "transcript_xXU4-tiX4Wk_xXU4-tiX4Wk.iw.vtt").read_bytes()
+    json3_ru = to_json3(parse_timedtext_xml(srv3))
+    json3_iw = to_json3(parse_vtt(vtt_iw.decode("utf-8")), per_word=True)
+
+    print(f"{'format / parser':<44} {'size':>11} {'parse':>12} {'text':>15}")
+    print("-" * 86)
+    print("qp0HIF3SfI4 (ru, manual)")
+    measure("  json3 -> parse_json3", json3_ru, parse_json3, args.repeat)
+    measure("  srv3  -> parse_timedtext_xml", srv3, parse_timedtext_xml, args.repeat)
+    measure("  vtt   -> parse_vtt", vtt_ru, lambda b: parse_vtt(b.decode("utf-8")), args.repeat)
+    measure("  vtt   -> SubtitleService.clean_subtitles", vtt_ru,
+            lambda b: cleaner.clean_subtitles(b.decode("utf-8")), args.repeat)
+    print("xXU4-tiX4Wk (iw, auto-generated)")
+    measure("  json3 -> parse_json3", json3_iw, parse_json3, args.repeat)
+    measure("  vtt   -> parse_vtt", vtt_iw, lambda b: parse_vtt(b.decode("utf-8")), args.repeat)
+    measure("  vtt   -> SubtitleService.clean_subtitles", vtt_iw,
+            lambda b: cleaner.clean_subtitles(b.decode("utf-8")), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare the old DOTALL regex scraping of channel pages with the ytInitialData renderer walk.
+
+Uses the recorded fixtures in the repository:
+- youtube_response.html  1 MB watch page whose ytInitialData holds 20 compactVideoRenderer items
+- initial_data.json      the same ytInitialData, already extracted
+
+There is no recorded channel /videos page, so one is rebuilt from the watch page:
+its ytInitialData is replaced with a richGrid of videoRenderer items made from the
+20 compactVideoRenderer items (titles as runs, as on channel pages), and the rest
+of the page is kept as is. The unmodified watch page is the regex worst case: it
+has no videoRenderer items, so both patterns scan the whole page and fail.
+
+Usage:
+    python benchmark_page_parsing.py [--repeat N]
+"""
+
+import argparse
+import json
+import re
+import timeit
+from pathlib import Path
+
+from app.services.youtube_search import YouTubeSearcher
+from app.utils.page_data import extract_initial_data, walk_renderers
+
+ROOT = Path(__file__).parent
+
+# The patterns YouTubeSearcher.get_channel_videos used before the renderer walk
+LEGACY_PATTERN = r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}.*?"lengthText":\{"accessibility":\{"accessibilityData":\{"label":"([^"]+)"\}\}.*?"simpleText":"([^"]+)"\}.*?"viewCountText":\{"simpleText":"([^"]+)"\}.*?"publishedTimeText":\{"simpleText":"([^"]+)"\}'
+LEGACY_ALT_PATTERN = r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}.*?"simpleText":"([^"]+)"\}.*?"viewCountText":\{"simpleText":"([^"]+)"\}.*?"publishedTimeText":\{"simpleText":"([^"]+)"\}'
+
+
+def legacy_parse(html):
+    """Run the old two-pass regex extraction; returns the number of matches."""
+    matches = re.findall(LEGACY_PATTERN, html, re.DOTALL)
+    if not matches:
+        matches = re.findall(LEGACY_ALT_PATTERN, html, re.DOTALL)
+    return len(matches)
+
+
+def walk_parse(html):
+    """Locate and decode ytInitialData once, then walk it for videoRenderer items."""
+    result = YouTubeSearcher._parse_channel_videos(html, "UCbenchmark", 50)
+    return result.get("count", 0)
+
+
+def channel_page(html, initial_data):
+    """Rebuild a channel /videos page from the watch page and its related videos."""
+    items = []
+    for _, renderer in walk_renderers(initial_data, ("compactVideoRenderer",)):
+        renderer = dict(renderer)
+        title = renderer.get("title") or {}
+        renderer["title"] = {"runs": [{"text": title.get("simpleText", "")}]}
+        items.append({"richItemRenderer": {"content": {"videoRenderer": renderer}}})
+    data = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [{"tabRenderer": {
+        "content": {"richGridRenderer": {"contents": items}}
+    }}]}}}
+    start = html.index("{", html.index("var ytInitialData"))
+    _, end = json.JSONDecoder().raw_decode(html, start)
+    return html[:start] + json.dumps(data, ensure_ascii=False, separators=(",", ":")) + html[end:], len(items)
+
+
+def measure(label, payload, parse, repeat):
+    """Time parse(payload) and print one result row."""
+    timer = timeit.Timer(lambda: parse(payload))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    size = len(payload) if isinstance(payload, str) else len(json.dumps(payload))
+    print(f"{label:<48} {size:>11,} B {best * 1000:>10.3f} ms {parse(payload):>6} items")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    watch_html = (ROOT / "youtube_response.html").read_text(encoding="utf-8")
+    initial_data = json.loads((ROOT / "initial_data.json").read_text(encoding="utf-8"))
+    videos_html, count = channel_page(watch_html, extract_initial_data(watch_html))
+
+    print(f"{'page / parser':<48} {'size':>13} {'parse':>13} {'found':>12}")
+    print("-" * 90)
+    print(f"channel /videos page (rebuilt, {count} videos)")
+    measure("  DOTALL regex (two passes)", videos_html, legacy_parse, args.repeat)
+    measure("  ytInitialData + renderer walk", videos_html, walk_parse, args.repeat)
+    print("watch page without videoRenderer items (youtube_response.html)")
+    measure("  DOTALL regex (two passes)", watch_html, legacy_parse, args.repeat)
+    measure("  ytInitialData + renderer walk", watch_html, walk_parse, args.repeat)
+    print("decoded ytInitialData (initial_data.json)")
+    measure("  renderer walk for compactVideoRenderer", initial_data,
+            lambda data: sum(1 for _ in walk_renderers(data, ("compactVideoRenderer",))), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
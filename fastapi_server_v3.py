@@ -145,7 +145,7 @@ def get_subtitles_with_yt_dlp(video_id: str, lang: str = "ru") -> str:
                 "yt-dlp",
                 "--skip-download",
                 "--write-auto-sub",
-                "--sub-format", "vtt",
+                "--sub-format", "json3/vtt",
                 "--sub-lang", lang,
                 "--output", f"{temp_dir}/%(id)s.%(ext)s",
                 "--no-warnings",
@@ -191,8 +191,12 @@ def get_subtitles_with_yt_dlp(video_id: str, lang: str = "ru") -> str:
                     return get_subtitles_with_yt_dlp(video_id, "en")
                 return None
             
-            # Ищем файл с субтитрами
-            sub_files = list(Path(temp_dir).glob(f"*.vtt")) + list(Path(temp_dir).glob(f"*.srt"))
+            # Ищем файл с субтитрами (json3 предпочтительнее: компактнее и без повторяющихся строк)
+            sub_files = (
+                list(Path(temp_dir).glob(f"*.json3"))
+                + list(Path(temp_dir).glob(f"*.vtt"))
+                + list(Path(temp_dir).glob(f"*.srt"))
+            )
             if not sub_files:
                 logger.warning(f"Файлы субтитров не найдены в {temp_dir}")
                 return None
@@ -210,6 +214,13 @@ def get_subtitles_with_yt_dlp(video_id: str, lang: str = "ru") -> str:
                     
                     # Обрабатываем содержимое субтитров
                     lines = []
+                    if vtt_file.suffix == ".json3":
+                        # json3: один json.loads, текст уже разбит на события
+                        for event in json.loads(content).get("events", []):
+                            text = "".join(seg.get("utf8", "") for seg in event.get("segs", [])).strip()
+                            if text:
+                                lines.append(text)
+                        content = ""
                     for line in content.split('\n'):
                         line = line.strip()
                         # Пропускаем пустые строки, временные метки и заголовки
@@ -7,6 +7,8 @@ from datetime import datetime
 OUTPUT_DIR = "rabbi_ginsburgh_transcripts"
 CHANNEL_ID = "UCKadAPtEb8TTfPrQY3qwKpQ"
 MAX_VIDEOS = 10
+# Bulk downloads yield to interactive users of the server
+BATCH_HEADERS = {"X-Request-Priority": "batch"}
 
 # Create output directory
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -25,7 +27,7 @@ def get_channel_videos():
     
     try:
         print(f"\nFetching {MAX_VIDEOS} most recent videos...")
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, headers=BATCH_HEADERS)
         response.raise_for_status()
         data = response.json()
         
@@ -52,7 +54,7 @@ def get_video_transcript(video_id, video_title):
         print(f"\nFetching transcript for: {video_title}")
         print(f"Video ID: {video_id}")
         
-        response = requests.get(url, params={"url": video_url, "language": "ru"}, timeout=30)
+        response = requests.get(url, params={"url": video_url, "language": "ru"}, headers=BATCH_HEADERS, timeout=30)
         response.raise_for_status()
         
         # Save raw response for debugging
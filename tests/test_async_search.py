@@ -0,0 +1,114 @@
+"""
+Tests for the async YouTube client used by the channel search endpoints.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+from app.services import http_session as http_session_module
+from app.services.deadline import DeadlineExceeded, deadline_scope
+from app.services.rate_governor import RateGovernor
+from app.services.youtube_search import YouTubeSearcher
+
+SEARCH_PAGE = (
+    '<script>var ytInitialData = {"contents": ['
+    '{"channelRenderer":{"channelId":"UCfirst","title":{"simpleText":"First channel"}}},'
+    '{"channelRenderer":{"channelId":"UCsecond","title":{"simpleText":"Second channel"}}}'
+    ']};</script>'
+)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route the async client to an in-process handler; the first request per path can be throttled."""
+    requests_made = []
+    throttle = set()
+
+    def handler(request):
+        requests_made.append(request)
+        if request.url.path in throttle:
+            throttle.discard(request.url.path)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text=SEARCH_PAGE)
+
+    monkeypatch.setattr(http_session_module, "_async_client", None)
+    monkeypatch.setattr(http_session_module, "_governor", RateGovernor("test", rate=1000, burst=1000))
+    client_class = httpx.AsyncClient
+    monkeypatch.setattr(
+        http_session_module.httpx, "AsyncClient",
+        lambda **kwargs: client_class(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    return requests_made, throttle
+
+
+def test_search_reuses_one_client(upstream):
+    """Test that async searches share one pooled client that is closed on shutdown."""
+    requests_made, _ = upstream
+
+    async def main():
+        first = await YouTubeSearcher.search_channels_async("lectures", max_results=5)
+        client = http_session_module.get_async_client()
+        second = await YouTubeSearcher.search_channels_async("lectures", max_results=1)
+        assert http_session_module.get_async_client() is client
+        await http_session_module.close_async_client()
+        return first, second, client
+
+    first, second, client = asyncio.run(main())
+
+    assert [channel["channel_id"] for channel in first["results"]] == ["UCfirst", "UCsecond"]
+    assert second["count"] == 1
+    assert len(requests_made) == 2
+    assert requests_made[0].headers["Accept-Language"].startswith("en-US")
+    assert client.is_closed
+    assert http_session_module._async_client is None
+
+
+def test_throttled_async_request_is_retried(upstream):
+    """Test that a 429 pauses the governor and the request is sent again."""
+    requests_made, throttle = upstream
+    throttle.add("/results")
+
+    async def main():
+        try:
+            return await YouTubeSearcher.search_channels_async("lectures")
+        finally:
+            await http_session_module.close_async_client()
+
+    result = asyncio.run(main())
+
+    assert result["status"] == "success"
+    assert len(requests_made) == 2
+
+
+def test_deadline_is_not_reported_as_a_search_error(upstream):
+    """Test that running out of time propagates instead of becoming an error result."""
+    requests_made, _ = upstream
+    http_session_module._governor.report_throttled(30)
+
+    async def main():
+        try:
+            with deadline_scope(1):
+                return await YouTubeSearcher.search_channels_async("lectures")
+        finally:
+            await http_session_module.close_async_client()
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert requests_made == []
+
+
+def test_search_route_answers_504_past_the_deadline(upstream, monkeypatch):
+    """Test that the search route reports a missed deadline as a gateway timeout."""
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_DEFAULT", 1.0)
+    http_session_module._governor.report_throttled(30)
+
+    with TestClient(app) as client:
+        response = client.get("/channel-search/search", params={"query": "deadline lectures"})
+
+    assert response.status_code == 504
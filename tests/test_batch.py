@@ -0,0 +1,78 @@
+"""
+Tests for the batch transcript endpoint.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.services import transcript_service as transcript_service_module
+from app.services import youtube_service
+
+
+@pytest.fixture
+def fake_subtitles(monkeypatch):
+    """Serve subtitles offline; video "slowvideo01" takes longer than the others."""
+    running = {"now": 0, "peak": 0}
+
+    async def fake_get_subtitles(video_id, lang=None, auto_generated=False):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        try:
+            await asyncio.sleep(0.2 if video_id == "slowvideo01" else 0.01)
+        finally:
+            running["now"] -= 1
+        if video_id == "missingvid1":
+            return None, "Subtitles are disabled for this video"
+        return f"Text of {video_id}.", lang or "en"
+
+    monkeypatch.setattr(youtube_service, "get_subtitles", fake_get_subtitles)
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", None)
+    monkeypatch.setattr(transcript_service_module, "negative_cache", None)
+    return running
+
+
+def test_batch_streams_results_as_they_complete(test_client, fake_subtitles):
+    """Test that items are fetched concurrently and streamed as NDJSON in completion order."""
+    response = test_client.post("/api/transcripts/batch", json={
+        "items": [
+            {"url": "https://www.youtube.com/watch?v=slowvideo01"},
+            {"url": "https://youtu.be/fastvideo01", "language": "he"},
+            {"url": "not a video"},
+            {"url": "missingvid1"},
+        ],
+        "language": "ru",
+        "concurrency": 2,
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    records, summary = lines[:-1], lines[-1]["summary"]
+
+    # The slow first item is streamed last
+    assert [record["index"] for record in records][-1] == 0
+    by_index = {record["index"]: record for record in records}
+    assert by_index[0]["transcript"] == "Text of slowvideo01."
+    assert by_index[1]["language"] == "he"
+    assert by_index[2]["status_code"] == 400
+    assert by_index[2]["error"]["error"] == "invalid_url"
+    assert by_index[3]["status"] == "error"
+    assert by_index[3]["status_code"] == 404
+    assert summary == {"total": 4, "succeeded": 2, "failed": 2, "elapsed": summary["elapsed"]}
+    assert fake_subtitles["peak"] == 2
+
+
+def test_batch_size_is_limited(test_client, fake_subtitles, monkeypatch):
+    """Test that batches above BATCH_MAX_ITEMS are rejected before any work starts."""
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 2)
+
+    response = test_client.post("/api/transcripts/batch", json={
+        "items": [{"url": "fastvideo01"}, {"url": "fastvideo02"}, {"url": "fastvideo03"}],
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "batch_too_large"
+    assert fake_subtitles["peak"] == 0
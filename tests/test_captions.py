@@ -0,0 +1,106 @@
+"""
+Tests for the in-memory caption parsers.
+"""
+
+from pathlib import Path
+
+import json
+
+import pytest
+
+from app.services.captions import (
+    parse_captions,
+    parse_json3,
+    parse_timedtext_xml,
+    parse_vtt,
+    segments_to_text,
+)
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_parse_vtt_segments(vtt_sample):
+    """Test that cues become segments with start, duration and text."""
+    segments = parse_vtt(vtt_sample.strip())
+
+    assert segments == [
+        {"start": 1.0, "duration": 3.0, "text": "This is a test subtitle."},
+        {"start": 5.0, "duration": 3.0, "text": "This is another line."},
+    ]
+
+
+def test_parse_vtt_drops_rolling_duplicates():
+    """Test that auto-caption timing tags and repeated rolling lines are removed."""
+    content = (
+        "WEBVTT\n\n"
+        "00:00:20.000 --> 00:00:24.470 align:start position:100%\n"
+        " \n"
+        "one<00:00:21.160><c> two</c>\n\n"
+        "00:00:24.470 --> 00:00:24.480 align:start position:100%\n"
+        "one two\n"
+        " \n\n"
+        "00:00:24.480 --> 00:00:37.030 align:start position:100%\n"
+        "one two\n"
+        "three<00:00:25.480><c> four</c>\n"
+    )
+
+    assert segments_to_text(parse_vtt(content)) == "one two\nthree four"
+
+
+def test_parse_vtt_fixture():
+    """Test parsing the recorded Russian TED subtitles."""
+    content = (ROOT / "subtitles" / "qp0HIF3SfI4.ru.vtt").read_text(encoding="utf-8")
+
+    segments = parse_vtt(content)
+
+    assert segments[1] == {"start": 16.257, "duration": 2.0, "text": "Как вы объясните тот факт,"}
+    assert "WEBVTT" not in segments_to_text(segments)
+
+
+def test_parse_json3():
+    """Test that json3 events become segments and line-break events are skipped."""
+    content = json.dumps({
+        "wireMagic": "pb3",
+        "events": [
+            {"tStartMs": 0, "dDurationMs": 2000, "segs": [{"utf8": "Hello"}, {"utf8": " world", "tOffsetMs": 500}]},
+            {"tStartMs": 1000, "dDurationMs": 1000, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+            {"tStartMs": 2000, "dDurationMs": 1500},
+            {"tStartMs": 2500, "dDurationMs": 1500, "segs": [{"utf8": "again"}]},
+        ],
+    }).encode("utf-8")
+
+    assert parse_json3(content) == [
+        {"start": 0.0, "duration": 2.0, "text": "Hello world"},
+        {"start": 2.5, "duration": 1.5, "text": "again"},
+    ]
+
+
+def test_parse_srv3_fixture():
+    """Test parsing the recorded srv3 (timedtext format 3) transcript."""
+    content = (ROOT / "transcript_ru.xml").read_bytes()
+
+    segments = parse_timedtext_xml(content)
+
+    assert segments[1] == {"start": 16.257, "duration": 2.0, "text": "Как вы объясните тот факт,"}
+    assert segments[-1]["text"] == "(Аплодисменты)"
+
+
+def test_srv3_and_vtt_agree():
+    """Test that the srv3 and VTT recordings of the same track give the same text."""
+    srv3 = parse_captions((ROOT / "transcript_ru.xml").read_bytes(), "srv3")
+    vtt = parse_captions((ROOT / "subtitles" / "qp0HIF3SfI4.ru.vtt").read_bytes(), "vtt")
+
+    assert segments_to_text(srv3) == segments_to_text(vtt)
+
+
+def test_parse_srv1():
+    """Test the legacy srv1 format with doubly escaped text."""
+    content = '<transcript><text start="1.5" dur="2">It&amp;#39;s here</text></transcript>'
+
+    assert parse_timedtext_xml(content) == [{"start": 1.5, "duration": 2.0, "text": "It's here"}]
+
+
+def test_unsupported_format():
+    """Test that unknown formats are rejected."""
+    with pytest.raises(ValueError):
+        parse_captions("", "ttml")
@@ -0,0 +1,107 @@
+"""
+Tests for the RSS-feed fast path of channel listings.
+"""
+
+import asyncio
+import importlib
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import http_session as http_session_module
+from app.services.channel_feed import parse_channel_feed
+from app.services.channel_pages import decode_cursor
+from app.services.rate_governor import RateGovernor
+from app.services.youtube_service import YouTubeService
+
+# The package attribute of the same name is the transcript YouTubeService instance
+youtube_service_module = importlib.import_module("app.services.youtube_service")
+
+
+def make_feed(count: int) -> bytes:
+    entries = "".join(f"""
+    <entry>
+        <id>yt:video:video{index:06d}</id>
+        <yt:videoId>video{index:06d}</yt:videoId>
+        <yt:channelId>UCchannel</yt:channelId>
+        <title>Урок {index}</title>
+        <link rel="alternate" href="https://www.youtube.com/watch?v=video{index:06d}"/>
+        <published>2024-05-{index:02d}T10:00:00+00:00</published>
+        <media:group>
+            <media:title>Урок {index}</media:title>
+            <media:thumbnail url="https://i1.ytimg.com/vi/video{index:06d}/hqdefault.jpg" width="480" height="360"/>
+            <media:community>
+                <media:starRating count="10" average="5.00" min="1" max="5"/>
+                <media:statistics views="{index * 100}"/>
+            </media:community>
+        </media:group>
+    </entry>""" for index in range(count, 0, -1))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/"
+      xmlns="http://www.w3.org/2005/Atom">
+    <title>Channel</title>
+    <yt:channelId>UCchannel</yt:channelId>{entries}
+</feed>""".encode("utf-8")
+
+
+class StreamingBody(io.BytesIO):
+    """Stand-in for urllib3's raw response stream."""
+    decode_content = False
+
+
+def test_parse_channel_feed():
+    """Test that feed entries are converted and parsing stops after max_results."""
+    videos = parse_channel_feed(io.BytesIO(make_feed(15)), max_results=3)
+
+    assert [video["video_id"] for video in videos] == ["video000015", "video000014", "video000013"]
+    assert videos[0]["title"] == "Урок 15"
+    assert videos[0]["published_time"] == "2024-05-15T10:00:00+00:00"
+    assert videos[0]["view_count"] == "1500"
+    assert videos[0]["thumbnail"] == "https://i1.ytimg.com/vi/video000015/hqdefault.jpg"
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Serve the feed from a fake session and record yt-dlp listings."""
+    requests_made = []
+    ytdlp_calls = []
+
+    def not_found():
+        raise Exception("404 Client Error: Not Found")
+
+    class FakeSession:
+        def get(self, url, timeout=None, **kwargs):
+            requests_made.append((url, kwargs.get("params")))
+            if kwargs["params"]["channel_id"] == "UCmissing":
+                return SimpleNamespace(status_code=404, url=url, close=lambda: None, raise_for_status=not_found)
+            return SimpleNamespace(status_code=200, url=url, raw=StreamingBody(make_feed(15)),
+                                   close=lambda: None, raise_for_status=lambda: None)
+
+    def fake_ytdlp(channel_id, max_results=10):
+        ytdlp_calls.append((channel_id, max_results))
+        return [{"video_id": f"video{index:06d}"} for index in range(max_results)]
+
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+    monkeypatch.setattr(http_session_module, "_governor", RateGovernor("test", rate=1000, burst=1000))
+    monkeypatch.setattr(youtube_service_module, "get_channel_videos_ytdlp", fake_ytdlp)
+    return SimpleNamespace(requests=requests_made, ytdlp=ytdlp_calls)
+
+
+def test_latest_videos_come_from_the_feed(sources):
+    """Test that short listings use the feed and deeper ones or missing feeds use yt-dlp."""
+    service = YouTubeService()
+
+    latest = asyncio.run(service.list_channel_videos("UCchannel", 5))
+    deep = asyncio.run(service.list_channel_videos("UCchannel", 30))
+    missing = asyncio.run(service.list_channel_videos("UCmissing", 5))
+
+    assert latest["source"] == "rss"
+    assert len(latest["videos"]) == 5
+    # The next page resumes the /videos walk after the feed entries, not at an offset into it
+    cursor = decode_cursor(latest["next_cursor"], "UCchannel")
+    assert cursor["a"] == [video["video_id"] for video in latest["videos"]]
+    assert cursor["s"] == 0
+    assert deep["source"] == missing["source"] == "yt_dlp"
+    assert sources.ytdlp == [("UCchannel", 30), ("UCmissing", 5)]
+    assert len(sources.requests) == 2
@@ -0,0 +1,151 @@
+"""
+Tests for cursor pagination over channel uploads.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import http_session as http_session_module
+from app.services.channel_pages import (
+    InvalidCursor, decode_cursor, encode_cursor, get_channel_videos_page, iter_channel_videos
+)
+from app.services.rate_governor import RateGovernor
+
+TOTAL = 70
+GRID_PAGE = 30
+
+
+def grid_items(start):
+    """Items of the grid page starting at index start: videos, then a continuation if more remain."""
+    items = [
+        {"richItemRenderer": {"content": {"videoRenderer": {
+            "videoId": f"video{index:06d}",
+            "title": {"runs": [{"text": f"Урок {index}"}]},
+            "lengthText": {"simpleText": "1:00:00"},
+            "viewCountText": {"simpleText": f"{index} views"},
+            "publishedTimeText": {"simpleText": f"{index} days ago"},
+            "thumbnail": {"thumbnails": [{"url": "small.jpg"}, {"url": f"big{index}.jpg"}]}
+        }}}}
+        for index in range(start, min(start + GRID_PAGE, TOTAL))
+    ]
+    if start + GRID_PAGE < TOTAL:
+        items.append({"continuationItemRenderer": {
+            "continuationEndpoint": {"continuationCommand": {"token": f"token-{start + GRID_PAGE}"}}
+        }})
+    return items
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    """Serve a 70-video channel as a /videos page plus InnerTube continuations."""
+    calls = []
+
+    class FakeSession:
+        def get(self, url, timeout=None, **kwargs):
+            calls.append(("GET", url))
+            data = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [{"tabRenderer": {
+                "content": {"richGridRenderer": {"contents": grid_items(0)}}
+            }}]}}}
+            html = (
+                '<script>ytcfg.set({"INNERTUBE_API_KEY":"key123","INNERTUBE_CLIENT_VERSION":"2.1"});</script>'
+                f"<script>var ytInitialData = {json.dumps(data)};</script>"
+            )
+            return SimpleNamespace(status_code=200, url=url, text=html, raise_for_status=lambda: None)
+
+        def post(self, url, timeout=None, **kwargs):
+            token = kwargs["json"]["continuation"]
+            calls.append(("POST", token, kwargs["params"].get("key"), kwargs["json"]["context"]["client"]["clientVersion"]))
+            data = {"onResponseReceivedActions": [{"appendContinuationItemsAction": {
+                "continuationItems": grid_items(int(token.split("-")[1]))
+            }}]}
+            return SimpleNamespace(status_code=200, url=url, json=lambda: data, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+    monkeypatch.setattr(http_session_module, "_governor", RateGovernor("test", rate=1000, burst=1000))
+    return calls
+
+
+def test_pages_walk_the_whole_channel(youtube):
+    """Test that following next_cursor returns every video once, fetching grid pages lazily."""
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = get_channel_videos_page("UCchannel", 25, cursor)
+        seen.extend(video["video_id"] for video in page["videos"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"video{index:06d}" for index in range(TOTAL)]
+    assert pages == 3
+    # Page 1: HTML; page 2: rest of HTML page again + continuation; page 3: continuation + last one
+    assert [call[0] for call in youtube] == ["GET", "GET", "POST", "POST", "POST"]
+    assert youtube[2][2:] == ("key123", "2.1")
+
+
+def test_first_page_fields(youtube):
+    """Test the conversion of videoRenderer items."""
+    video = get_channel_videos_page("UCchannel", 1)["videos"][0]
+
+    assert video == {
+        "video_id": "video000000",
+        "title": "Урок 0",
+        "duration": "1:00:00",
+        "published_time": "0 days ago",
+        "view_count": "0 views",
+        "thumbnail": "big0.jpg"
+    }
+
+
+def test_iteration_takes_a_governor_token_per_page(youtube):
+    """Test that walking uploads fetches grid pages lazily, each within the rate budget."""
+    videos = []
+    for video in iter_channel_videos("UCchannel"):
+        videos.append(video["video_id"])
+        if len(videos) == 40:
+            break
+
+    assert videos == [f"video{index:06d}" for index in range(40)]
+    assert [call[0] for call in youtube] == ["GET", "POST"]
+    assert http_session_module._governor.stats()["acquired"] == 2
+
+
+def test_skip_beyond_the_first_grid_page_carries_over(youtube):
+    """Test that a cursor after a 50-video first page resumes at video 50, not at the next grid page."""
+    page = get_channel_videos_page("UCchannel", 10, encode_cursor("UCchannel", None, 50))
+
+    assert [video["video_id"] for video in page["videos"]] == [f"video{index:06d}" for index in range(50, 60)]
+    assert decode_cursor(page["next_cursor"], "UCchannel")["t"] == "token-60"
+    assert decode_cursor(page["next_cursor"], "UCchannel")["s"] == 0
+
+
+def test_page_after_feed_resumes_after_its_videos(youtube):
+    """Test that a cursor from a feed page skips the videos it listed, even with Shorts among them."""
+    feed_ids = ["short000001", "video000000", "video000001", "short000002", "video000002", "short000003"]
+
+    page = get_channel_videos_page("UCchannel", 3, encode_cursor("UCchannel", None, 0, after=feed_ids))
+
+    assert [video["video_id"] for video in page["videos"]] == ["video000003", "video000004", "video000005"]
+    assert decode_cursor(page["next_cursor"], "UCchannel")["s"] == 6
+
+
+def test_cursors_are_checked():
+    """Test that cursors round-trip and foreign or malformed ones are rejected."""
+    cursor = encode_cursor("UCchannel", "token-30", 5)
+
+    assert decode_cursor(cursor, "UCchannel")["s"] == 5
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "UCother")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not a cursor!", "UCchannel")
+
+
+def test_videos_endpoint_rejects_bad_cursor(test_client):
+    """Test that the listing endpoint reports an invalid cursor as a client error."""
+    response = test_client.get("/channel/UCchannel/videos", params={"cursor": encode_cursor("UCother", None, 10)})
+
+    assert response.status_code == 400
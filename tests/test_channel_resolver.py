@@ -0,0 +1,141 @@
+"""
+Tests for resolving a channel from alias queries.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import channel_resolver as channel_resolver_module
+from app.services.channel_resolver import ChannelResolver, score_candidates
+
+
+def channels(*ids):
+    return {"status": "success", "results": [{"channel_id": channel_id, "title": f"Title {channel_id}"} for channel_id in ids]}
+
+
+class FakeSearch:
+    """Answers alias queries after a delay, recording how many run at once."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, query, max_results=5):
+        self.calls.append(query)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        answer = self.answers[query]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+def test_scoring_prefers_channels_found_by_several_queries():
+    """Test that hits across queries and title keywords outweigh a single top rank."""
+    ranked = score_candidates([channels("UCa", "UCb"), channels("UCb", "UCc"), {"status": "error"}])
+    assert [candidate["channel_id"] for candidate in ranked][:1] == ["UCb"]
+    assert ranked[0]["hits"] == 2
+
+    ranked = score_candidates([channels("UCa", "UCb")], keywords=["title ucb"])
+    assert ranked[0]["channel_id"] == "UCb"
+
+
+@pytest.fixture
+def search():
+    return FakeSearch({
+        "alias one": channels("UCother", "UCwanted"),
+        "alias two": channels("UCwanted"),
+        "alias three": RuntimeError("network down"),
+    })
+
+
+def test_resolution_runs_queries_concurrently_and_is_stored(tmp_path, search):
+    """Test that a miss searches all aliases at once and later calls read the store."""
+    resolver = ChannelResolver(str(tmp_path / "channels.sqlite3"), search, ttl=3600)
+    queries = ["alias one", "alias two", "alias three"]
+
+    async def main():
+        concurrent = await asyncio.gather(*(resolver.resolve("wanted", queries) for _ in range(3)))
+        again = await resolver.resolve("wanted", queries)
+        return concurrent, again
+
+    concurrent, again = asyncio.run(main())
+
+    assert {result["channel_id"] for result in concurrent} == {"UCwanted"}
+    assert search.peak == 3
+    assert len(search.calls) == 3
+    assert again["cached"] is True
+    assert again["channel_id"] == "UCwanted"
+
+    # Another process reads the same answer from SQLite
+    reopened = ChannelResolver(str(tmp_path / "channels.sqlite3"), FakeSearch({}), ttl=3600)
+    assert asyncio.run(reopened.resolve("wanted", queries))["channel_id"] == "UCwanted"
+
+
+def test_blocking_resolution_shares_the_store(tmp_path):
+    """Test that the blocking variant reads and writes the same resolutions as resolve."""
+    resolver = ChannelResolver(str(tmp_path / "channels.sqlite3"), FakeSearch({}), ttl=3600)
+    calls = []
+
+    def blocking_search(query, max_results=5):
+        calls.append(query)
+        return channels("UCwanted")
+
+    resolved = resolver.resolve_blocking("wanted", ["alias one", "alias two"], blocking_search)
+    again = asyncio.run(resolver.resolve("wanted", ["alias one", "alias two"]))
+
+    assert resolved["channel_id"] == again["channel_id"] == "UCwanted"
+    assert resolved["cached"] is False
+    assert again["cached"] is True
+    assert calls == ["alias one", "alias two"]
+
+
+def test_expired_resolution_is_refreshed_or_kept_on_failure(tmp_path, search):
+    """Test that an expired answer triggers a new search, and survives one that finds nothing."""
+    path = str(tmp_path / "channels.sqlite3")
+    asyncio.run(ChannelResolver(path, search, ttl=-1).resolve("wanted", ["alias two"]))
+
+    failing = FakeSearch({"alias two": RuntimeError("network down")})
+    result = asyncio.run(ChannelResolver(path, failing, ttl=-1).resolve("wanted", ["alias two"]))
+
+    assert failing.calls == ["alias two"]
+    assert result["channel_id"] == "UCwanted"
+    assert result["cached"] is True
+
+
+def test_rabbi_ginsburgh_endpoint_uses_the_resolver(test_client, tmp_path, monkeypatch, search):
+    """Test that the endpoint serves the stored channel without searching."""
+    resolver = ChannelResolver(str(tmp_path / "channels.sqlite3"), search, ttl=3600)
+    asyncio.run(resolver.resolve("rabbi-ginsburgh", ["alias one", "alias two"]))
+    resolver.search = FakeSearch({})
+    monkeypatch.setattr(channel_resolver_module, "_resolver", resolver)
+
+    response = test_client.get("/channel-search/rabbi-ginsburgh")
+
+    assert response.status_code == 200
+    assert response.json()["channel"]["channel_id"] == "UCwanted"
+    assert resolver.search.calls == []
+
+
+def test_stored_channel_does_not_need_an_upstream_slot(test_client, tmp_path, monkeypatch, search):
+    """Test that a stored answer is served while the upstream scheduler turns work away."""
+    from app.routes import channel_search as channel_search_routes
+    from app.services.scheduler import AdmissionRejected
+
+    resolver = ChannelResolver(str(tmp_path / "channels.sqlite3"), search, ttl=3600)
+    asyncio.run(resolver.resolve("rabbi-ginsburgh", ["alias one", "alias two"]))
+    monkeypatch.setattr(channel_resolver_module, "_resolver", resolver)
+
+    class FullScheduler:
+        def slot(self, priority=None, bounded=False):
+            raise AdmissionRejected("interactive", "queue full", 1)
+
+    monkeypatch.setattr(channel_search_routes, "get_upstream_scheduler", lambda: FullScheduler())
+
+    assert test_client.get("/channel-search/rabbi-ginsburgh").status_code == 200
+    assert test_client.get("/channel-search/rabbi-ginsburgh", params={"refresh": True}).status_code == 503
@@ -0,0 +1,99 @@
+"""
+Tests for incremental channel sync.
+"""
+
+import pytest
+
+from app.services.channel_sync import ChannelSync
+
+
+class FakeListing:
+    """A channel's uploads, newest first, counting how many entries were consumed."""
+
+    def __init__(self, count):
+        self.videos = [
+            {"video_id": f"video{index:06d}", "title": f"Video {index}", "published_time": f"2024{index:04d}"}
+            for index in range(count, 0, -1)
+        ]
+        self.uploaded = count
+        self.consumed = 0
+
+    def upload(self, count=1):
+        for _ in range(count):
+            self.uploaded += 1
+            index = self.uploaded
+            self.videos.insert(0, {"video_id": f"video{index:06d}", "title": f"Video {index}", "published_time": ""})
+
+    def __call__(self, channel_id):
+        self.consumed = 0
+        for video in self.videos:
+            self.consumed += 1
+            yield video
+
+
+@pytest.fixture
+def listing():
+    return FakeListing(100)
+
+
+@pytest.fixture
+def channel_sync(tmp_path, listing):
+    return ChannelSync(str(tmp_path / "channels.sqlite3"), listing, known_ids=5, max_new=20)
+
+
+def test_sync_returns_only_new_uploads(channel_sync, listing):
+    """Test that later syncs stop at known content and return the delta."""
+    first = channel_sync.sync("client", "UCchannel", initial=10)
+    assert first["first_sync"] is True
+    assert len(first["new_videos"]) == 10
+    assert first["newest_video_id"] == "video000100"
+
+    unchanged = channel_sync.sync("client", "UCchannel")
+    assert unchanged["new_videos"] == []
+    assert listing.consumed == 1
+
+    listing.upload(3)
+    delta = channel_sync.sync("client", "UCchannel")
+    assert [video["video_id"] for video in delta["new_videos"]] == ["video000103", "video000102", "video000101"]
+    assert listing.consumed == 4
+    assert delta["truncated"] is False
+    assert delta["newest_video_id"] == "video000103"
+    # The publish time of the newest known video is kept when new ones have none
+    assert delta["newest_published"] == "20240100"
+
+
+def test_deleted_newest_video_does_not_hide_the_boundary(channel_sync, listing):
+    """Test that the sync still stops when the newest known video disappears."""
+    channel_sync.sync("client", "UCchannel", initial=3)
+    del listing.videos[0]
+    listing.upload(1)
+
+    delta = channel_sync.sync("client", "UCchannel")
+
+    assert [video["video_id"] for video in delta["new_videos"]] == ["video000101"]
+    assert listing.consumed == 2
+
+
+def test_large_backlog_is_truncated(channel_sync, listing):
+    """Test that one sync returns at most max_new videos and says so."""
+    channel_sync.sync("client", "UCchannel", initial=1)
+    listing.upload(30)
+
+    delta = channel_sync.sync("client", "UCchannel")
+
+    assert len(delta["new_videos"]) == 20
+    assert delta["truncated"] is True
+
+
+def test_each_subscriber_has_its_own_watermark(channel_sync, listing):
+    """Test that one client's sync does not consume the delta of another."""
+    channel_sync.sync("first", "UCchannel", initial=3)
+    channel_sync.sync("second", "UCchannel", initial=3)
+    listing.upload(2)
+
+    first = channel_sync.sync("first", "UCchannel")
+    second = channel_sync.sync("second", "UCchannel")
+
+    assert [video["video_id"] for video in first["new_videos"]] == ["video000102", "video000101"]
+    assert second["new_videos"] == first["new_videos"]
+    assert channel_sync.sync("first", "UCchannel")["new_videos"] == []
@@ -0,0 +1,64 @@
+"""
+Tests for the per-backend circuit breaker.
+"""
+
+import time
+
+from app.services.circuit_breaker import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    """Test that the breaker opens at the threshold and a success resets the count."""
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow() is False
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    """Test that one probe is let through after the timeout and its outcome decides the state."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.02)
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_released_probe_can_be_retried():
+    """Test that a cancelled probe gives its slot back."""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+
+    assert breaker.allow() is True
+    breaker.release()
+    assert breaker.allow() is True
+
+
+def test_admin_backends_endpoint(test_client):
+    """Test that breaker state and the backend order are exposed on the admin endpoint."""
+    response = test_client.get("/admin/backends")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["order"]) == {"transcript_api", "timedtext", "yt_dlp"}
+    assert data["backends"]["yt_dlp"]["breaker"]["state"] in ("closed", "open", "half_open")
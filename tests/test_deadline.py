@@ -0,0 +1,94 @@
+"""
+Tests for end-to-end request deadlines.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import transcript_service as transcript_service_module
+from app.services import youtube as youtube_module
+from app.services.deadline import DeadlineExceeded, deadline_scope, http_timeout, parse_timeout
+from app.services.executor import run_blocking
+from app.services.youtube import YouTubeService
+
+
+@pytest.fixture
+def slow_transcript_api(monkeypatch):
+    """Make youtube-transcript-api the only backend and have it hang for half a second."""
+    def slow_list_transcripts(video_id):
+        time.sleep(0.5)
+        raise Exception("Could not retrieve a transcript")
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(slow_list_transcripts))
+    monkeypatch.setattr(youtube_module, "YOUTUBE_TRANSCRIPT_AVAILABLE", True)
+    monkeypatch.setattr(youtube_module, "YT_DLP_AVAILABLE", False)
+    monkeypatch.setattr(settings, "SUBTITLE_HEDGING_ENABLED", False)
+    monkeypatch.setattr(settings, "SUBTITLE_TIMEDTEXT_ENABLED", False)
+
+
+def test_parse_timeout(monkeypatch):
+    """Test that client timeouts fall back to the default and are capped."""
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_DEFAULT", 30.0)
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_MAX", 60.0)
+
+    assert parse_timeout("2.5") == 2.5
+    assert parse_timeout(None) == 30.0
+    assert parse_timeout("soon") == 30.0
+    assert parse_timeout("-1") == 30.0
+    assert parse_timeout("600") == 60.0
+
+
+def test_deadline_clamps_http_timeouts_in_executor_threads():
+    """Test that run_blocking carries the deadline and HTTP timeouts never run past it."""
+    async def main():
+        with deadline_scope(5.0):
+            clamped = await run_blocking(http_timeout, 10.0)
+        with deadline_scope(0.0):
+            with pytest.raises(DeadlineExceeded):
+                await run_blocking(http_timeout, 10.0)
+        return clamped
+
+    assert 4.0 < asyncio.run(main()) <= 5.0
+    # Outside a request the caller's timeout is used as is
+    assert http_timeout(10.0) == 10.0
+
+
+def test_hanging_backend_is_cut_off_at_the_deadline(slow_transcript_api):
+    """Test that get_subtitles stops waiting when the deadline runs out and reports what timed out."""
+    service = YouTubeService()
+
+    async def main():
+        start = time.monotonic()
+        with deadline_scope(0.1):
+            result = await service.get_subtitles("dQw4w9WgXcQ", "ru")
+        return result, time.monotonic() - start
+
+    (text, error), elapsed = asyncio.run(main())
+
+    assert text is None
+    assert elapsed < 0.4
+    assert error["error"] == "deadline_exceeded"
+    assert error["details"]["new_api"] == youtube_module.DEADLINE_MESSAGE
+    assert error["details"]["timedtext"] == "Not attempted"
+    # Running out of time says nothing about the backend's health
+    assert service.breakers["transcript_api"].snapshot()["consecutive_failures"] == 0
+
+
+def test_request_timeout_header_yields_504(test_client, slow_transcript_api, monkeypatch):
+    """Test that the transcript endpoint answers 504 within the budget the client asked for."""
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", None)
+    monkeypatch.setattr(transcript_service_module, "negative_cache", None)
+
+    start = time.monotonic()
+    response = test_client.get(
+        "/api/transcript",
+        params={"url": "dQw4w9WgXcQ", "language": "ru"},
+        headers={"Accept": "application/json", "X-Request-Timeout": "0.1"}
+    )
+
+    assert response.status_code == 504
+    assert response.json()["error"] == "deadline_exceeded"
+    assert time.monotonic() - start < 0.4
@@ -0,0 +1,61 @@
+"""
+Tests for the instrumented upstream executor.
+"""
+
+import threading
+import time
+
+from app.services.executor import InstrumentedExecutor
+
+
+def test_queue_depth_and_wait_time_are_reported():
+    """Test that tasks beyond the worker count are reported as queued and their wait is measured."""
+    executor = InstrumentedExecutor("test-io", max_workers=1)
+    release = threading.Event()
+    try:
+        first = executor.submit(release.wait)
+        second = executor.submit(lambda: "done")
+        time.sleep(0.05)
+
+        stats = executor.stats()
+        assert stats["active"] == 1
+        assert stats["queued"] == 1
+
+        release.set()
+        assert second.result(timeout=1) == "done"
+        first.result(timeout=1)
+
+        stats = executor.stats()
+        assert stats["active"] == 0
+        assert stats["queued"] == 0
+        assert stats["completed"] == 2
+        assert stats["max_wait"] >= 0.05
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
+
+
+def test_failures_and_cancellations_are_counted():
+    """Test that failing tasks are counted and cancelled tasks leave the queue."""
+    executor = InstrumentedExecutor("test-io", max_workers=1)
+    release = threading.Event()
+    try:
+        blocker = executor.submit(release.wait)
+        cancelled = executor.submit(lambda: None)
+        assert cancelled.cancel()
+        failing = executor.submit(lambda: 1 / 0)
+        release.set()
+
+        blocker.result(timeout=1)
+        try:
+            failing.result(timeout=1)
+        except ZeroDivisionError:
+            pass
+
+        stats = executor.stats()
+        assert stats["queued"] == 0
+        assert stats["completed"] == 2
+        assert stats["failed"] == 1
+    finally:
+        release.set()
+        executor.shutdown(wait=True)
@@ -0,0 +1,237 @@
+"""
+Tests for resumable channel harvest jobs.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import harvest as harvest_module
+from app.services.executor import upstream_executor_stats
+from app.services.harvest import HarvestManager, HarvestStore
+from app.services.scheduler import BATCH, current_priority
+
+CHANNEL_ID = "UCabcdefghijklmnopqrstuv"
+
+VIDEOS = [
+    {"video_id": "video000001", "title": "First"},
+    {"video_id": "video000002", "title": "Second"},
+    {"video_id": "video000003", "title": "Private one"},
+]
+
+
+class FakeChannelService:
+    def __init__(self):
+        self.calls = []
+
+    async def get_channel_videos(self, channel_id, max_results=10):
+        self.calls.append(channel_id)
+        return VIDEOS[:max_results]
+
+
+class FakeTranscriptService:
+    def __init__(self):
+        self.calls = []
+
+    async def get_transcript(self, video_id, language="auto", auto_generated=False):
+        self.calls.append((video_id, language, current_priority.get()))
+        if video_id == "video000003":
+            raise HTTPException(status_code=404, detail={"error": "no_subtitles"})
+        return f"Text of {video_id}.", language, {"cache": "miss"}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Create a manager with an empty manifest and offline services."""
+    manager = HarvestManager(
+        HarvestStore(str(tmp_path / "harvest.sqlite3")),
+        output_dir=str(tmp_path / "out"),
+        concurrency=2,
+        max_attempts=2
+    )
+    manager.channel_service = FakeChannelService()
+    manager.transcript_service = FakeTranscriptService()
+    return manager
+
+
+async def _wait(manager, job_id):
+    task = manager._tasks.get(job_id)
+    if task is not None:
+        await task
+    return await manager.progress(job_id)
+
+
+def test_job_harvests_channel_at_batch_priority(manager, tmp_path):
+    """Test that a job fetches every video, writes transcripts and records definitive failures."""
+    async def main():
+        job_id = await manager.create(CHANNEL_ID, ["ru"], False, 10)
+        return await _wait(manager, job_id)
+
+    progress = asyncio.run(main())
+
+    assert progress["status"] == "completed"
+    assert (progress["total"], progress["done"], progress["failed"], progress["pending"]) == (3, 2, 1, 0)
+    assert progress["percent"] == 100.0
+    assert progress["throughput_per_minute"] > 0
+    assert progress["eta_seconds"] is None
+    assert {priority for _, _, priority in manager.transcript_service.calls} == {BATCH}
+    saved = json.loads((tmp_path / "out" / CHANNEL_ID / "video000001_ru.json").read_text(encoding="utf-8"))
+    assert saved["transcript"] == "Text of video000001."
+    assert saved["title"] == "First"
+
+
+def test_manifest_io_stays_off_the_upstream_pool(manager):
+    """Test that a job's SQLite and file writes never take an upstream worker."""
+    before = upstream_executor_stats()["completed"]
+
+    async def main():
+        job_id = await manager.create(CHANNEL_ID, ["ru"], False, 10)
+        return await _wait(manager, job_id)
+
+    assert asyncio.run(main())["status"] == "completed"
+    assert upstream_executor_stats()["completed"] == before
+
+
+def test_restarted_job_skips_completed_videos(manager, tmp_path):
+    """Test that a job interrupted after enumeration resumes with the remaining videos only."""
+    store = manager.store
+    job_id = store.create_job(CHANNEL_ID, ["ru", "en"], False, 2)
+    store.add_items(job_id, VIDEOS[:2], ["ru", "en"])
+    store.finish_item(job_id, "video000001", "ru", "done", output_path="somewhere.json")
+    store.set_status(job_id, "running")
+    store.create_job("UCother", ["ru"], False, 2)
+    store.set_status(store.list_jobs()[0]["job_id"], "cancelled")
+
+    async def main():
+        resumed = await manager.resume()
+        return resumed, await _wait(manager, job_id)
+
+    resumed, progress = asyncio.run(main())
+
+    assert resumed == [job_id]
+    assert manager.channel_service.calls == []
+    assert sorted(call[:2] for call in manager.transcript_service.calls) == [
+        ("video000001", "en"), ("video000002", "en"), ("video000002", "ru")
+    ]
+    assert (progress["status"], progress["done"], progress["total"]) == ("completed", 4, 4)
+
+
+def test_harvest_endpoint_reports_progress(test_client, manager, monkeypatch):
+    """Test that jobs are created over HTTP and unknown jobs are reported as missing."""
+    monkeypatch.setattr(harvest_module, "_manager", manager)
+
+    response = test_client.post("/api/jobs/harvest", json={"channel_id": CHANNEL_ID, "languages": ["ru"]})
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    assert test_client.get(f"/api/jobs/{job_id}").json()["channel_id"] == CHANNEL_ID
+    assert test_client.get("/api/jobs/unknown").status_code == 404
+    assert test_client.post("/api/jobs/harvest", json={"channel_id": CHANNEL_ID, "languages": ["russian"]}).status_code == 400
+    for channel_id in ("../../etc", "/tmp/elsewhere", "UCchannel"):
+        response = test_client.post("/api/jobs/harvest", json={"channel_id": channel_id, "languages": ["ru"]})
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"] == "invalid_channel_id"
+
+
+def test_transcripts_stay_in_output_dir(manager, tmp_path):
+    """Test that a manifest entry cannot make the manager write outside its output directory."""
+    item = {"video_id": "video000001", "language": "ru", "title": "First"}
+
+    with pytest.raises(ValueError):
+        manager._write_transcript({"channel_id": "../escaped", "auto_generated": False}, item, "Text", "ru")
+    with pytest.raises(ValueError):
+        manager._write_transcript({"channel_id": CHANNEL_ID, "auto_generated": False},
+                                  {**item, "video_id": "../../escaped"}, "Text", "ru")
+    assert not (tmp_path / "escaped").exists()
+
+
+def test_each_job_runs_in_one_worker(manager, tmp_path):
+    """Test that workers sharing a manifest split the active jobs and take over expired leases."""
+    other = HarvestManager(manager.store, output_dir=str(tmp_path / "out"), concurrency=2, max_attempts=2)
+    other.channel_service = FakeChannelService()
+    other.transcript_service = FakeTranscriptService()
+    store = manager.store
+    job_id = store.create_job(CHANNEL_ID, ["ru"], False, 2)
+    store.add_items(job_id, VIDEOS[:2], ["ru"])
+    store.set_status(job_id, "running")
+
+    assert store.claim(job_id, "worker-that-died", 60)
+
+    async def main():
+        held = await manager.resume(), await other.resume()
+        # The owner stopped renewing: its lease runs out and exactly one worker takes the job over
+        store._connect().execute("UPDATE harvest_jobs SET lease_until = 0 WHERE job_id = ?", (job_id,))
+        first, second = await asyncio.gather(manager.resume(), other.resume())
+        progress = await _wait(manager, job_id) if first else await _wait(other, job_id)
+        return held, first + second, progress
+
+    held, resumed, progress = asyncio.run(main())
+
+    assert held == ([], [])
+    assert resumed == [job_id]
+    assert len(manager.transcript_service.calls) + len(other.transcript_service.calls) == 2
+    assert progress["status"] == "completed"
+    assert store._connect().execute("SELECT owner FROM harvest_jobs WHERE job_id = ?", (job_id,)).fetchone()[0] is None
+
+
+def test_failures_do_not_end_the_job(manager):
+    """Test that a failed listing leaves the job to be retried and item errors fail only their item."""
+    class FlakyChannelService(FakeChannelService):
+        async def get_channel_videos(self, channel_id, max_results=10):
+            self.calls.append(channel_id)
+            if len(self.calls) == 1:
+                raise Exception("HTTP Error 429: Too Many Requests")
+            return VIDEOS[:max_results]
+
+    class BrokenTranscriptService(FakeTranscriptService):
+        async def get_transcript(self, video_id, language="auto", auto_generated=False):
+            if video_id == "video000002":
+                raise TimeoutError("read timed out")
+            return await super().get_transcript(video_id, language, auto_generated)
+
+    manager.channel_service = FlakyChannelService()
+    manager.transcript_service = BrokenTranscriptService()
+
+    async def main():
+        job_id = await manager.create(CHANNEL_ID, ["ru"], False, 10)
+        throttled = await _wait(manager, job_id)
+        resumed = await manager.resume()
+        return job_id, throttled, resumed, await _wait(manager, job_id)
+
+    job_id, throttled, resumed, progress = asyncio.run(main())
+
+    assert (throttled["status"], throttled["total"]) == ("pending", None)
+    assert "429" in throttled["error"]
+    assert resumed == [job_id]
+    assert progress["status"] == "completed"
+    assert (progress["done"], progress["failed"], progress["pending"]) == (1, 2, 0)
+
+
+def test_cancel_reaches_the_owning_worker(manager, tmp_path):
+    """Test that a job is cancelled from a worker that does not run it and is not taken over afterwards."""
+    manager.lease = 0.15
+    other = HarvestManager(manager.store, output_dir=str(tmp_path / "out"), concurrency=2, max_attempts=2, lease=0.15)
+    started = []
+
+    async def slow_transcript(video_id, language="auto", auto_generated=False):
+        started.append(video_id)
+        await asyncio.sleep(10)
+
+    manager.transcript_service.get_transcript = slow_transcript
+
+    async def main():
+        job_id = await manager.create(CHANNEL_ID, ["ru"], False, 2)
+        while not started:
+            await asyncio.sleep(0.01)
+        cancelled = await other.cancel(job_id)
+        await asyncio.wait_for(asyncio.gather(manager._tasks[job_id], return_exceptions=True), 1)
+        return job_id, cancelled, await other.resume(), await other.cancel(job_id)
+
+    job_id, cancelled, resumed, again = asyncio.run(main())
+
+    assert cancelled is True
+    assert resumed == []
+    assert again is False
+    assert manager.store.get_job(job_id)["status"] == "cancelled"
@@ -0,0 +1,86 @@
+"""
+Tests for the negative cache of classified transcript failures.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import transcript_service as transcript_service_module
+from app.services.negative_cache import NegativeCache, classify_failure
+from app.services.transcript_service import TranscriptService
+
+TTLS = {"unavailable": 60, "private": 60, "disabled": 60, "no_transcript": 60}
+
+
+def test_classify_failure():
+    """Test that definitive failures are classified and transient ones are not."""
+    assert classify_failure("Subtitles are disabled for this video") == "disabled"
+    assert classify_failure("Video is private or requires sign-in") == "private"
+    assert classify_failure("Video is not available (may have been removed)") == "unavailable"
+    assert classify_failure({"details": {
+        "new_api": "New API: No transcript found in he",
+        "old_api": "Old API: No transcript available in he",
+        "yt_dlp": "yt-dlp: No subtitles available in he",
+        "timedtext": "Not attempted",
+    }}) == "no_transcript"
+    # One backend failed for another reason, so the video may still have a transcript
+    assert classify_failure({"details": {
+        "new_api": "New API: No transcript found in he",
+        "yt_dlp": "yt-dlp: Error retrieving transcript with yt-dlp: HTTP Error 429",
+    }}) is None
+    assert classify_failure("HTTPSConnectionPool: Read timed out") is None
+
+
+def test_video_failures_apply_to_every_language():
+    """Test that video-wide failures match any language and transcript failures only their own."""
+    cache = NegativeCache(TTLS)
+    cache.put("vid00000001", "ru", False, "private", {"error": "no_subtitles"})
+    cache.put("vid00000002", "he", False, "no_transcript", {"error": "no_subtitles"})
+
+    assert cache.get("vid00000001", "en", True)["failure_class"] == "private"
+    assert cache.get("vid00000002", "he", False)["failure_class"] == "no_transcript"
+    assert cache.get("vid00000002", "ru", False) is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_entries_expire_per_class():
+    """Test that each failure class uses its own TTL and classes without a TTL are not stored."""
+    cache = NegativeCache({"disabled": 60, "no_transcript": 0.01})
+    cache.put("vid00000001", "ru", False, "disabled", {})
+    cache.put("vid00000002", "ru", False, "no_transcript", {})
+    cache.put("vid00000003", "ru", False, "private", {})
+
+    asyncio.run(asyncio.sleep(0.02))
+
+    assert cache.get("vid00000001", "ru", False) is not None
+    assert cache.get("vid00000002", "ru", False) is None
+    assert cache.get("vid00000003", "ru", False) is None
+
+
+def test_repeat_request_fails_from_negative_cache(monkeypatch):
+    """Test that a repeat request for a video with disabled subtitles skips every backend."""
+    calls = []
+
+    class FakeYouTubeService:
+        async def get_subtitles(self, video_id, lang=None, auto_generated=False):
+            calls.append(video_id)
+            return None, "Subtitles are disabled for this video"
+
+    monkeypatch.setattr(transcript_service_module, "negative_cache", NegativeCache(TTLS))
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", None)
+    service = TranscriptService()
+    service.youtube_service = FakeYouTubeService()
+
+    with pytest.raises(HTTPException) as first:
+        asyncio.run(service.get_transcript("dQw4w9WgXcQ", "ru"))
+    with pytest.raises(HTTPException) as second:
+        asyncio.run(service.get_transcript("dQw4w9WgXcQ", "en"))
+
+    assert calls == ["dQw4w9WgXcQ"]
+    assert first.value.status_code == second.value.status_code == 404
+    assert "cached" not in first.value.detail
+    assert second.value.detail["cached"] is True
+    assert second.value.detail["failure_class"] == "disabled"
+    assert second.value.headers == {"X-Cache": "NEGATIVE-HIT"}
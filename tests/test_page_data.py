@@ -0,0 +1,68 @@
+"""
+Tests for extracting the JSON embedded in YouTube pages.
+"""
+
+import json
+from pathlib import Path
+
+from app.utils.page_data import (
+    extract_initial_data, extract_json_object, extract_player_response, renderer_text, walk_renderers
+)
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_extracts_recorded_page_objects():
+    """Test that both page objects in the recorded watch page match the recorded JSON files."""
+    html = (ROOT / "youtube_response.html").read_text(encoding="utf-8")
+
+    player_response = extract_player_response(html)
+    initial_data = extract_initial_data(html)
+
+    assert player_response == json.loads((ROOT / "player_response.json").read_text(encoding="utf-8"))
+    assert initial_data == json.loads((ROOT / "initial_data.json").read_text(encoding="utf-8"))
+
+
+def test_object_may_contain_braces_and_semicolons_in_strings():
+    """Test that decoding stops at the end of the object, not at the first '};'."""
+    html = '<script>var ytInitialData = {"title": "a};b", "items": [{"x": 1}]};var other = {};</script>'
+
+    assert extract_json_object(html, "ytInitialData") == {"title": "a};b", "items": [{"x": 1}]}
+
+
+def test_skips_mentions_that_are_not_assignments():
+    """Test that a name used before its assignment is skipped, and a missing object gives None."""
+    html = 'if (window["ytInitialData"]) {} window["ytInitialData"] = {"ok": true};'
+
+    assert extract_json_object(html, "ytInitialData") == {"ok": True}
+    assert extract_json_object("var ytInitialData = null;", "ytInitialData") is None
+
+
+def test_walk_renderers_in_document_order():
+    """Test that renderers are found wherever they sit, in page order, without descending into matches."""
+    data = json.loads((ROOT / "initial_data.json").read_text(encoding="utf-8"))
+
+    def collect(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "compactVideoRenderer":
+                    yield value["videoId"]
+                else:
+                    yield from collect(value)
+        elif isinstance(node, list):
+            for value in node:
+                yield from collect(value)
+
+    found = [renderer["videoId"] for _, renderer in walk_renderers(data, ("compactVideoRenderer",))]
+
+    assert len(found) == 20
+    assert found == list(collect(data))
+    nested = {"a": {"videoRenderer": {"videoId": "outer", "inner": {"videoRenderer": {"videoId": "inner"}}}}}
+    assert [r["videoId"] for _, r in walk_renderers(nested, ("videoRenderer",))] == ["outer"]
+
+
+def test_renderer_text():
+    """Test both text layouts and the default."""
+    assert renderer_text({"simpleText": "Урок"}) == "Урок"
+    assert renderer_text({"runs": [{"text": "Урок "}, {"text": "1"}]}) == "Урок 1"
+    assert renderer_text(None, "N/A") == "N/A"
@@ -0,0 +1,165 @@
+"""
+Tests for the outbound YouTube rate governor.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import http_session as http_session_module
+from app.services.deadline import DeadlineExceeded, deadline_scope
+from app.services.rate_governor import RateGovernor, is_throttled, retry_after
+
+
+def test_bucket_spaces_requests_after_burst():
+    """Test that requests beyond the burst wait for the refill rate."""
+    governor = RateGovernor("test", rate=50, burst=2)
+
+    waits = [governor._reserve_and_record() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.015 < waits[2] < 0.025
+    assert 0.035 < waits[3] < 0.045
+    stats = governor.stats()
+    assert stats["acquired"] == 4
+    assert stats["waited"] == 2
+    assert stats["total_wait"] > 0.05
+
+
+def test_throttling_pauses_the_bucket():
+    """Test that a throttled response pauses every caller and Retry-After is honoured."""
+    governor = RateGovernor("test", rate=1000, burst=10, backoff_base=1.0, backoff_max=60)
+
+    assert governor.report_throttled(retry_after_seconds=0.5) == 0.5
+    wait = governor._reserve_and_record()
+
+    assert 0.45 < wait <= 0.51
+    assert governor.stats()["throttled"] == 1
+
+
+def test_backoff_grows_with_jitter_and_resets():
+    """Test that consecutive throttled responses double the jittered pause up to the maximum."""
+    governor = RateGovernor("test", rate=1000, burst=10, backoff_base=1.0, backoff_max=3.0)
+
+    first = governor.report_throttled()
+    second = governor.report_throttled()
+    third = governor.report_throttled()
+    governor.report_ok()
+
+    assert 0.5 <= first <= 1.0
+    assert 1.0 <= second <= 2.0
+    assert 1.5 <= third <= 3.0
+    assert governor.stats()["throttle_streak"] == 0
+
+
+def test_shared_state_between_governors(tmp_path):
+    """Test that two governors on one SQLite file (e.g. two workers) share one bucket."""
+    path = str(tmp_path / "governor.sqlite3")
+    first = RateGovernor("youtube", rate=50, burst=1, state_path=path)
+    second = RateGovernor("youtube", rate=50, burst=1, state_path=path)
+
+    assert first._reserve_and_record() == 0.0
+    assert second._reserve_and_record() > 0.015
+
+
+def test_paused_bucket_fails_fast_past_the_deadline():
+    """Test that a caller whose deadline ends before the pause does not sleep or take a token."""
+    governor = RateGovernor("test", rate=1000, burst=10)
+    governor.report_throttled(retry_after_seconds=30)
+    tokens = governor._state["tokens"]
+
+    start = time.monotonic()
+    with deadline_scope(0.2):
+        with pytest.raises(DeadlineExceeded):
+            governor.acquire()
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(governor.acquire_async())
+
+    assert time.monotonic() - start < 0.1
+    assert governor._state["tokens"] == tokens
+    assert governor.stats()["deadline_rejected"] == 2
+    assert governor.stats()["acquired"] == 0
+
+
+def test_shared_state_stays_off_the_event_loop(tmp_path, monkeypatch):
+    """Test that async callers reach the shared file from a worker thread and successes do not write."""
+    governor = RateGovernor("youtube", rate=1000, burst=10, state_path=str(tmp_path / "governor.sqlite3"))
+    threads = []
+    update = governor._update
+
+    def recording_update(change):
+        threads.append(threading.current_thread())
+        return update(change)
+
+    monkeypatch.setattr(governor, "_update", recording_update)
+
+    async def main():
+        await governor.acquire_async()
+        await governor.report_ok_async()
+        governor.report_ok()
+        await governor.report_throttled_async(retry_after_seconds=0)
+        await governor.report_ok_async()
+
+    asyncio.run(main())
+
+    # acquire, report_throttled and the one report_ok that had a streak to reset
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+    assert governor.stats()["throttle_streak"] == 0
+
+
+def test_stats_do_not_take_the_write_lock(tmp_path):
+    """Test that reading the counters of a shared bucket works while another worker holds the write lock."""
+    path = str(tmp_path / "governor.sqlite3")
+    governor = RateGovernor("youtube", rate=50, burst=5, state_path=path)
+    governor.report_throttled(30)
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        stats = governor.stats()
+        assert time.monotonic() - started < 1
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    assert stats["throttle_streak"] == 1
+    assert stats["paused_for"] > 20
+
+
+def test_throttle_detection():
+    """Test 429, consent-page and Retry-After detection."""
+    assert is_throttled(SimpleNamespace(status_code=429, url="https://www.youtube.com/watch"))
+    assert is_throttled(SimpleNamespace(status_code=200, url="https://consent.youtube.com/m?continue=x"))
+    assert not is_throttled(SimpleNamespace(status_code=200, url="https://www.youtube.com/watch"))
+    assert retry_after(SimpleNamespace(headers={"Retry-After": "7"})) == 7.0
+    assert retry_after(SimpleNamespace(headers={})) is None
+
+
+def test_youtube_get_retries_throttled_response(monkeypatch):
+    """Test that a 429 pauses the governor and the request is retried."""
+    responses = [
+        SimpleNamespace(status_code=429, url="https://www.youtube.com/watch", headers={"Retry-After": "0.05"}),
+        SimpleNamespace(status_code=200, url="https://www.youtube.com/watch", headers={}),
+    ]
+
+    class FakeSession:
+        def get(self, url, **kwargs):
+            return responses.pop(0)
+
+    governor = RateGovernor("test", rate=1000, burst=10)
+    monkeypatch.setattr(http_session_module, "_governor", governor)
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+    monkeypatch.setattr(settings, "YOUTUBE_THROTTLE_RETRIES", 1)
+
+    start = time.monotonic()
+    response = http_session_module.youtube_get("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 0.045
+    assert governor.stats()["throttled"] == 1
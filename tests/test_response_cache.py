@@ -0,0 +1,121 @@
+"""
+Tests for the stale-while-revalidate channel response cache.
+"""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import response_cache as response_cache_module
+from app.services.deadline import deadline_scope, remaining
+from app.services.response_cache import HIT, MISS, STALE, ResponseCache
+from app.services.scheduler import BATCH, INTERACTIVE, current_priority
+from app.services.youtube_search import YouTubeSearcher
+
+
+class Upstream:
+    """Returns a new version on every fetch, recording the context it ran in."""
+
+    def __init__(self, fail=False):
+        self.version = 0
+        self.contexts = []
+        self.fail = fail
+
+    async def fetch(self):
+        self.contexts.append((current_priority.get(), remaining()))
+        await asyncio.sleep(0.01)
+        if self.fail and self.version:
+            raise RuntimeError("upstream down")
+        self.version += 1
+        return {"version": self.version}
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    """Test miss, hit, then stale responses that trigger a single background refresh."""
+    cache = ResponseCache("test", fresh_ttl=0.05, stale_ttl=60)
+    upstream = Upstream()
+
+    async def main():
+        states = [await cache.get("key", upstream.fetch), await cache.get("key", upstream.fetch)]
+        await asyncio.sleep(0.06)
+        with deadline_scope(5):
+            states += [await cache.get("key", upstream.fetch) for _ in range(3)]
+        await asyncio.gather(*cache._refreshing.values())
+        states.append(await cache.get("key", upstream.fetch))
+        return states
+
+    states = asyncio.run(main())
+
+    assert [state for _, state in states] == [MISS, HIT, STALE, STALE, STALE, HIT]
+    assert [value["version"] for value, _ in states] == [1, 1, 1, 1, 1, 2]
+    # The refresh ran once, in the background class and without the request's 5 s deadline
+    assert [priority for priority, _ in upstream.contexts] == [INTERACTIVE, BATCH]
+    assert upstream.contexts[1][1] > 5
+    assert cache.stats()["refreshed"] == 1
+
+
+def test_failed_refresh_keeps_the_stale_entry():
+    """Test that an upstream failure during revalidation leaves the cached value in place."""
+    cache = ResponseCache("test", fresh_ttl=0, stale_ttl=60)
+    upstream = Upstream(fail=True)
+
+    async def main():
+        await cache.get("key", upstream.fetch)
+        stale = await cache.get("key", upstream.fetch)
+        await asyncio.gather(*cache._refreshing.values())
+        return stale, await cache.get("key", upstream.fetch)
+
+    stale, again = asyncio.run(main())
+
+    assert stale == ({"version": 1}, STALE)
+    assert again == ({"version": 1}, STALE)
+    assert cache.stats()["refresh_failed"] == 1
+
+
+def test_hung_refresh_gives_up_at_the_deadline(monkeypatch):
+    """Test that a refresh whose fetch never returns ends and lets the key be refreshed again."""
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_MAX", 0.05)
+    cache = ResponseCache("test", fresh_ttl=0, stale_ttl=60)
+    cache.put("key", {"version": 1})
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def main():
+        stale = await cache.get("key", hang)
+        await asyncio.sleep(0.2)
+        return stale
+
+    assert asyncio.run(main()) == ({"version": 1}, STALE)
+    assert cache._refreshing == {}
+    assert cache.stats()["refresh_failed"] == 1
+
+
+@pytest.fixture
+def search_calls(monkeypatch):
+    """Replace the channel search with a counter and give the routes an empty cache."""
+    calls = []
+
+    async def fake_search(query, max_results=5):
+        calls.append(query)
+        if query == "nothing":
+            return {"status": "error", "message": "No channels found", "error_type": "NoResultsError"}
+        return {"status": "success", "query": query, "results": [{"channel_id": "UCfound"}], "count": 1}
+
+    monkeypatch.setattr(YouTubeSearcher, "search_channels_async", staticmethod(fake_search))
+    monkeypatch.setattr(response_cache_module, "_channel_cache", ResponseCache("channel", fresh_ttl=300, stale_ttl=600))
+    return calls
+
+
+def test_channel_search_endpoint_is_cached(test_client, search_calls):
+    """Test that repeated searches are served from the cache and failures are not cached."""
+    first = test_client.get("/channel-search/search", params={"query": "Lectures"})
+    second = test_client.get("/channel-search/search", params={"query": "lectures "})
+    test_client.get("/channel-search/search", params={"query": "nothing"})
+    test_client.get("/channel-search/search", params={"query": "nothing"})
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["results"] == [{"channel_id": "UCfound"}]
+    assert search_calls == ["Lectures", "nothing", "nothing"]
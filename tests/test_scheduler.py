@@ -0,0 +1,179 @@
+"""
+Tests for priority scheduling of upstream work.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import scheduler as scheduler_module
+from app.services import transcript_service as transcript_service_module
+from app.services.executor import run_blocking
+from app.services.scheduler import AdmissionRejected, BATCH, INTERACTIVE, PriorityScheduler, current_priority
+from app.services.transcript_cache import TranscriptCache
+from app.services.transcript_service import TranscriptService
+
+
+def make_scheduler(capacity=1, batch_concurrency=1, **kwargs):
+    return PriorityScheduler("test", capacity=capacity, classes={
+        INTERACTIVE: (capacity, 1.0),
+        BATCH: (batch_concurrency, 0.5),
+    }, **kwargs)
+
+
+def test_interactive_work_jumps_ahead_of_queued_batch_work():
+    """Test that freed capacity goes to interactive work even if batch work queued first."""
+    scheduler = make_scheduler(capacity=1)
+    order = []
+
+    async def work(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        first = asyncio.ensure_future(work("batch-1", BATCH))
+        await asyncio.sleep(0)
+        queued = [asyncio.ensure_future(work("batch-2", BATCH))]
+        await asyncio.sleep(0)
+        queued.append(asyncio.ensure_future(work("interactive", INTERACTIVE)))
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(main())
+
+    assert order == ["batch-1", "interactive", "batch-2"]
+    stats = scheduler.stats()["classes"]
+    assert stats[INTERACTIVE]["max_wait"] > 0
+    assert stats[BATCH]["admitted"] == 2
+
+
+def test_batch_concurrency_limit_leaves_room_for_interactive():
+    """Test that batch work is capped at its own limit while interactive work still starts."""
+    scheduler = make_scheduler(capacity=4, batch_concurrency=2)
+    peak = {"batch": 0, "running": 0}
+
+    async def work(priority):
+        async with scheduler.slot(priority):
+            if priority == BATCH:
+                peak["batch"] = max(peak["batch"], scheduler.stats()["classes"][BATCH]["active"])
+            await asyncio.sleep(0.01)
+
+    async def main():
+        batch = [asyncio.ensure_future(work(BATCH)) for _ in range(6)]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["classes"][BATCH]["queued"] == 4
+        await work(INTERACTIVE)
+        await asyncio.gather(*batch)
+
+    asyncio.run(main())
+
+    assert peak["batch"] == 2
+    assert scheduler.stats()["classes"][INTERACTIVE]["max_wait"] == 0.0
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    """Test that a cancelled queued request does not hold capacity."""
+    scheduler = make_scheduler(capacity=1)
+
+    async def main():
+        await scheduler.acquire(INTERACTIVE)
+        waiter = asyncio.ensure_future(scheduler.acquire(BATCH))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release(INTERACTIVE)
+
+    asyncio.run(main())
+
+    stats = scheduler.stats()
+    assert stats["active"] == 0
+    assert stats["classes"][BATCH]["queued"] == 0
+
+
+def test_priority_is_visible_in_executor_threads():
+    """Test that run_blocking carries the request priority into the worker thread."""
+    async def main():
+        current_priority.set(BATCH)
+        return await run_blocking(current_priority.get)
+
+    assert asyncio.run(main()) == BATCH
+
+
+def test_full_queue_rejects_bounded_work_with_retry_after():
+    """Test that bounded acquires fail fast once the class queue is full."""
+    scheduler = make_scheduler(capacity=2, max_queue=2)
+    scheduler._service_times.extend([3.0, 3.0, 3.0])
+
+    async def main():
+        await scheduler.acquire(INTERACTIVE)
+        await scheduler.acquire(INTERACTIVE)
+        queued = [asyncio.ensure_future(scheduler.acquire(INTERACTIVE, bounded=True)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await scheduler.acquire(INTERACTIVE, bounded=True)
+        # Unbounded (internal) work still queues
+        unbounded = asyncio.ensure_future(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["classes"][INTERACTIVE]["queued"] == 3
+        for task in queued + [unbounded]:
+            task.cancel()
+        await asyncio.gather(*queued, unbounded, return_exceptions=True)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+
+    # Two queued requests plus this one drain through two slots at 3s each
+    assert rejected.status_code == 503
+    assert rejected.retry_after == 5
+    assert rejected.headers == {"Retry-After": "5"}
+    assert scheduler.stats()["classes"][INTERACTIVE]["rejected"] == 1
+
+
+def test_queue_wait_timeout_rejects_and_leaves_the_queue():
+    """Test that bounded work gives up after queue_timeout without holding a queue position."""
+    scheduler = make_scheduler(capacity=1, queue_timeout=0.02)
+
+    async def main():
+        await scheduler.acquire(INTERACTIVE)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await scheduler.acquire(INTERACTIVE, bounded=True)
+        scheduler.release(INTERACTIVE)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+
+    assert rejected.reason == "queue wait timed out"
+    stats = scheduler.stats()
+    assert stats["active"] == 0
+    assert stats["classes"][INTERACTIVE]["queued"] == 0
+
+
+def test_overloaded_endpoint_returns_503(test_client, monkeypatch):
+    """Test that an endpoint needing upstream work answers 503 with Retry-After when the queue is full."""
+    scheduler = make_scheduler(capacity=1, max_queue=0)
+    asyncio.run(scheduler.acquire(INTERACTIVE))
+    monkeypatch.setattr(scheduler_module, "_scheduler", scheduler)
+
+    response = test_client.get("/channel-search/search", params={"query": "test"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert response.json()["detail"]["error"] == "overloaded"
+
+
+def test_cache_hits_bypass_admission_control(tmp_path, monkeypatch):
+    """Test that cached transcripts are served even when no upstream work is admitted."""
+    cache = TranscriptCache(str(tmp_path / "transcripts.sqlite3"), ttl=60, max_bytes=1024 * 1024)
+    cache.put("dQw4w9WgXcQ", "en", False, "en", "Hello there.", "Hello there.")
+    scheduler = make_scheduler(capacity=1, max_queue=0)
+    asyncio.run(scheduler.acquire(INTERACTIVE))
+    monkeypatch.setattr(scheduler_module, "_scheduler", scheduler)
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", cache)
+    monkeypatch.setattr(transcript_service_module, "negative_cache", None)
+
+    transcript, _, metadata = asyncio.run(TranscriptService().get_transcript("dQw4w9WgXcQ", "en"))
+    assert transcript == "Hello there."
+    assert metadata["cache"] == "hit"
+
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(TranscriptService().get_transcript("9bZkp7q19f0", "en"))
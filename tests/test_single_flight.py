@@ -0,0 +1,140 @@
+"""
+Tests for in-process request coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.deadline import DeadlineExceeded, deadline_scope, remaining
+from app.services.scheduler import BATCH, INTERACTIVE, current_priority
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    """Test that concurrent calls for the same key run the work once."""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(10)))
+
+    results = asyncio.run(main())
+
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "executed": 1, "coalesced": 9}
+
+
+def test_different_keys_are_not_coalesced():
+    """Test that calls for different keys run independently."""
+    flight = SingleFlight("test")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0.01, result="a")),
+            flight.do("b", lambda: asyncio.sleep(0.01, result="b"))
+        )
+
+    assert asyncio.run(main()) == ["a", "b"]
+    assert flight.coalesced == 0
+
+
+def test_exception_is_shared_and_cleaned_up():
+    """Test that a failure reaches every caller and the key can be retried afterwards."""
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        results = await asyncio.gather(
+            flight.do("key", failing),
+            flight.do("key", failing),
+            return_exceptions=True
+        )
+        retry = await flight.do("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retry
+
+    results, retry = asyncio.run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retry == "ok"
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Test that one cancelled caller leaves the shared call running for the rest."""
+    flight = SingleFlight("test")
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0.05, result="done")))
+        second = asyncio.ensure_future(flight.do("key", lambda: asyncio.sleep(0.05, result="other")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_last_cancelled_caller_cancels_shared_call():
+    """Test that the shared call is cancelled once nobody is waiting for it."""
+    flight = SingleFlight("test")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def main():
+        caller = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+
+    assert finished == []
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_shared_call_runs_in_its_own_context():
+    """Test that the shared call gets the best caller priority and each caller keeps its own deadline."""
+    flight = SingleFlight("test")
+    seen = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        seen.append((current_priority.get(), remaining()))
+        return "done"
+
+    async def batch_caller():
+        current_priority.set(BATCH)
+        with deadline_scope(60):
+            return await flight.do("key", work)
+
+    async def impatient_caller():
+        await asyncio.sleep(0.01)
+        with deadline_scope(0.02):
+            return await flight.do("key", work)
+
+    async def main():
+        return await asyncio.gather(batch_caller(), impatient_caller(), return_exceptions=True)
+
+    result, timed_out = asyncio.run(main())
+
+    assert result == "done"
+    assert isinstance(timed_out, DeadlineExceeded)
+    # The interactive caller raised the shared call's class; its short deadline did not cut it off
+    assert seen[0][0] == INTERACTIVE
+    assert seen[0][1] > 1
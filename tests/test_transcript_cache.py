@@ -0,0 +1,185 @@
+"""
+Tests for the persistent transcript cache.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import executor as executor_module
+from app.services import transcript_service as transcript_service_module
+from app.services.transcript_cache import TranscriptCache
+from app.services.transcript_service import TranscriptService
+
+
+@pytest.fixture
+def cache(tmp_path) -> TranscriptCache:
+    """Create an empty cache in a temporary directory."""
+    return TranscriptCache(str(tmp_path / "transcripts.sqlite3"), ttl=60, max_bytes=1024 * 1024)
+
+
+def test_put_and_get(cache):
+    """Test that a stored transcript is returned with its resolved language."""
+    cache.put("dQw4w9WgXcQ", "auto", False, "en", "raw text", "clean text")
+
+    entry = cache.get("dQw4w9WgXcQ", "auto", False)
+    assert entry["raw"] == "raw text"
+    assert entry["cleaned"] == "clean text"
+    assert entry["language"] == "en"
+    assert cache.get("dQw4w9WgXcQ", "auto", True) is None
+    assert cache.get("dQw4w9WgXcQ", "ru", False) is None
+
+
+def test_survives_reopen(cache):
+    """Test that entries are visible to a second cache instance on the same file."""
+    cache.put("dQw4w9WgXcQ", "ru", False, "ru", "raw", "clean")
+
+    reopened = TranscriptCache(cache.path, ttl=60, max_bytes=1024 * 1024)
+    assert reopened.get("dQw4w9WgXcQ", "ru", False)["cleaned"] == "clean"
+
+
+def test_expired_entries_are_misses(cache):
+    """Test that entries older than the TTL are not returned."""
+    cache.put("dQw4w9WgXcQ", "ru", False, "ru", "raw", "clean")
+    cache.ttl = 0
+    time.sleep(0.01)
+
+    assert cache.get("dQw4w9WgXcQ", "ru", False) is None
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted once the size budget is exceeded."""
+    cache = TranscriptCache(str(tmp_path / "lru.sqlite3"), ttl=60, max_bytes=250)
+    cache.put("video_aaaaa", "ru", False, "ru", "a" * 50, "a" * 50)
+    cache.put("video_bbbbb", "ru", False, "ru", "b" * 50, "b" * 50)
+    # Touch the first entry so the second one becomes the eviction candidate
+    assert cache.get("video_aaaaa", "ru", False) is not None
+    cache.put("video_ccccc", "ru", False, "ru", "c" * 50, "c" * 50)
+
+    assert cache.get("video_aaaaa", "ru", False) is not None
+    assert cache.get("video_bbbbb", "ru", False) is None
+    assert cache.get("video_ccccc", "ru", False) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_service_serves_cached_transcript(cache, monkeypatch):
+    """Test that TranscriptService only goes upstream on a cache miss."""
+    calls = []
+
+    async def fake_get_subtitles(video_id, lang=None, auto_generated=False):
+        calls.append(video_id)
+        return "Hello there. General Kenobi.", "en"
+
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", cache)
+    service = TranscriptService()
+    monkeypatch.setattr(service.youtube_service, "get_subtitles", fake_get_subtitles)
+
+    first, lang, metadata = asyncio.run(service.get_transcript("dQw4w9WgXcQ", "auto"))
+    second, cached_lang, cached_metadata = asyncio.run(service.get_transcript("dQw4w9WgXcQ", "auto"))
+
+    assert calls == ["dQw4w9WgXcQ"]
+    assert metadata["cache"] == "miss"
+    assert cached_metadata["cache"] == "hit"
+    assert second == first
+    assert cached_lang == lang == "en"
+
+
+def test_cache_hit_does_not_wait_for_the_upstream_pool(cache, monkeypatch):
+    """Test that cache lookups run on the disk executor while YouTube calls fill the upstream pool."""
+    cache.put("dQw4w9WgXcQ", "en", False, "en", "raw", "Cached text.")
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", cache)
+    monkeypatch.setattr(transcript_service_module, "negative_cache", None)
+    monkeypatch.setattr(executor_module, "_executor", executor_module.InstrumentedExecutor("test-io", max_workers=1))
+    release = threading.Event()
+
+    async def main():
+        blocked = asyncio.ensure_future(executor_module.run_blocking(release.wait))
+        try:
+            return await asyncio.wait_for(TranscriptService().get_transcript("dQw4w9WgXcQ", "en"), 1)
+        finally:
+            release.set()
+            await blocked
+
+    try:
+        transcript, _, metadata = asyncio.run(main())
+    finally:
+        executor_module.shutdown_upstream_executor()
+
+    assert (transcript, metadata["cache"]) == ("Cached text.", "hit")
+
+
+def test_stale_entries_only_when_allowed(cache):
+    """Test that entries past the TTL are returned, marked stale, only to callers that accept them."""
+    cache.put("dQw4w9WgXcQ", "ru", False, "ru", "raw", "clean")
+    cache.ttl = 0
+    cache.stale_ttl = 60
+    time.sleep(0.01)
+
+    assert cache.get("dQw4w9WgXcQ", "ru", False) is None
+    entry = cache.get("dQw4w9WgXcQ", "ru", False, allow_stale=True)
+    assert entry["cleaned"] == "clean"
+    assert entry["stale"] is True
+    cache.stale_ttl = 0
+    assert cache.get("dQw4w9WgXcQ", "ru", False, allow_stale=True) is None
+
+
+@pytest.fixture
+def stale_service(cache, monkeypatch):
+    """A service whose cache holds one expired transcript, with a controllable upstream."""
+    upstream = {"calls": [], "result": ("Fresh text.", "en")}
+
+    async def fake_get_subtitles(video_id, lang=None, auto_generated=False):
+        upstream["calls"].append((video_id, transcript_service_module.current_priority.get()))
+        await asyncio.sleep(0.01)
+        return upstream["result"]
+
+    cache.put("dQw4w9WgXcQ", "auto", False, "en", "Old text.", "Old text.")
+    cache.ttl = 0
+    cache.stale_ttl = 3600
+    time.sleep(0.01)
+    monkeypatch.setattr(transcript_service_module, "transcript_cache", cache)
+    monkeypatch.setattr(transcript_service_module, "negative_cache", None)
+    service = TranscriptService()
+    monkeypatch.setattr(service.youtube_service, "get_subtitles", fake_get_subtitles)
+    return service, upstream
+
+
+def test_stale_transcript_is_served_while_refreshing(stale_service, cache, monkeypatch):
+    """Test stale-while-revalidate: the old text is returned at once and one refresh runs at batch priority."""
+    service, upstream = stale_service
+    monkeypatch.setattr(transcript_service_module.settings, "TRANSCRIPT_CACHE_STALE_WHILE_REVALIDATE", 3600)
+
+    async def main():
+        results = await asyncio.gather(*(service.get_transcript("dQw4w9WgXcQ", "auto") for _ in range(3)))
+        results.append(await service.get_transcript("dQw4w9WgXcQ", "auto"))
+        await asyncio.gather(*transcript_service_module._revalidations.values())
+        return results
+
+    results = asyncio.run(main())
+
+    assert {(text, metadata["cache"]) for text, _, metadata in results} == {("Old text.", "stale")}
+    assert upstream["calls"] == [("dQw4w9WgXcQ", transcript_service_module.BATCH)]
+    cache.ttl = 60
+    assert cache.get("dQw4w9WgXcQ", "auto", False)["cleaned"] == "Fresh text."
+
+
+def test_stale_transcript_is_served_when_youtube_fails(stale_service, monkeypatch):
+    """Test stale-if-error: a failed retrieval returns the old text, a removed video does not."""
+    service, upstream = stale_service
+    monkeypatch.setattr(transcript_service_module.settings, "TRANSCRIPT_CACHE_STALE_WHILE_REVALIDATE", 0)
+    upstream["result"] = (None, {
+        "error": "retrieval_failed",
+        "message": "all backends failed",
+        "details": {"timedtext": "429 Client Error: Too Many Requests", "yt_dlp": "Read timed out"}
+    })
+
+    text, _, metadata = asyncio.run(service.get_transcript("dQw4w9WgXcQ", "auto"))
+    assert (text, metadata["cache"]) == ("Old text.", "stale")
+
+    upstream["result"] = (None, "Video unavailable: This video has been removed")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(service.get_transcript("dQw4w9WgXcQ", "auto"))
+    assert error.value.status_code == 404
@@ -0,0 +1,54 @@
+"""
+Tests for parsing search and channel pages in YouTubeSearcher.
+"""
+
+import json
+from pathlib import Path
+
+from app.services.youtube_search import YouTubeSearcher
+
+ROOT = Path(__file__).parent.parent
+
+
+def page(data):
+    return f'<html><script>var ytInitialData = {json.dumps(data, ensure_ascii=False)};</script></html>'
+
+
+def test_channel_videos_come_from_video_renderers():
+    """Test that every videoRenderer is returned, including ones with missing fields."""
+    html = page({"contents": {"richGridRenderer": {"contents": [
+        {"richItemRenderer": {"content": {"videoRenderer": {
+            "videoId": "video000001",
+            "title": {"runs": [{"text": "Урок 1"}]},
+            "lengthText": {"accessibility": {"accessibilityData": {"label": "1 hour"}}, "simpleText": "1:00:00"},
+            "viewCountText": {"simpleText": "100 views"},
+            "publishedTimeText": {"simpleText": "1 day ago"}
+        }}}},
+        # Live streams have no length, premieres no view count
+        {"richItemRenderer": {"content": {"videoRenderer": {
+            "videoId": "video000002",
+            "title": {"runs": [{"text": "Прямой эфир"}]}
+        }}}}
+    ]}}})
+
+    result = YouTubeSearcher._parse_channel_videos(html, "UCchannel", 10)
+
+    assert result["status"] == "success"
+    assert result["videos"][0] == {
+        "video_id": "video000001",
+        "title": "Урок 1",
+        "duration": "1:00:00",
+        "published_time": "1 day ago",
+        "view_count": "100 views",
+        "thumbnail": "https://img.youtube.com/vi/video000001/hqdefault.jpg",
+        "url": "https://www.youtube.com/watch?v=video000001"
+    }
+    assert result["videos"][1]["duration"] == "N/A"
+
+
+def test_page_without_videos_is_an_extraction_error():
+    """Test that the recorded watch page (no videoRenderer items) yields no videos and no channels."""
+    html = (ROOT / "youtube_response.html").read_text(encoding="utf-8")
+
+    assert YouTubeSearcher._parse_channel_videos(html, "UCchannel", 10)["error_type"] == "VideoExtractionError"
+    assert YouTubeSearcher._parse_channel_results(html, "query", 5)["error_type"] == "NoResultsError"
@@ -0,0 +1,472 @@
+"""
+Offline tests for subtitle retrieval in YouTubeService.
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.services import http_session as http_session_module
+from app.services import youtube as youtube_module
+from app.services.rate_governor import RateGovernor
+from app.services.youtube import YouTubeService
+
+ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture(autouse=True)
+def fast_governor(monkeypatch):
+    """Give each test its own outbound rate governor with negligible backoff."""
+    governor = RateGovernor("test", rate=1000, burst=1000, backoff_base=0.001, backoff_max=0.01)
+    monkeypatch.setattr(http_session_module, "_governor", governor)
+    return governor
+
+
+class FakeTranscript:
+    """Stand-in for youtube_transcript_api.Transcript."""
+
+    def __init__(self, language_code: str, language: str, is_generated: bool = False):
+        self.language_code = language_code
+        self.language = language
+        self.is_generated = is_generated
+
+    def fetch(self):
+        return [SimpleNamespace(text=f"Text in {self.language_code}.")]
+
+
+class FakeTranscriptList:
+    """Stand-in for youtube_transcript_api.TranscriptList."""
+
+    def __init__(self, transcripts, video_language_code=None):
+        self.transcripts = transcripts
+        if video_language_code:
+            self.video_language_code = video_language_code
+
+    def __iter__(self):
+        return iter(self.transcripts)
+
+    def _find(self, language_codes, generated):
+        for code in language_codes or []:
+            for transcript in self.transcripts:
+                if transcript.language_code == code and (generated is None or transcript.is_generated == generated):
+                    return transcript
+        raise Exception(f"Could not find a transcript for {language_codes}")
+
+    def find_transcript(self, language_codes):
+        return self._find(language_codes, None)
+
+    def find_manually_created_transcript(self, language_codes):
+        return self._find(language_codes, False)
+
+    def find_generated_transcript(self, language_codes):
+        return self._find(language_codes, True)
+
+
+@pytest.fixture
+def list_calls(monkeypatch):
+    """Replace transcript listing with an offline fake and record each call."""
+    calls = []
+
+    def fake_list_transcripts(video_id):
+        calls.append(video_id)
+        return FakeTranscriptList([
+            FakeTranscript("ru", "Russian"),
+            FakeTranscript("en", "English (auto-generated)", is_generated=True),
+        ])
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(fake_list_transcripts))
+    monkeypatch.setattr(youtube_module, "YOUTUBE_TRANSCRIPT_AVAILABLE", True)
+    return calls
+
+
+def test_inventory_is_listed_once_per_request(list_calls):
+    """Test that every fallback step reuses one caption inventory snapshot."""
+    service = YouTubeService()
+
+    text, lang = asyncio.run(service.get_subtitles("dQw4w9WgXcQ", "en"))
+
+    assert text == "Text in en."
+    assert lang == "en (auto-generated)"
+    assert list_calls == ["dQw4w9WgXcQ"]
+
+
+def test_languages_are_served_from_inventory(list_calls):
+    """Test that the available-languages lookup reuses the cached inventory."""
+    service = YouTubeService()
+
+    asyncio.run(service.get_subtitles("dQw4w9WgXcQ", "ru"))
+    languages = asyncio.run(service.get_video_languages("dQw4w9WgXcQ"))
+
+    assert languages == [
+        {"code": "ru", "name": "Russian"},
+        {"code": "en", "name": "English (auto-generated)"},
+    ]
+    assert list_calls == ["dQw4w9WgXcQ"]
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    """Enable hedged retrieval with a short delay and a fake yt-dlp backend."""
+    ytdlp_calls = []
+
+    def fake_ytdlp(self, video_id, lang="ru"):
+        ytdlp_calls.append(video_id)
+        return "Text from yt-dlp.", lang
+
+    monkeypatch.setattr(settings, "SUBTITLE_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "SUBTITLE_HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(youtube_module, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(YouTubeService, "_get_subtitles_with_ytdlp", fake_ytdlp)
+    return ytdlp_calls
+
+
+def test_hedge_not_started_when_primary_is_fast(list_calls, hedging):
+    """Test that yt-dlp is not started when youtube-transcript-api answers within the delay."""
+    service = YouTubeService()
+
+    text, lang = asyncio.run(service.get_subtitles("dQw4w9WgXcQ", "ru"))
+
+    assert text == "Text in ru."
+    assert hedging == []
+    assert service.backend_stats.snapshot()["transcript_api"]["wins"] == 1
+
+
+def test_hedge_wins_when_primary_is_slow(monkeypatch, hedging):
+    """Test that a delayed yt-dlp attempt wins over a slow youtube-transcript-api."""
+    def slow_list_transcripts(video_id):
+        time.sleep(0.5)
+        return FakeTranscriptList([FakeTranscript("ru", "Russian")])
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(slow_list_transcripts))
+    monkeypatch.setattr(youtube_module, "YOUTUBE_TRANSCRIPT_AVAILABLE", True)
+    service = YouTubeService()
+
+    async def timed_retrieval():
+        start = time.monotonic()
+        result = await service.get_subtitles("dQw4w9WgXcQ", "ru")
+        return result, time.monotonic() - start
+
+    (text, lang), elapsed = asyncio.run(timed_retrieval())
+
+    assert text == "Text from yt-dlp."
+    assert elapsed < 0.5
+    stats = service.backend_stats.snapshot()
+    assert stats["yt_dlp"]["wins"] == 1
+    assert stats["yt_dlp"]["attempts"] == 1
+
+
+async def _max_loop_stall(coro, interval: float = 0.005):
+    """Run coro while a heartbeat task measures the longest gap between its wake-ups."""
+    loop = asyncio.get_running_loop()
+    max_gap = 0.0
+    running = True
+
+    async def heartbeat():
+        nonlocal max_gap
+        last = loop.time()
+        while running:
+            await asyncio.sleep(interval)
+            now = loop.time()
+            max_gap = max(max_gap, now - last - interval)
+            last = now
+
+    beat = asyncio.ensure_future(heartbeat())
+    await asyncio.sleep(0)
+    try:
+        result = await coro
+    finally:
+        running = False
+        await beat
+    return result, max_gap
+
+
+def test_retrieval_does_not_block_event_loop(monkeypatch):
+    """Test that no single loop callback stalls while every backend does slow blocking I/O."""
+    threshold = 0.1
+
+    class SlowTranscript(FakeTranscript):
+        def fetch(self):
+            time.sleep(0.2)
+            raise Exception("Could not find a transcript")
+
+    def slow_list_transcripts(video_id):
+        time.sleep(0.2)
+        return FakeTranscriptList(
+            [SlowTranscript("ru", "Russian"), SlowTranscript("ru", "Russian", True)],
+            video_language_code="ru"
+        )
+
+    def slow_timedtext(self, video_id, lang="ru", auto_generated=False):
+        time.sleep(0.2)
+        return None, "No subtitles available for this video"
+
+    def slow_ytdlp(self, video_id, lang="ru"):
+        time.sleep(0.2)
+        return "Text from yt-dlp.", lang
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(slow_list_transcripts))
+    monkeypatch.setattr(YouTubeService, "_get_subtitles_with_timedtext", slow_timedtext)
+    monkeypatch.setattr(YouTubeService, "_get_subtitles_with_ytdlp", slow_ytdlp)
+    monkeypatch.setattr(youtube_module, "YOUTUBE_TRANSCRIPT_AVAILABLE", True)
+    monkeypatch.setattr(youtube_module, "YT_DLP_AVAILABLE", True)
+    service = YouTubeService()
+
+    # lang=None also exercises the native-language branch
+    (text, _), max_gap = asyncio.run(_max_loop_stall(service.get_subtitles("dQw4w9WgXcQ", None)))
+
+    assert text == "Text from yt-dlp."
+    assert max_gap < threshold, f"event loop stalled for {max_gap:.3f}s"
+
+
+VTT_SAMPLE = """WEBVTT
+Kind: captions
+Language: ru
+
+00:00:01.000 --> 00:00:04.000
+Первая строка.
+
+00:00:05.000 --> 00:00:08.000
+Вторая строка.
+"""
+
+
+def test_select_caption_track_prefers_manual_and_exact_language():
+    """Test that manual subtitles and exact language codes win when picking a track."""
+    info = {
+        "subtitles": {
+            "en-US": [{"ext": "vtt", "url": "https://example.com/en-US.vtt"}],
+            "ru": [{"ext": "vtt", "url": "https://example.com/ru.vtt"}],
+        },
+        "automatic_captions": {
+            "en": [{"ext": "vtt", "url": "https://example.com/en-auto.vtt"}],
+        },
+    }
+
+    assert YouTubeService._select_caption_track(info, "ru")["url"] == "https://example.com/ru.vtt"
+    assert YouTubeService._select_caption_track(info, "en")["url"] == "https://example.com/en-US.vtt"
+    assert YouTubeService._select_caption_track(info, "he") is None
+
+
+def test_select_caption_track_prefers_json3():
+    """Test that compact json3 is chosen over srv3 and VTT when a track offers them all."""
+    info = {
+        "automatic_captions": {
+            "ru": [
+                {"ext": "vtt", "url": "https://example.com/ru.vtt"},
+                {"ext": "srv3", "url": "https://example.com/ru.srv3"},
+                {"ext": "json3", "url": "https://example.com/ru.json3"},
+            ],
+        },
+    }
+
+    track = YouTubeService._select_caption_track(info, "ru")
+
+    assert track["ext"] == "json3"
+    assert track["auto_generated"] is True
+
+
+def test_ytdlp_fetches_track_in_memory(monkeypatch):
+    """Test that yt-dlp extracts the page once and the track is fetched without a download."""
+    extractions = []
+    fetched = []
+
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            self.opts = opts
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download=False):
+            extractions.append(url)
+            return {"automatic_captions": {"ru": [{"ext": "vtt", "url": "https://example.com/ru.vtt"}]}}
+
+        def download(self, urls):
+            raise AssertionError("download() must not be called")
+
+    class FakeSession:
+        def get(self, url, timeout=None):
+            fetched.append(url)
+            return SimpleNamespace(status_code=200, content=VTT_SAMPLE.encode("utf-8"), raise_for_status=lambda: None)
+
+    monkeypatch.setattr(youtube_module, "YT_DLP_AVAILABLE", True)
+    monkeypatch.setattr(youtube_module, "yt_dlp", SimpleNamespace(YoutubeDL=FakeYoutubeDL), raising=False)
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+
+    text, lang = YouTubeService()._get_subtitles_with_ytdlp("dQw4w9WgXcQ", "ru")
+
+    assert text == "Первая строка.\nВторая строка."
+    assert lang == "ru (auto-generated)"
+    assert len(extractions) == 1
+    assert fetched == ["https://example.com/ru.vtt"]
+
+
+JSON3_SAMPLE = json.dumps({"events": [
+    {"tStartMs": 1000, "dDurationMs": 3000, "segs": [{"utf8": "Первая строка."}]},
+    {"tStartMs": 5000, "dDurationMs": 3000, "segs": [{"utf8": "Вторая строка."}]},
+]}).encode("utf-8")
+
+
+def test_timedtext_backend_reads_recorded_watch_page(monkeypatch):
+    """Test that the timedtext backend picks the track from the recorded watch page and requests json3."""
+    watch_page = (ROOT / "youtube_response.html").read_text(encoding="utf-8")
+    fetched = []
+
+    class FakeSession:
+        def get(self, url, timeout=None):
+            fetched.append(url)
+            if "/watch?" in url:
+                return SimpleNamespace(status_code=200, text=watch_page, raise_for_status=lambda: None)
+            return SimpleNamespace(status_code=200, content=JSON3_SAMPLE, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+
+    text, lang = YouTubeService()._get_subtitles_with_timedtext("qp0HIF3SfI4", "ru")
+
+    assert text == "Первая строка.\nВторая строка."
+    assert lang == "ru"
+    assert len(fetched) == 2
+    assert "v=qp0HIF3SfI4" in fetched[1]
+    assert "lang=ru" in fetched[1]
+    assert fetched[1].endswith("fmt=json3")
+
+
+def test_select_timedtext_track_from_player_response():
+    """Test track selection against the recorded ytInitialPlayerResponse."""
+    player_response = json.loads((ROOT / "player_response.json").read_text(encoding="utf-8"))
+
+    assert YouTubeService._select_timedtext_track(player_response, "iw")["vssId"] == ".iw"
+    assert YouTubeService._select_timedtext_track(player_response, "pt")["languageCode"] == "pt-BR"
+    # The player's default track is English
+    assert YouTubeService._select_timedtext_track(player_response, None)["languageCode"] == "en"
+    assert YouTubeService._select_timedtext_track(player_response, "xx") is None
+
+
+def test_select_timedtext_track_prefers_manual_unless_auto_generated():
+    """Test that manual tracks win over speech recognition tracks unless auto-generated ones are asked for."""
+    player_response = {"captions": {"playerCaptionsTracklistRenderer": {"captionTracks": [
+        {"baseUrl": "https://example.com/asr", "languageCode": "ru", "kind": "asr"},
+        {"baseUrl": "https://example.com/manual", "languageCode": "ru"},
+    ]}}}
+
+    assert YouTubeService._select_timedtext_track(player_response, "ru")["baseUrl"] == "https://example.com/manual"
+    assert YouTubeService._select_timedtext_track(player_response, "ru", True)["baseUrl"] == "https://example.com/asr"
+
+
+def test_open_breaker_skips_backend(monkeypatch, list_calls):
+    """Test that a backend with an open breaker is skipped and tried last."""
+    timedtext_calls = []
+
+    def fake_timedtext(self, video_id, lang="ru", auto_generated=False):
+        timedtext_calls.append(video_id)
+        return "Text from timedtext.", lang
+
+    monkeypatch.setattr(YouTubeService, "_get_subtitles_with_timedtext", fake_timedtext)
+    service = YouTubeService()
+    for _ in range(settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        service.breakers["transcript_api"].record_failure()
+
+    text, lang = asyncio.run(service.get_subtitles("dQw4w9WgXcQ", "ru"))
+
+    assert service.backend_order()[-1] == "transcript_api"
+    assert text == "Text from timedtext."
+    assert list_calls == []
+    assert timedtext_calls == ["dQw4w9WgXcQ"]
+
+
+def test_throttled_backend_opens_breaker(monkeypatch, fast_governor):
+    """Test that repeated rate-limit errors open a breaker while missing transcripts do not."""
+    def throttled_list_transcripts(video_id):
+        raise Exception("429 Client Error: Too Many Requests")
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(throttled_list_transcripts))
+    monkeypatch.setattr(YouTubeService, "_get_subtitles_with_timedtext",
+                        lambda self, video_id, lang="ru", auto_generated=False: (None, f"No subtitles available in {lang}"))
+    monkeypatch.setattr(youtube_module, "YOUTUBE_TRANSCRIPT_AVAILABLE", True)
+    monkeypatch.setattr(youtube_module, "YT_DLP_AVAILABLE", False)
+    service = YouTubeService()
+
+    for _ in range(settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD):
+        asyncio.run(service.get_subtitles("dQw4w9WgXcQ", "ru"))
+
+    assert service.breakers["transcript_api"].state == "open"
+    assert service.breakers["timedtext"].state == "closed"
+    assert fast_governor.stats()["throttled"] == settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+
+
+def test_backend_order_follows_measured_stats(monkeypatch):
+    """Test that a backend that keeps failing falls behind once it has enough samples."""
+    monkeypatch.setattr(settings, "SUBTITLE_BACKEND_MIN_SAMPLES", 3)
+    service = YouTubeService()
+    assert service.backend_order() == ["transcript_api", "timedtext", "yt_dlp"]
+
+    for _ in range(3):
+        service.backend_stats.record("transcript_api", 2.0, False)
+        service.backend_stats.record("yt_dlp", 3.0, True)
+
+    assert service.backend_order() == ["timedtext", "yt_dlp", "transcript_api"]
+
+
+def test_transcript_api_failures_are_classified_by_type(monkeypatch):
+    """Test that only the library's verdicts about the video are definitive, not a failed listing."""
+    from youtube_transcript_api import TranscriptsDisabled, VideoUnavailable
+
+    from app.services.negative_cache import classify_failure
+
+    service = YouTubeService()
+    failures = {
+        "gone": VideoUnavailable("gone"),
+        "disabled": TranscriptsDisabled("disabled"),
+        "listing": Exception("404 Client Error: Not Found for url: https://www.youtube.com/watch?v=listing"),
+    }
+
+    def failing_list(video_id):
+        raise failures[video_id]
+
+    monkeypatch.setattr(YouTubeService, "_list_transcripts", staticmethod(failing_list))
+
+    def attempt(video_id):
+        errors = []
+        result = asyncio.run(service._get_subtitles_with_transcript_api(video_id, "en", False, errors))
+        return result, errors
+
+    assert classify_failure(attempt("gone")[0][1]) == "unavailable"
+    assert classify_failure(attempt("disabled")[0][1]) == "disabled"
+    result, errors = attempt("listing")
+    assert result == (None, None)
+    assert [classify_failure(message) for message in errors] == [None]
+
+
+def test_bot_check_is_throttling_not_a_private_video(monkeypatch, fast_governor):
+    """Test that LOGIN_REQUIRED only means private when the reason says so."""
+    from app.services.negative_cache import classify_failure
+
+    reasons = {
+        "botcheck": {"reason": "Sign in to confirm you’re not a bot", "messages": ["This helps protect our community."]},
+        "private": {"reason": "Private video", "messages": ["If the owner of this video has granted you access, please sign in."]},
+    }
+
+    class FakeSession:
+        def get(self, url, timeout=None):
+            playability = dict(reasons[url.split("v=")[1].split("&")[0]], status="LOGIN_REQUIRED")
+            html = f"<script>var ytInitialPlayerResponse = {json.dumps({'playabilityStatus': playability})};</script>"
+            return SimpleNamespace(status_code=200, text=html, raise_for_status=lambda: None)
+
+    monkeypatch.setattr(http_session_module, "get_http_session", lambda: FakeSession())
+    service = YouTubeService()
+
+    _, bot_message = service._get_subtitles_with_timedtext("botcheck", "ru")
+    assert classify_failure(bot_message) is None
+    assert fast_governor.stats()["throttled"] == 1
+
+    _, private_message = service._get_subtitles_with_timedtext("private", "ru")
+    assert classify_failure(private_message) == "private"
+    assert fast_governor.stats()["throttled"] == 1